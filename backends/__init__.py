@@ -0,0 +1,4 @@
+from backends.ollamaclient import OllamaClient
+from backends.backendpool import OllamaBackendPool, BackendLease
+from backends.healthprober import OllamaHealthProber
+from backends.modelkeeper import OllamaModelKeeper
@@ -0,0 +1,159 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import requests
+
+from backends.ollamaclient import OllamaClient
+
+
+class OllamaBackend:
+    """State of a single Ollama host in a backend pool."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.base_url = f"http://{host}/api"
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.last_latency = None
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+
+class BackendLease:
+    """A backend reserved for one generation; mark_failed() reports a bad response."""
+
+    def __init__(self, base_url: str, backend: Optional[OllamaBackend] = None):
+        self.base_url = base_url
+        self.backend = backend
+        self.failed = False
+
+    def mark_failed(self) -> None:
+        self.failed = True
+
+
+class OllamaBackendPool:
+    """Routes generations across several Ollama hosts.
+
+    Each generation goes to the available host with the fewest outstanding
+    requests. Hosts that fail repeatedly are ejected with exponential backoff
+    and get a single trial request once their backoff expires. If every host
+    is ejected, the one due back soonest is used rather than failing outright.
+    """
+
+    def __init__(self, hosts: List[str], ollama_client: OllamaClient,
+                 failure_threshold: int = 2, base_backoff: float = 5.0, max_backoff: float = 300.0):
+        if not hosts:
+            raise ValueError("At least one Ollama host is required")
+
+        self.backends = [OllamaBackend(host) for host in hosts]
+        self.ollama_client = ollama_client
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lock = threading.Lock()
+
+    @property
+    def hosts(self) -> List[str]:
+        return [backend.host for backend in self.backends]
+
+    def acquire(self) -> OllamaBackend:
+        """Reserve the least-loaded available backend."""
+        with self.lock:
+            now = time.time()
+            available = [backend for backend in self.backends if backend.is_available(now)]
+            if available:
+                backend = min(available, key=lambda b: b.outstanding)
+            else:
+                backend = min(self.backends, key=lambda b: b.ejected_until)
+
+            # Only let one trial request through to a host coming back from ejection
+            if backend.consecutive_failures >= self.failure_threshold:
+                backend.ejected_until = now + self.backoff_for(backend)
+
+            backend.outstanding += 1
+            return backend
+
+    def release(self, backend: OllamaBackend, failed: bool, elapsed: float) -> None:
+        """Release a backend, recording the outcome and latency of its request."""
+        with self.lock:
+            backend.outstanding -= 1
+            backend.requests += 1
+            backend.total_latency += elapsed
+            backend.last_latency = elapsed
+            if failed:
+                self.record_failure(backend)
+            else:
+                self.record_success(backend)
+
+    def backoff_for(self, backend: OllamaBackend) -> float:
+        exponent = max(0, backend.consecutive_failures - self.failure_threshold)
+        return min(self.max_backoff, self.base_backoff * (2 ** exponent))
+
+    def record_failure(self, backend: OllamaBackend) -> None:
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        if backend.consecutive_failures >= self.failure_threshold:
+            backend.ejected_until = time.time() + self.backoff_for(backend)
+
+    def record_success(self, backend: OllamaBackend) -> None:
+        backend.consecutive_failures = 0
+        backend.ejected_until = 0.0
+
+    @contextmanager
+    def lease(self):
+        """Reserve a backend for the duration of a request.
+
+        Request exceptions raised inside the block, or a call to
+        lease.mark_failed(), count as a failure of the host.
+        """
+        backend = self.acquire()
+        lease = BackendLease(backend.base_url, backend)
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield lease
+        except requests.exceptions.RequestException:
+            failed = True
+            raise
+        finally:
+            self.release(backend, failed or lease.failed, time.perf_counter() - start)
+
+    def report_health(self, backend: OllamaBackend, healthy: bool) -> None:
+        """Record the result of an out-of-band health check of a backend."""
+        with self.lock:
+            if healthy:
+                self.record_success(backend)
+            else:
+                self.record_failure(backend)
+
+    def check_connection(self, timeout: float = 5) -> bool:
+        """Check every host, updating health state. Returns True if any host is reachable."""
+        any_connected = False
+        for backend in self.backends:
+            connected = self.ollama_client.check_connection(backend.base_url, timeout=timeout)
+            self.report_health(backend, connected)
+            any_connected = any_connected or connected
+        return any_connected
+
+    def get_stats(self) -> List[Dict]:
+        """Get per-host load, health and latency."""
+        with self.lock:
+            now = time.time()
+            return [{
+                "host": backend.host,
+                "healthy": backend.is_available(now),
+                "outstanding": backend.outstanding,
+                "requests": backend.requests,
+                "failures": backend.failures,
+                "consecutive_failures": backend.consecutive_failures,
+                "ejected_for_seconds": round(max(0.0, backend.ejected_until - now), 1),
+                "avg_latency_ms": round(backend.total_latency / backend.requests * 1000, 2) if backend.requests else None,
+                "last_latency_ms": round(backend.last_latency * 1000, 2) if backend.last_latency is not None else None
+            } for backend in self.backends]
@@ -0,0 +1,89 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import requests
+
+from background import PeriodicTask
+from backends.backendpool import OllamaBackendPool
+from backends.ollamaclient import OllamaClient
+
+
+class OllamaHealthProber(PeriodicTask):
+    """Polls every Ollama host in the background and caches the result.
+
+    Connection checks and model listings are answered from memory, so socket
+    connects and status requests never wait on Ollama themselves. Probe
+    results also feed the backend pool's health tracking.
+
+    Until the first background probe finishes, callers wait up to ``timeout``
+    for it rather than probing on their own, then get a status with
+    ``checked_at`` set to None.
+    """
+
+    def __init__(self, backend_pool: OllamaBackendPool, ollama_client: OllamaClient,
+                 interval: float = 15.0, timeout: float = 5.0,
+                 spawn: Optional[Callable] = None, sleep: Callable[[float], None] = time.sleep):
+        super().__init__(interval, spawn, sleep)
+        self.backend_pool = backend_pool
+        self.ollama_client = ollama_client
+        self.timeout = timeout
+
+        self.host_status: Dict[str, Dict] = {}
+        self.checked_at = None
+        self.first_probe_done = threading.Event()
+
+    def run_once(self) -> None:
+        try:
+            self.probe()
+        except Exception as e:
+            print(f"⚠️ Ollama health probe failed: {str(e)}")
+        finally:
+            self.first_probe_done.set()
+
+    def probe(self) -> None:
+        """Check every host once and update the cached status."""
+        for backend in self.backend_pool.backends:
+            start = time.perf_counter()
+            status = {"host": backend.host, "connected": False, "models": [], "error": None}
+            try:
+                response = self.ollama_client.get(f"{backend.base_url}/tags", timeout=self.timeout)
+                if response.status_code == 200:
+                    status["connected"] = True
+                    status["models"] = sorted(model.get("name", "") for model in response.json().get("models", []))
+                else:
+                    status["error"] = f"Received status code {response.status_code}"
+            except (requests.exceptions.RequestException, ValueError) as e:
+                status["error"] = str(e)
+
+            status["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            status["checked_at"] = datetime.now().isoformat()
+            self.backend_pool.report_health(backend, status["connected"])
+
+            with self.lock:
+                self.host_status[backend.host] = status
+
+        with self.lock:
+            self.checked_at = datetime.now().isoformat()
+
+    def get_status(self) -> Dict:
+        """Get the cached status, waiting briefly for the first probe if it hasn't finished."""
+        self.start()
+        self.first_probe_done.wait(self.timeout)
+
+        with self.lock:
+            hosts = [dict(status) for status in self.host_status.values()]
+            checked_at = self.checked_at
+
+        models = sorted({model for status in hosts if status["connected"] for model in status["models"]})
+        return {
+            "connected": any(status["connected"] for status in hosts),
+            "checked_at": checked_at,
+            "models": models,
+            "hosts": hosts
+        }
+
+    def is_connected(self) -> bool:
+        """Whether any Ollama host was reachable at the last probe."""
+        return self.get_status()["connected"]
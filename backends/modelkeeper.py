@@ -0,0 +1,93 @@
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from background import PeriodicTask
+from backends.backendpool import OllamaBackendPool
+from backends.ollamaclient import OllamaClient
+
+
+class OllamaModelKeeper(PeriodicTask):
+    """Preloads models on every Ollama host and keeps them resident.
+
+    Warm-up sends an empty generate request per model, which makes Ollama load
+    it and hold it for ``keep_alive``. Repeating the request on an interval
+    shorter than ``keep_alive`` stops idle models being unloaded. The measured
+    load time of each request is recorded so cold-start costs are visible:
+    a long load on a refresh means the model had been evicted.
+    """
+
+    def __init__(self, backend_pool: OllamaBackendPool, ollama_client: OllamaClient,
+                 models: List[str], keep_alive: str = "30m", refresh_interval: float = 600.0,
+                 load_timeout: float = 300.0, spawn: Optional[Callable] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        super().__init__(refresh_interval, spawn, sleep)
+        self.backend_pool = backend_pool
+        self.ollama_client = ollama_client
+        self.models = models
+        self.keep_alive = keep_alive
+        self.load_timeout = load_timeout
+
+        self.model_status: Dict[str, Dict] = {}
+
+    def run_once(self) -> None:
+        try:
+            self.warm_up()
+        except Exception as e:
+            print(f"⚠️ Model keep-alive failed: {str(e)}")
+
+    def warm_up(self) -> None:
+        """Load (or refresh) every model on every host once."""
+        for backend in self.backend_pool.backends:
+            for model in self.models:
+                self.preload(backend.host, backend.base_url, model)
+
+    def preload(self, host: str, base_url: str, model: str) -> Dict:
+        """Ask one host to load a model and keep it resident, recording how long it took."""
+        start = time.perf_counter()
+        status = {"host": host, "model": model, "loaded": False, "error": None}
+        try:
+            response = self.ollama_client.post(
+                f"{base_url}/generate",
+                json={"model": model, "keep_alive": self.keep_alive},
+                timeout=(self.ollama_client.connect_timeout, self.load_timeout)
+            )
+            if response.status_code == 200:
+                status["loaded"] = True
+                # Ollama reports durations in nanoseconds
+                load_duration = response.json().get("load_duration")
+                if load_duration is not None:
+                    status["load_duration_ms"] = round(load_duration / 1e6, 2)
+            else:
+                status["error"] = f"Received status code {response.status_code}"
+        except (requests.exceptions.RequestException, ValueError) as e:
+            status["error"] = str(e)
+
+        status["request_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        status["refreshed_at"] = datetime.now().isoformat()
+
+        with self.lock:
+            previous = self.model_status.get(f"{host}/{model}", {})
+            status["refreshes"] = previous.get("refreshes", 0) + 1
+            # Keep the first successful (cold) load time around for comparison
+            first_load_ms = previous.get("first_load_ms")
+            status["first_load_ms"] = first_load_ms if first_load_ms is not None else status.get("load_duration_ms")
+            self.model_status[f"{host}/{model}"] = status
+
+        if status["loaded"]:
+            print(f"🔥 {model} ready on {host} (load {status.get('load_duration_ms', '?')} ms, "
+                  f"request {status['request_ms']} ms)")
+        else:
+            print(f"⚠️ Could not preload {model} on {host}: {status['error']}")
+        return status
+
+    def get_stats(self) -> Dict:
+        """Get keep-alive settings and the latest load status of every model on every host."""
+        with self.lock:
+            return {
+                "keep_alive": self.keep_alive,
+                "refresh_interval": self.interval,
+                "models": [dict(status) for status in self.model_status.values()]
+            }
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class OllamaClient:
+    """Process-wide HTTP client for Ollama with keep-alive connection pooling.
+
+    A single instance is meant to be shared by every chatbot so that tutor
+    turns reuse pooled TCP connections instead of opening a new one per
+    request. Per-endpoint latency statistics are kept for monitoring.
+    """
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0, latency_window: int = 1000):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.lock = threading.Lock()
+        self.latency_window = latency_window
+        self.endpoint_stats: Dict[str, Dict] = {}
+
+    @property
+    def timeout(self):
+        """Default (connect, read) timeout tuple for requests."""
+        return (self.connect_timeout, self.read_timeout)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a pooled GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a pooled POST request."""
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the shared session, recording its latency.
+
+        For streamed requests the latency covers the time until the response
+        headers arrive, i.e. roughly the time to first token.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        endpoint = urlparse(url).path
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.record_latency(endpoint, time.perf_counter() - start, failed=True)
+            raise
+        self.record_latency(endpoint, time.perf_counter() - start, failed=response.status_code >= 400)
+        return response
+
+    def check_connection(self, base_url: str, timeout: float = 5) -> bool:
+        """Check if the Ollama API at base_url is running and accessible."""
+        try:
+            response = self.get(f"{base_url}/tags", timeout=timeout)
+            return response.status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def record_latency(self, endpoint: str, elapsed: float, failed: bool = False) -> None:
+        """Record the latency of a single request against an endpoint."""
+        with self.lock:
+            stats = self.endpoint_stats.get(endpoint)
+            if stats is None:
+                stats = {
+                    "requests": 0,
+                    "errors": 0,
+                    "total_latency": 0.0,
+                    "max_latency": 0.0,
+                    "recent": deque(maxlen=self.latency_window)
+                }
+                self.endpoint_stats[endpoint] = stats
+
+            stats["requests"] += 1
+            if failed:
+                stats["errors"] += 1
+            stats["total_latency"] += elapsed
+            stats["max_latency"] = max(stats["max_latency"], elapsed)
+            stats["recent"].append(elapsed)
+
+    def get_stats(self) -> Dict:
+        """Get pool configuration and per-endpoint latency statistics in milliseconds."""
+        with self.lock:
+            endpoints = {}
+            for endpoint, stats in self.endpoint_stats.items():
+                recent = sorted(stats["recent"])
+                endpoints[endpoint] = {
+                    "requests": stats["requests"],
+                    "errors": stats["errors"],
+                    "avg_latency_ms": round(stats["total_latency"] / stats["requests"] * 1000, 2),
+                    "max_latency_ms": round(stats["max_latency"] * 1000, 2),
+                    "p50_latency_ms": self._percentile_ms(recent, 0.50),
+                    "p95_latency_ms": self._percentile_ms(recent, 0.95)
+                }
+
+        return {
+            "pool_size": self.pool_size,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "requests": sum(e["requests"] for e in endpoints.values()),
+            "errors": sum(e["errors"] for e in endpoints.values()),
+            "endpoints": endpoints
+        }
+
+    @staticmethod
+    def _percentile_ms(sorted_values, fraction: float) -> Optional[float]:
+        if not sorted_values:
+            return None
+        index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+        return round(sorted_values[index] * 1000, 2)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
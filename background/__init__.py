@@ -0,0 +1,2 @@
+from background.blocking import run_blocking
+from background.periodictask import PeriodicTask, spawn_thread
@@ -0,0 +1,19 @@
+import sys
+from typing import Any, Callable
+
+
+def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Call ``func``, on eventlet's native thread pool when the process is monkey patched.
+
+    Under gunicorn's eventlet workers every thread is a green thread sharing
+    one OS thread, so a syscall that waits on the disk (``os.fsync``, a SQLite
+    commit) stalls every request in the worker. Only the blocking call itself
+    moves: the caller keeps any green locks it holds and waits cooperatively.
+    ``func`` must not take green locks of its own, as the native pool thread
+    can't wait on them. Otherwise it's a plain call.
+    """
+    patcher = sys.modules.get("eventlet.patcher")
+    if patcher is not None and patcher.is_monkey_patched("thread"):
+        from eventlet import tpool
+        return tpool.execute(func, *args, **kwargs)
+    return func(*args, **kwargs)
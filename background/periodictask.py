@@ -0,0 +1,52 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+
+def spawn_thread(target: Callable[[], None]) -> threading.Thread:
+    """Run ``target`` on a daemon thread, the default way background components start their loops."""
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+class PeriodicTask(ABC):
+    """Repeats ``run_once()`` in the background, sleeping ``interval`` seconds between runs.
+
+    The loop is started with ``spawn`` (a daemon thread by default; the web
+    app passes ``socketio.start_background_task``) and waits with ``sleep``,
+    so tests can drive it by hand. ``start()`` is idempotent and ``stop()``
+    ends the loop after the current interval. ``run_once()`` handles its own
+    errors: an exception escaping it ends the loop.
+    """
+
+    def __init__(self, interval: float, spawn: Optional[Callable] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.interval = interval
+        self.spawn = spawn or spawn_thread
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.running = False
+
+    def start(self) -> None:
+        """Start the background loop if it is not already running."""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+        self.spawn(self._run)
+
+    def stop(self) -> None:
+        """Stop the loop after the current interval."""
+        with self.lock:
+            self.running = False
+
+    def _run(self) -> None:
+        while self.running:
+            self.run_once()
+            self.sleep(self.interval)
+
+    @abstractmethod
+    def run_once(self) -> None:
+        """Do one round of the background work."""
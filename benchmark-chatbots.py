@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Chatbot Manager Benchmark for Spanish Tutor
+Measures WebChatbotManager.get_chatbot throughput and latency with many simultaneous users,
+comparing the lock-free lookup path against a manager serialized by one global lock
+"""
+
+import argparse
+import atexit
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+# Keep the app's database and user directories out of the project
+work_dir = tempfile.mkdtemp(prefix="chatbot-benchmark-")
+atexit.register(shutil.rmtree, work_dir, ignore_errors=True)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(work_dir, 'benchmark.db')}")
+os.chdir(work_dir)
+
+from web_gui.app import app, WebChatbotManager, ollama_client, ollama_backend_pool
+
+
+class BenchmarkUser:
+    """Just enough of a User for WebChatbotManager."""
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.email = f"user{user_id}@example.com"
+
+    def get_data_paths(self):
+        user_dir = os.path.join(work_dir, "users", str(self.id))
+        return {"user_id": str(self.id), "user_dir": user_dir,
+                "conversations_dir": os.path.join(user_dir, "conversations")}
+
+
+class SerializedChatbotManager(WebChatbotManager):
+    """The previous behaviour: every lookup, including creation, holds one global lock."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.global_lock = threading.Lock()
+
+    def get_chatbot(self, user, ollama_host=None, model=None):
+        with self.global_lock:
+            return super().get_chatbot(user, ollama_host, model)
+
+
+def run(manager_class, users: int, warm_users: int, requests: int) -> dict:
+    """Hit the manager from one thread per user; the first ``warm_users`` already have chatbots."""
+    manager = manager_class(ollama_client, ollama_backend_pool, max_instances=0, idle_timeout=0)
+    people = [BenchmarkUser(index) for index in range(users)]
+    for user in people[:warm_users]:
+        manager.get_chatbot(user)
+
+    barrier = threading.Barrier(users + 1)
+    warm_latencies, cold_latencies = [], []
+    results_lock = threading.Lock()
+
+    def client(user, warm):
+        latencies = []
+        barrier.wait()
+        for _ in range(requests):
+            start = time.perf_counter()
+            manager.get_chatbot(user)
+            latencies.append((time.perf_counter() - start) * 1000)
+        with results_lock:
+            if warm:
+                warm_latencies.extend(latencies)
+            else:
+                # The first request creates the chatbot; the rest are lookups
+                cold_latencies.append(latencies[0])
+                warm_latencies.extend(latencies[1:])
+
+    threads = [threading.Thread(target=client, args=(user, index < warm_users))
+               for index, user in enumerate(people)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    warm_latencies.sort()
+    return {
+        "throughput": users * requests / elapsed,
+        "elapsed_ms": elapsed * 1000,
+        "lookup_p50": statistics.median(warm_latencies),
+        "lookup_p99": warm_latencies[int(len(warm_latencies) * 0.99) - 1],
+        "create_p50": statistics.median(cold_latencies) if cold_latencies else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WebChatbotManager under concurrent users")
+    parser.add_argument("--users", type=int, default=200, help="Simultaneous users, one thread each")
+    parser.add_argument("--new-users", type=int, default=50, help="Users whose chatbot is created during the run")
+    parser.add_argument("--requests", type=int, default=200, help="get_chatbot calls per user")
+    args = parser.parse_args()
+
+    # Per-creation log lines would dominate the measurement
+    app.logger.disabled = True
+
+    print(f"🧵 {args.users} users ({args.new_users} new) x {args.requests} get_chatbot calls")
+    print()
+    print(f"{'':22} {'calls/s':>10} {'total ms':>10} {'lookup p50':>11} {'lookup p99':>11} {'create p50':>11}")
+    for label, manager_class in (("global lock", SerializedChatbotManager), ("lock-free lookups", WebChatbotManager)):
+        result = run(manager_class, args.users, args.users - args.new_users, args.requests)
+        print(f"{label:22} {result['throughput']:>10,.0f} {result['elapsed_ms']:>10.1f} "
+              f"{result['lookup_p50']:>9.3f}ms {result['lookup_p99']:>9.3f}ms {result['create_p50']:>9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Response Benchmark for Spanish Tutor
+Compares bytes and latency of serving a long conversation with stock JSON and no compression
+against the fast JSON provider with negotiated gzip/brotli compression
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from storage import FileConversationStore, jsoncodec
+from storage.conversationlog import ConversationLog
+from web_gui.responses import FastJSONProvider, ResponseCompressor, brotli
+
+
+SAMPLE_SENTENCES = [
+    "¡Buena pregunta! Usamos el imperfecto para describir hábitos y situaciones en el pasado.",
+    "El pretérito indefinido expresa acciones terminadas en un momento concreto.",
+    "«Cuando era niño, jugaba al fútbol todos los días con mis primos».",
+    "«Un día de verano me rompí la pierna en la playa».",
+    "Intenta escribir tres frases sobre tu infancia y te las corrijo.",
+    "Recuerda que el subjuntivo aparece después de expresiones de deseo como «ojalá».",
+    "Muy bien, solo te falta el acento en «también».",
+    "¿Qué hiciste el fin de semana pasado? Cuéntamelo en cinco frases.",
+    "La palabra «embarazada» no significa «embarrassed»; es un falso amigo.",
+    "Para pedir algo con cortesía puedes usar el condicional: «¿Podría traerme la cuenta?».",
+    "Ser y estar se traducen igual, pero «estar» indica estados temporales.",
+    "Excelente, tu pronunciación escrita de las preguntas es correcta."
+]
+
+
+def make_conversation(directory: str, exchanges: int) -> str:
+    """Save a conversation of ``exchanges`` varied exchanges and return its file."""
+    rng = random.Random(0)
+    store = FileConversationStore(directory)
+    session_start = datetime.now()
+    history = [
+        {"user": " ".join(rng.sample(SAMPLE_SENTENCES, 2)) + f" ({i})",
+         "bot": " ".join(rng.sample(SAMPLE_SENTENCES, rng.randint(3, 6))),
+         "timestamp": session_start.isoformat()}
+        for i in range(exchanges)
+    ]
+    key = store.write(store.new_key(session_start), session_start.isoformat(), "llama3", history)
+    store.close()
+    return key
+
+
+def stdlib_read(path: str) -> dict:
+    """Read a conversation log the way it was read before, with the stdlib decoder."""
+    with open(path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return {"session_start": records[0].get("session_start"), "model": records[0].get("model"),
+            "conversation": [{k: v for k, v in r.items() if k != "type"} for r in records[1:]]}
+
+
+def make_app(path: str, fast: bool) -> Flask:
+    app = Flask(__name__)
+    if fast:
+        app.json = FastJSONProvider(app)
+        ResponseCompressor().init_app(app)
+    else:
+        app.json = DefaultJSONProvider(app)
+
+    @app.route("/conversation")
+    def conversation():
+        data = ConversationLog(path).read() if fast else stdlib_read(path)
+        return jsonify(data)
+
+    return app
+
+
+def measure(client, runs: int, encoding: str) -> tuple:
+    """Return (body bytes, median ms, p95 ms) for ``runs`` requests."""
+    timings = []
+    size = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = client.get("/conversation", headers={"Accept-Encoding": encoding})
+        size = len(response.get_data())
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return size, statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark conversation response encoding")
+    parser.add_argument("--exchanges", type=int, default=500, help="Exchanges in the conversation")
+    parser.add_argument("--runs", type=int, default=50, help="Requests per measurement")
+    parser.add_argument("--mbps", type=float, default=10.0, help="Link speed used to estimate transfer time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = make_conversation(directory, args.exchanges)
+        print(f"📊 {args.exchanges}-exchange conversation, {os.path.getsize(path):,} bytes on disk")
+        print(f"   JSON backend: {jsoncodec.JSON_BACKEND}, brotli: {'yes' if brotli else 'no'}, {args.runs} runs each")
+        print()
+
+        cases = [("stock JSON, uncompressed", False, "identity"),
+                 ("fast JSON, uncompressed", True, "identity"),
+                 ("fast JSON, gzip", True, "gzip")]
+        if brotli is not None:
+            cases.append(("fast JSON, brotli", True, "br, gzip"))
+
+        # Server time is measured; transfer time is estimated from the body size at --mbps
+        print(f"{'':28} {'bytes':>10} {'server ms':>10} {'p95 ms':>8} {'transfer ms':>12} {'total ms':>9}")
+        baseline = None
+        for label, fast, encoding in cases:
+            client = make_app(path, fast).test_client()
+            client.get("/conversation", headers={"Accept-Encoding": encoding})  # warm up
+            size, median, p95 = measure(client, args.runs, encoding)
+            transfer = size * 8 / (args.mbps * 1000)
+            baseline = baseline or (size, median + transfer)
+            print(f"{label:28} {size:>10,} {median:>10.2f} {p95:>8.2f} {transfer:>12.2f} {median + transfer:>9.2f}"
+                  f"   ({size / baseline[0]:.0%} of the bytes, {(median + transfer) / baseline[1]:.0%} of the time)")
+
+
+if __name__ == "__main__":
+    main()
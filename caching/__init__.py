@@ -1 +1,7 @@
-from caching.translationcache import TranslationsCache
+from caching.responsecache import ResponseCache
+
+try:
+    from caching.translationcache import TranslationsCache
+except ImportError:
+    # The translation cache needs numpy, which the web app does not install
+    pass
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from storage import write_file_atomic
+
+
+class ResponseCache:
+    """LRU + TTL cache of tutor responses keyed on model, message and context.
+
+    Keys include a hash of the exact context sent to the model, so only turns
+    whose context matches exactly (such as the first turn of a fresh
+    conversation) are served from the cache. Entries can optionally be
+    persisted to a JSON file so that a restart keeps the cache warm.
+
+    Periodic saves run on a task started with ``spawn`` so a request never
+    waits on the disk; without ``spawn`` the cache is only written when
+    ``save()`` is called, e.g. at exit.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 86400,
+                 persist_path: Optional[str] = None, save_interval: float = 60,
+                 spawn: Optional[Callable] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self.save_interval = save_interval
+        self.spawn = spawn
+
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.dirty = False
+        # Bumped on every change, so a save only marks the cache clean if nothing changed meanwhile
+        self.changes = 0
+        self.saving = False
+        self.last_save = time.time()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if persist_path:
+            self.load()
+
+    @staticmethod
+    def normalize_message(message: str) -> str:
+        """Normalize case, whitespace and surrounding punctuation of a message."""
+        message = re.sub(r"\s+", " ", message.casefold()).strip()
+        return message.strip("¿?¡!.,;: ")
+
+    def make_key(self, model: str, message: str, context_messages: List[Dict]) -> str:
+        """Build a cache key from the model, normalized message and a hash of the context."""
+        context_hash = hashlib.sha256(
+            json.dumps(context_messages, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        raw_key = f"{model}\x00{self.normalize_message(message)}\x00{context_hash}"
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None on a miss or expired entry."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            response, created_at = entry
+            if time.time() - created_at > self.ttl_seconds:
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                self.dirty = True
+                self.changes += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key: str, response: str) -> None:
+        """Store a response, evicting the least recently used entries if full."""
+        with self.lock:
+            self.entries[key] = (response, time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            self.dirty = True
+            self.changes += 1
+            save_due = (self.persist_path and self.spawn is not None and not self.saving
+                        and time.time() - self.last_save >= self.save_interval)
+            if save_due:
+                self.saving = True
+
+        if save_due:
+            self.spawn(self._save_in_background)
+
+    def _save_in_background(self) -> None:
+        try:
+            self.save()
+        finally:
+            with self.lock:
+                self.saving = False
+
+    def load(self) -> None:
+        """Load persisted entries from disk, skipping any that have expired."""
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"⚠️ Could not load response cache: {str(e)}")
+            return
+
+        now = time.time()
+        with self.lock:
+            for key, response, created_at in data.get("entries", []):
+                if now - created_at <= self.ttl_seconds:
+                    self.entries[key] = (response, created_at)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def save(self) -> None:
+        """Write the cache to disk atomically if it has changed."""
+        if not self.persist_path:
+            return
+
+        with self.lock:
+            if not self.dirty:
+                return
+            entries = [[key, response, created_at] for key, (response, created_at) in self.entries.items()]
+            changes = self.changes
+            self.last_save = time.time()
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+            write_file_atomic(self.persist_path, json.dumps({"entries": entries}, ensure_ascii=False))
+        except Exception as e:
+            # Still dirty, so the next interval tries again
+            print(f"⚠️ Could not save response cache: {str(e)}")
+            return
+
+        with self.lock:
+            if self.changes == changes:
+                self.dirty = False
+
+    def get_stats(self) -> Dict:
+        """Get cache size and hit/miss counters."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
@@ -0,0 +1 @@
+from context.contextwindow import ContextWindow
@@ -0,0 +1,147 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class ContextWindow:
+    """Token-budgeted window over a conversation history with a rolling summary.
+
+    Token counts are estimated once per exchange and cached. When the recent
+    exchanges exceed the budget, the window slides forward to a low-water mark
+    and the exchanges that fell out of it are folded into a running summary by
+    a background summarizer. Sliding in steps keeps the prompt prefix stable
+    between slides so Ollama can keep reusing its cached prompt. Each
+    summarizer call gets at most ``max_tokens`` worth of exchanges, so a long
+    backlog (e.g. after loading a conversation) is folded in several calls.
+    A failed call is retried after ``retry_delay`` seconds, doubling up to
+    ``max_retry_delay``, so exchanges that left the window don't stay out of
+    the summary until the window next slides.
+    """
+
+    def __init__(self, max_tokens: int = 2048, chars_per_token: float = 4.0,
+                 low_water_ratio: float = 0.75,
+                 summarizer: Optional[Callable[[str, List[Dict]], str]] = None,
+                 retry_delay: float = 5.0, max_retry_delay: float = 300.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.max_tokens = max_tokens
+        self.chars_per_token = chars_per_token
+        self.low_water_ratio = low_water_ratio
+        self.summarizer = summarizer
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.sleep = sleep
+        self.summary_failures = 0
+
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all cached counts and the summary, e.g. when a new conversation is loaded."""
+        with self.lock:
+            self.history_ref = None
+            self.exchange_tokens = []
+            self.window_start = 0
+            self.window_tokens = 0
+            self.summary = ""
+            self.summary_version = 0
+            self.summarized_upto = 0
+            self.summarizing = False
+            # Bumped on reset so that in-flight summaries of an old history are discarded
+            self.generation = getattr(self, "generation", 0) + 1
+
+    def estimate_tokens(self, text: str) -> int:
+        """Roughly estimate the number of tokens in a piece of text."""
+        return math.ceil(len(text) / self.chars_per_token) + 4  # Per-message overhead
+
+    def sync(self, history: List[Dict]) -> None:
+        """Update cached token counts for new exchanges and slide the window if over budget."""
+        if history is not self.history_ref or len(history) < len(self.exchange_tokens):
+            self.reset()
+            self.history_ref = history
+
+        with self.lock:
+            for exchange in history[len(self.exchange_tokens):]:
+                tokens = self.estimate_tokens(exchange.get("user", "")) + self.estimate_tokens(exchange.get("bot", ""))
+                self.exchange_tokens.append(tokens)
+                self.window_tokens += tokens
+
+            if self.window_tokens <= self.max_tokens:
+                return
+
+            # Slide to the low-water mark, always keeping the latest exchange
+            target = self.max_tokens * self.low_water_ratio
+            while self.window_tokens > target and self.window_start < len(self.exchange_tokens) - 1:
+                self.window_tokens -= self.exchange_tokens[self.window_start]
+                self.window_start += 1
+
+        self.schedule_summary()
+
+    def schedule_summary(self) -> None:
+        """Fold exchanges that left the window into the summary on a background thread."""
+        with self.lock:
+            if self.summarizer is None or self.summarizing or self.summarized_upto >= self.window_start:
+                return
+            self.summarizing = True
+            generation = self.generation
+            previous_summary = self.summary
+            start, end = self.summarized_upto, self.summarized_upto
+            # Take as many exchanges as fit the budget, but always at least one
+            tokens = 0
+            while end < self.window_start and (end == start or tokens + self.exchange_tokens[end] <= self.max_tokens):
+                tokens += self.exchange_tokens[end]
+                end += 1
+            exchanges = self.history_ref[start:end]
+
+        thread = threading.Thread(
+            target=self._run_summarizer,
+            args=(generation, previous_summary, exchanges, end),
+            daemon=True
+        )
+        thread.start()
+
+    def _run_summarizer(self, generation: int, previous_summary: str, exchanges: List[Dict], end: int) -> None:
+        failures = 0
+        while True:
+            try:
+                summary = self.summarizer(previous_summary, exchanges)
+            except Exception as e:
+                print(f"⚠️ Could not summarize conversation: {str(e)}")
+                summary = None
+            if summary:
+                break
+
+            with self.lock:
+                if generation != self.generation:
+                    return
+                self.summary_failures += 1
+            # Still marked as summarizing, so no other summarizer starts meanwhile
+            failures += 1
+            self.sleep(min(self.max_retry_delay, self.retry_delay * 2 ** (failures - 1)))
+            with self.lock:
+                if generation != self.generation:
+                    return
+
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.summarizing = False
+            self.summary = summary.strip()
+            self.summary_version += 1
+            self.summarized_upto = end
+
+        # Fold the next chunk, or exchanges that left the window while we were summarizing
+        self.schedule_summary()
+
+    def get_stats(self) -> Dict:
+        """Get the current window size and summary state."""
+        with self.lock:
+            return {
+                "max_tokens": self.max_tokens,
+                "window_tokens": self.window_tokens,
+                "window_start": self.window_start,
+                "exchanges": len(self.exchange_tokens),
+                "summarized_upto": self.summarized_upto,
+                "summary_failures": self.summary_failures,
+                "summary_tokens": self.estimate_tokens(self.summary) if self.summary else 0
+            }
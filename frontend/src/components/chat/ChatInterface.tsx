@@ -1,4 +1,4 @@
-import React, { useEffect, useRef } from 'react';
+import React, { useEffect, useLayoutEffect, useRef } from 'react';
 import { useSocket } from '@/hooks/useSocket';
 import { useAppContext } from '@/context/AppContext';
 import { apiService } from '@/services/api';
@@ -8,12 +8,30 @@ import ChatInput from './ChatInput';
 import WelcomeMessage from './WelcomeMessage';
 import { showToast } from '@/utils';
 
+// Exchanges fetched per page when loading or scrolling back through a conversation
+const MESSAGE_PAGE_SIZE = 50;
+
 const ChatInterface: React.FC = () => {
   const { on, emit } = useSocket();
-  const { chatState, addMessage, setTyping, loadMessages, clearMessages, setCurrentConversation } = useAppContext();
+  const {
+    chatState,
+    addMessage,
+    appendStreamingToken,
+    finishStreamingMessage,
+    setTyping,
+    loadMessages,
+    prependMessages,
+    clearMessages,
+    setCurrentConversation,
+  } = useAppContext();
   const hasInitialized = useRef(false);
   const cleanupFunctionsRef = useRef<(() => void)[]>([]);
   const hasLoadedLatest = useRef(false);
+  const messagesContainerRef = useRef<HTMLDivElement>(null);
+  // Which conversation is shown and the exchange offset of its oldest loaded message
+  const historyRef = useRef<{ filename?: string; offset: number }>({ offset: 0 });
+  const loadingOlderRef = useRef(false);
+  const scrollRestoreRef = useRef<number | null>(null);
 
   useEffect(() => {
     if (hasInitialized.current) return;
@@ -48,6 +66,29 @@ const ChatInterface: React.FC = () => {
       })
     );
 
+    // Streamed bot response tokens
+    cleanupFunctions.push(
+      on('bot_token', (data) => {
+        appendStreamingToken(data.token);
+        setTyping(false);
+      })
+    );
+
+    // End of a streamed bot response
+    cleanupFunctions.push(
+      on('bot_message_done', (data) => {
+        finishStreamingMessage(data.message, data.timestamp);
+        setTyping(false);
+      })
+    );
+
+    // Message is waiting for a free worker
+    cleanupFunctions.push(
+      on('queued', (data) => {
+        showToast(`The tutor is busy - your message is about #${data.position} in line`, 'info');
+      })
+    );
+
     // System messages
     cleanupFunctions.push(
       on('system_message', (data) => {
@@ -71,6 +112,7 @@ const ChatInterface: React.FC = () => {
         sessionStorage.removeItem('spanish-tutor-auto-load-disabled');
         // Notify backend to clear active conversation
         emit('set_active_conversation', { filename: null });
+        historyRef.current = { offset: 0 };
         // Reset the latest conversation loaded flag so a new conversation can be started
         hasLoadedLatest.current = false;
         console.log('✅ Messages cleared - showing welcome message');
@@ -104,6 +146,7 @@ const ChatInterface: React.FC = () => {
         // Load new messages immediately (remove setTimeout delay)
         console.log('📥 Loading new messages...');
         loadMessages(messages);
+        historyRef.current = { filename: data.filename, offset: data.offset ?? 0 };
         
         // Store the loaded conversation as the active one
         localStorage.setItem('spanish-tutor-active-conversation', data.filename);
@@ -123,10 +166,36 @@ const ChatInterface: React.FC = () => {
       })
     );
 
+    // Older page of the current conversation, requested on scroll-up
+    cleanupFunctions.push(
+      on('older_messages_loaded', (data) => {
+        loadingOlderRef.current = false;
+        if (data.filename !== historyRef.current.filename) return;
+
+        const messages = data.messages
+          .filter((msg: any) => msg.message && msg.message.trim())
+          .map((msg, index) => ({
+            id: `older-${data.offset}-${index}`,
+            type: msg.type as 'user' | 'bot' | 'system',
+            message: msg.message,
+            timestamp: msg.timestamp,
+          }));
+
+        // Keep the viewport anchored on the message the user was looking at
+        const container = messagesContainerRef.current;
+        if (container) {
+          scrollRestoreRef.current = container.scrollHeight - container.scrollTop;
+        }
+        historyRef.current = { ...historyRef.current, offset: data.offset };
+        prependMessages(messages);
+      })
+    );
+
     // Error handling
     cleanupFunctions.push(
       on('error', (data) => {
         console.error('Socket error:', data.message);
+        loadingOlderRef.current = false;
         showToast(data.message, 'error');
         setTyping(false);
       })
@@ -140,7 +209,7 @@ const ChatInterface: React.FC = () => {
       console.log('🧹 ChatInterface: Cleaning up socket event listeners...');
       cleanupFunctions.forEach(cleanup => cleanup());
     };
-  }, [on, addMessage, setTyping, loadMessages, clearMessages]); // Include all dependencies now that they're stable
+  }, [on, addMessage, appendStreamingToken, finishStreamingMessage, setTyping, loadMessages, prependMessages, clearMessages]); // Include all dependencies now that they're stable
 
   // Load the appropriate conversation (either the active one or latest) if no messages are present
   useEffect(() => {
@@ -180,7 +249,10 @@ const ChatInterface: React.FC = () => {
           console.log('🔄 Attempting to restore active conversation:', activeConversationFilename);
           
           try {
-            const response = await apiService.getConversation(activeConversationFilename);
+            const response = await apiService.getConversation(activeConversationFilename, {
+              offset: -MESSAGE_PAGE_SIZE,
+              limit: MESSAGE_PAGE_SIZE,
+            });
             
             if (response.data?.conversation) {
               console.log('📚 Found active conversation, loading...', response.data);
@@ -204,6 +276,7 @@ const ChatInterface: React.FC = () => {
 
               if (messages.length > 0) {
                 loadMessages(messages);
+                historyRef.current = { filename: activeConversationFilename, offset: response.data.offset ?? 0 };
                 setCurrentConversation(activeConversationFilename);
                 // Notify backend about the active conversation
                 emit('set_active_conversation', { filename: activeConversationFilename });
@@ -231,7 +304,7 @@ const ChatInterface: React.FC = () => {
           console.log('🆕 First visit detected - loading latest conversation');
           
           try {
-            const response = await apiService.getLatestConversation();
+            const response = await apiService.getLatestConversation(MESSAGE_PAGE_SIZE);
             
             if (response.data?.exists && response.data.conversation) {
               console.log('📚 Found latest conversation for first visit, loading...', response.data);
@@ -255,6 +328,7 @@ const ChatInterface: React.FC = () => {
 
               if (messages.length > 0) {
                 loadMessages(messages);
+                historyRef.current = { filename: response.data.filename, offset: response.data.offset ?? 0 };
                 setCurrentConversation(response.data.filename);
                 // Store this as the active conversation so it can be restored later
                 localStorage.setItem('spanish-tutor-active-conversation', response.data.filename!);
@@ -287,6 +361,27 @@ const ChatInterface: React.FC = () => {
     loadConversationOnMount();
   }, [chatState.messages.length, loadMessages, setCurrentConversation]);
 
+  // Restore the scroll position after older messages were prepended
+  useLayoutEffect(() => {
+    const container = messagesContainerRef.current;
+    if (container && scrollRestoreRef.current !== null) {
+      container.scrollTop = container.scrollHeight - scrollRestoreRef.current;
+      scrollRestoreRef.current = null;
+    }
+  }, [chatState.messages]);
+
+  // Lazy-load the previous page when the user scrolls near the top
+  const handleScroll = () => {
+    const container = messagesContainerRef.current;
+    const { filename, offset } = historyRef.current;
+    if (!container || !filename || offset <= 0 || loadingOlderRef.current) return;
+
+    if (container.scrollTop < 80) {
+      loadingOlderRef.current = true;
+      emit('load_older_messages', { filename, before: offset, limit: MESSAGE_PAGE_SIZE });
+    }
+  };
+
   // Debug logging for chat state
   console.log('ChatInterface render - messages count:', chatState.messages.length);
   console.log('ChatInterface render - messages:', chatState.messages);
@@ -294,7 +389,7 @@ const ChatInterface: React.FC = () => {
   return (
     <div className="chat-container">
       <ChatHeader />
-      <div className="chat-messages" id="chat-messages">
+      <div className="chat-messages" id="chat-messages" ref={messagesContainerRef} onScroll={handleScroll}>
         {chatState.messages.length === 0 ? (
           <WelcomeMessage />
         ) : (
@@ -12,6 +12,8 @@ const ConversationPicker: React.FC<ConversationPickerProps> = ({ onClose }) => {
   const [conversations, setConversations] = useState<Conversation[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const { emit } = useSocket();
 
   useEffect(() => {
@@ -24,6 +26,7 @@ const ConversationPicker: React.FC<ConversationPickerProps> = ({ onClose }) => {
           setError(response.error);
         } else if (response.data) {
           setConversations(response.data.conversations || []);
+          setNextCursor(response.data.has_more ? response.data.next_cursor : null);
           if (response.data.conversations.length === 0) {
             showToast('No saved conversations found', 'info');
             onClose();
@@ -42,9 +45,26 @@ const ConversationPicker: React.FC<ConversationPickerProps> = ({ onClose }) => {
     loadConversations();
   }, [onClose]);
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await apiService.getConversations({ before: nextCursor });
+      if (response.error) {
+        showToast(response.error, 'error');
+      } else if (response.data) {
+        const page = response.data;
+        setConversations(prev => [...prev, ...page.conversations]);
+        setNextCursor(page.has_more ? page.next_cursor : null);
+      }
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleLoadConversation = (filename: string) => {
     console.log('ConversationPicker - Loading conversation:', filename);
-    emit('load_conversation', { filename });
+    emit('load_conversation', { filename, limit: 50 });
     console.log('ConversationPicker - Emitted load_conversation event');
     onClose();
   };
@@ -97,6 +117,11 @@ const ConversationPicker: React.FC<ConversationPickerProps> = ({ onClose }) => {
                   </button>
                 </div>
               ))}
+              {nextCursor && (
+                <button className="btn btn-secondary btn-sm" onClick={handleLoadMore} disabled={loadingMore}>
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -15,9 +15,13 @@ const MessageList: React.FC<MessageListProps> = ({ messages, isTyping }) => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
 
+  // Only follow new messages at the bottom; older pages prepended on
+  // scroll-up leave the last message unchanged and must not jump the view
+  const lastMessage = messages[messages.length - 1];
+
   useEffect(() => {
     scrollToBottom();
-  }, [messages, isTyping]);
+  }, [lastMessage?.id, lastMessage?.message, isTyping]);
 
   return (
     <>
@@ -19,10 +19,13 @@ const initialSettings: AppSettings = {
 // Action types
 type ChatAction =
   | { type: 'ADD_MESSAGE'; payload: Message }
+  | { type: 'APPEND_STREAMING_TOKEN'; payload: { id: string; token: string; timestamp: string } }
+  | { type: 'FINISH_STREAMING_MESSAGE'; payload: { id: string; message: string; timestamp: string } }
   | { type: 'SET_TYPING'; payload: boolean }
   | { type: 'SET_CONNECTION_STATUS'; payload: boolean }
   | { type: 'CLEAR_MESSAGES' }
   | { type: 'LOAD_MESSAGES'; payload: Message[] }
+  | { type: 'PREPEND_MESSAGES'; payload: Message[] }
   | { type: 'SET_CURRENT_CONVERSATION'; payload: string | undefined };
 
 type SettingsAction =
@@ -39,6 +42,46 @@ const chatReducer = (state: ChatState, action: ChatAction): ChatState => {
         ...state,
         messages: [...state.messages, action.payload],
       };
+    case 'APPEND_STREAMING_TOKEN': {
+      const last = state.messages[state.messages.length - 1];
+      if (last?.streaming) {
+        return {
+          ...state,
+          messages: [
+            ...state.messages.slice(0, -1),
+            { ...last, message: last.message + action.payload.token },
+          ],
+        };
+      }
+      return {
+        ...state,
+        messages: [
+          ...state.messages,
+          {
+            id: action.payload.id,
+            type: 'bot',
+            message: action.payload.token,
+            timestamp: action.payload.timestamp,
+            streaming: true,
+          },
+        ],
+      };
+    }
+    case 'FINISH_STREAMING_MESSAGE': {
+      const last = state.messages[state.messages.length - 1];
+      const finished: Message = {
+        id: last?.streaming ? last.id : action.payload.id,
+        type: 'bot',
+        message: action.payload.message,
+        timestamp: action.payload.timestamp,
+      };
+      return {
+        ...state,
+        messages: last?.streaming
+          ? [...state.messages.slice(0, -1), finished]
+          : [...state.messages, finished],
+      };
+    }
     case 'SET_TYPING':
       return {
         ...state,
@@ -67,6 +110,11 @@ const chatReducer = (state: ChatState, action: ChatAction): ChatState => {
       };
       console.log('📥 chatReducer - LOAD_MESSAGES complete, final count:', loadedState.messages.length);
       return loadedState;
+    case 'PREPEND_MESSAGES':
+      return {
+        ...state,
+        messages: [...action.payload, ...state.messages],
+      };
     case 'SET_CURRENT_CONVERSATION':
       return {
         ...state,
@@ -94,10 +142,13 @@ interface AppContextType {
   // Chat state and actions
   chatState: ChatState;
   addMessage: (message: Omit<Message, 'id'>) => void;
+  appendStreamingToken: (token: string) => void;
+  finishStreamingMessage: (message: string, timestamp: string) => void;
   setTyping: (isTyping: boolean) => void;
   setConnectionStatus: (isConnected: boolean) => void;
   clearMessages: () => void;
   loadMessages: (messages: Message[]) => void;
+  prependMessages: (messages: Message[]) => void;
   setCurrentConversation: (filename: string | undefined) => void;
   
   // Settings state and actions
@@ -146,6 +197,20 @@ export const AppProvider: React.FC<AppProviderProps> = ({ children }) => {
     });
   }, []);
 
+  const appendStreamingToken = useCallback((token: string) => {
+    chatDispatch({
+      type: 'APPEND_STREAMING_TOKEN',
+      payload: { id: generateId(), token, timestamp: new Date().toISOString() },
+    });
+  }, []);
+
+  const finishStreamingMessage = useCallback((message: string, timestamp: string) => {
+    chatDispatch({
+      type: 'FINISH_STREAMING_MESSAGE',
+      payload: { id: generateId(), message, timestamp },
+    });
+  }, []);
+
   const setTyping = useCallback((isTyping: boolean) => {
     chatDispatch({ type: 'SET_TYPING', payload: isTyping });
   }, []);
@@ -162,6 +227,10 @@ export const AppProvider: React.FC<AppProviderProps> = ({ children }) => {
     chatDispatch({ type: 'LOAD_MESSAGES', payload: messages });
   }, []);
 
+  const prependMessages = useCallback((messages: Message[]) => {
+    chatDispatch({ type: 'PREPEND_MESSAGES', payload: messages });
+  }, []);
+
   const setCurrentConversation = useCallback((filename: string | undefined) => {
     chatDispatch({ type: 'SET_CURRENT_CONVERSATION', payload: filename });
     
@@ -181,10 +250,13 @@ export const AppProvider: React.FC<AppProviderProps> = ({ children }) => {
   const contextValue: AppContextType = {
     chatState,
     addMessage,
+    appendStreamingToken,
+    finishStreamingMessage,
     setTyping,
     setConnectionStatus,
     clearMessages,
     loadMessages,
+    prependMessages,
     setCurrentConversation,
     settings,
     updateSettings,
@@ -1,12 +1,16 @@
 import React, { useState, useEffect } from 'react';
 import { apiService } from '@/services/api';
-import { Conversation } from '@/types';
+import { Conversation, ConversationSearchResult } from '@/types';
 import { formatDetailedTimestamp, showToast } from '@/utils';
 
 const ConversationsPage: React.FC = () => {
   const [conversations, setConversations] = useState<Conversation[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [searchQuery, setSearchQuery] = useState('');
+  const [searchResults, setSearchResults] = useState<ConversationSearchResult[] | null>(null);
 
   useEffect(() => {
     const loadConversations = async () => {
@@ -19,6 +23,7 @@ const ConversationsPage: React.FC = () => {
           showToast(response.error, 'error');
         } else if (response.data) {
           setConversations(response.data.conversations || []);
+          setNextCursor(response.data.has_more ? response.data.next_cursor : null);
         }
       } catch (err) {
         console.error('Failed to load conversations:', err);
@@ -32,6 +37,41 @@ const ConversationsPage: React.FC = () => {
     loadConversations();
   }, []);
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await apiService.getConversations({ before: nextCursor });
+      if (response.error) {
+        showToast(response.error, 'error');
+      } else if (response.data) {
+        const page = response.data;
+        setConversations(prev => [...prev, ...page.conversations]);
+        setNextCursor(page.has_more ? page.next_cursor : null);
+      }
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Search as the user types, after a short pause
+  useEffect(() => {
+    const query = searchQuery.trim();
+    if (!query) {
+      setSearchResults(null);
+      return;
+    }
+    const timer = window.setTimeout(async () => {
+      const response = await apiService.searchConversations(query);
+      if (response.error) {
+        showToast(response.error, 'error');
+      } else if (response.data) {
+        setSearchResults(response.data.results);
+      }
+    }, 250);
+    return () => window.clearTimeout(timer);
+  }, [searchQuery]);
+
   const handleDeleteConversation = async (_filename: string) => {
     const confirmed = window.confirm('Are you sure you want to delete this conversation?');
     if (!confirmed) return;
@@ -71,9 +111,32 @@ const ConversationsPage: React.FC = () => {
       <div className="conversations-header">
         <h1>Conversation History</h1>
         <p>Manage your saved Spanish tutoring conversations</p>
+        <input
+          type="search"
+          className="conversations-search"
+          placeholder="Search your conversations..."
+          value={searchQuery}
+          onChange={(e) => setSearchQuery(e.target.value)}
+        />
       </div>
 
-      {conversations.length === 0 ? (
+      {searchResults !== null ? (
+        <div className="search-results">
+          {searchResults.length === 0 ? (
+            <p className="search-empty">No exchanges match "{searchQuery.trim()}"</p>
+          ) : (
+            searchResults.map((result) => (
+              <div key={`${result.file}:${result.position}`} className="search-result">
+                <div className="conversation-date">
+                  {formatDetailedTimestamp(result.session_start)}
+                </div>
+                {/* The snippet is escaped by the server; only <mark> tags are markup */}
+                <p className="search-snippet" dangerouslySetInnerHTML={{ __html: result.snippet }} />
+              </div>
+            ))
+          )}
+        </div>
+      ) : conversations.length === 0 ? (
         <div className="empty-state">
           <div className="empty-icon">📚</div>
           <h3>No conversations yet</h3>
@@ -126,6 +189,13 @@ const ConversationsPage: React.FC = () => {
           ))}
         </div>
       )}
+      {nextCursor && (
+        <div className="conversations-load-more">
+          <button className="btn btn-secondary" onClick={handleLoadMore} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more conversations'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
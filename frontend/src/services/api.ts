@@ -1,8 +1,9 @@
 import axios, { AxiosResponse, AxiosError } from 'axios';
 import type { 
   ApiResponse, 
-  Conversation, 
-  ConversationData
+  ConversationData,
+  ConversationPage,
+  ConversationSearchResponse
 } from '@/types';
 
 // Create axios instance with default config
@@ -69,9 +70,11 @@ export const apiService = {
   },
 
   // Conversations
-  async getConversations(): Promise<ApiResponse<{conversations: Conversation[]; count: number}>> {
+  async getConversations(params?: { limit?: number; before?: string | null }): Promise<ApiResponse<ConversationPage>> {
     try {
-      const response = await api.get('/conversations/list');
+      const response = await api.get('/conversations/list', {
+        params: { limit: params?.limit, before: params?.before || undefined },
+      });
       return { data: response.data, status: response.status };
     } catch (error) {
       const axiosError = error as AxiosError;
@@ -82,9 +85,9 @@ export const apiService = {
     }
   },
 
-  async getLatestConversation(): Promise<ApiResponse<{exists: boolean; filename?: string; session_start?: string; exchanges?: number; conversation?: any[]; user_id?: string; message?: string}>> {
+  async searchConversations(query: string, limit?: number): Promise<ApiResponse<ConversationSearchResponse>> {
     try {
-      const response = await api.get('/conversations/latest');
+      const response = await api.get('/conversations/search', { params: { q: query, limit } });
       return { data: response.data, status: response.status };
     } catch (error) {
       const axiosError = error as AxiosError;
@@ -95,9 +98,22 @@ export const apiService = {
     }
   },
 
-  async getConversation(filename: string): Promise<ApiResponse<ConversationData>> {
+  async getLatestConversation(limit?: number): Promise<ApiResponse<{exists: boolean; filename?: string; session_start?: string; exchanges?: number; conversation?: any[]; offset?: number; user_id?: string; message?: string}>> {
     try {
-      const response = await api.get(`/conversations/${encodeURIComponent(filename)}`);
+      const response = await api.get('/conversations/latest', { params: { limit } });
+      return { data: response.data, status: response.status };
+    } catch (error) {
+      const axiosError = error as AxiosError;
+      return {
+        error: axiosError.message,
+        status: axiosError.response?.status || 500,
+      };
+    }
+  },
+
+  async getConversation(filename: string, window?: { offset?: number; limit?: number }): Promise<ApiResponse<ConversationData>> {
+    try {
+      const response = await api.get(`/conversations/${encodeURIComponent(filename)}`, { params: window });
       return { data: response.data, status: response.status };
     } catch (error) {
       const axiosError = error as AxiosError;
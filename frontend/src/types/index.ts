@@ -5,6 +5,7 @@ export interface Message {
   type: 'user' | 'bot' | 'system';
   message: string;
   timestamp: string;
+  streaming?: boolean;
 }
 
 export interface Conversation {
@@ -38,12 +39,16 @@ export interface SocketEvents {
   // Client to server
   send_message: { message: string };
   new_conversation: void;
-  load_conversation: { filename: string };
+  load_conversation: { filename: string; limit?: number };
+  load_older_messages: { filename: string; before: number; limit?: number };
   set_active_conversation: { filename: string | null };
   
   // Server to client
   user_message: { message: string; timestamp: string };
   bot_message: { message: string; timestamp: string };
+  bot_token: { token: string };
+  bot_message_done: { message: string; timestamp: string };
+  queued: { position: number; timestamp: string };
   system_message: { message: string; timestamp: string };
   connection_status: ConnectionStatus;
   conversation_cleared: { message: string; timestamp: string };
@@ -51,6 +56,15 @@ export interface SocketEvents {
     messages: Array<{ type: string; message: string; timestamp: string }>;
     filename: string;
     count: number;
+    offset?: number;
+    has_more?: boolean;
+  };
+  older_messages_loaded: {
+    messages: Array<{ type: string; message: string; timestamp: string }>;
+    filename: string;
+    offset: number;
+    count: number;
+    has_more: boolean;
   };
   error: { message: string };
 }
@@ -69,6 +83,32 @@ export interface ConversationData {
   }>;
   session_start: string;
   model: string;
+  total_exchanges?: number;
+  offset?: number;
+  limit?: number;
+}
+
+export interface ConversationPage {
+  conversations: Conversation[];
+  count: number;
+  has_more: boolean;
+  next_cursor: string | null;
+}
+
+export interface ConversationSearchResult {
+  file: string;
+  position: number;
+  timestamp: string;
+  session_start: string;
+  snippet: string; // HTML-escaped, with matches wrapped in <mark>
+  score: number;
+}
+
+export interface ConversationSearchResponse {
+  query: string;
+  results: ConversationSearchResult[];
+  count: number;
+  took_ms: number;
 }
 
 
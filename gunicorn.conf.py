@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Gunicorn Configuration for Spanish Tutor
+Production settings: eventlet workers, preloaded app, graceful restarts, no debugger or reloader
+"""
+
+import fcntl
+import multiprocessing
+import os
+
+# The production server never runs the Werkzeug debugger or reloader
+os.environ.setdefault('FLASK_DEBUG', 'false')
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:8080')
+worker_class = os.environ.get('WEB_WORKER_CLASS', 'eventlet')
+# Each eventlet worker serves many connections, so a few workers go a long way
+workers = int(os.environ.get('WEB_WORKERS', str(min(multiprocessing.cpu_count(), 4))))
+worker_connections = int(os.environ.get('WEB_WORKER_CONNECTIONS', '1000'))
+timeout = int(os.environ.get('WEB_TIMEOUT', '60'))
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('WEB_KEEPALIVE', '5'))
+# Recycle workers after this many requests, staggered by the jitter (0 disables)
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.environ.get('WEB_MAX_REQUESTS_JITTER', '50'))
+
+# Import the app once in the master and fork workers from it
+preload_app = True
+reload = False
+
+# Access logs cost a write per request; errors go to stderr, written directly by gunicorn
+accesslog = os.environ.get('WEB_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.environ.get('WEB_LOG_LEVEL', 'info')
+proc_name = 'spanish-tutor'
+
+# Whichever worker holds this lock runs the model keeper and session janitor for all of them
+services_lock = os.environ.get('WEB_SERVICES_LOCK',
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'background-services.lock'))
+services_lock_retry = float(os.environ.get('WEB_SERVICES_LOCK_RETRY', '30'))
+
+if worker_class == 'eventlet':
+    # Patch before the preloaded app creates its locks, sockets and background tasks
+    import eventlet
+    eventlet.monkey_patch()
+
+
+def when_ready(server):
+    if workers > 1 and not os.environ.get('SOCKETIO_MESSAGE_QUEUE'):
+        server.log.warning(
+            "Running %d workers without SOCKETIO_MESSAGE_QUEUE: events emitted by one worker "
+            "won't reach clients connected to another", workers
+        )
+    if workers > 1:
+        server.log.info(
+            "Running %d workers: Socket.IO long-polling needs every request of a session on one worker, "
+            "so clients should connect with the websocket transport only", workers
+        )
+
+
+def post_fork(server, worker):
+    # Pooled database connections opened while preloading belong to the master
+    from web_gui.app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    # Background tasks don't survive fork(), so they start in the workers
+    from web_gui.app import socketio, start_background_services
+    start_background_services(singletons=False)
+    socketio.start_background_task(run_singleton_services, worker)
+
+
+def run_singleton_services(worker):
+    """Start the once-per-deployment services when this worker wins the lock.
+
+    Workers that lose keep retrying, so another one takes over when the
+    holder exits (e.g. after a SIGHUP or max_requests).
+    """
+    from web_gui.app import socketio, start_background_services
+    os.makedirs(os.path.dirname(services_lock), exist_ok=True)
+    lock_file = open(services_lock, 'a')
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except BlockingIOError:
+            socketio.sleep(services_lock_retry)
+    # Held until the worker exits; the kernel releases the lock with the file
+    worker.services_lock_file = lock_file
+    worker.log.info("Worker %s runs the model keeper and session janitor", worker.pid)
+    start_background_services()
@@ -28,7 +28,7 @@ fi
 echo "✅ React build completed"
 echo ""
 
-echo "🚀 Starting Flask production server (port 8080)..."
+echo "🚀 Starting gunicorn production server (port 8080)..."
 echo ""
 echo "🌐 Application will be available at:"
 echo "   Production Server: http://localhost:8080"
@@ -37,16 +37,6 @@ echo "💡 This serves both the React app and API endpoints"
 echo "🛑 Press Ctrl+C to stop the server"
 echo ""
 
-# Function to cleanup on exit
-cleanup() {
-    echo ""
-    echo "🛑 Stopping production server..."
-    echo "✅ Server stopped"
-    exit
-}
-
-# Set trap to cleanup on script exit
-trap cleanup SIGINT SIGTERM
-
-# Start Flask server
-cd web_gui && python app.py
\ No newline at end of file
+# Start gunicorn with eventlet workers (settings in gunicorn.conf.py). exec hands the
+# process over, so Ctrl+C and SIGTERM go straight to start_server.py, which shuts down gracefully
+exec python start_server.py --production
\ No newline at end of file
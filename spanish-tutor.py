@@ -7,24 +7,64 @@ The chatbot helps users practice Spanish conversation and provides translation a
 """
 
 import requests
-import json
 import sys
 import os
 import re
-import glob
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Iterator
+
+from backends import OllamaClient, OllamaBackendPool, BackendLease
+from caching import ResponseCache
+from context import ContextWindow
+from storage import ConversationStore, ConversationSaver, FileConversationStore, InvalidCursor, jsoncodec
 
 class SpanishTutorChatbot:
     def __init__(self, ollama_host: str = "localhost:11434", model: str = "llama2", 
-                 user_info: Dict = None):
+                 user_info: Dict = None, ollama_client: OllamaClient = None,
+                 num_ctx: int = 4096, context_token_budget: int = 2048,
+                 response_cache: ResponseCache = None, backend_pool: OllamaBackendPool = None,
+                 keep_alive: Optional[str] = None, conversation_store: ConversationStore = None,
+                 conversation_saver: ConversationSaver = None):
         self.ollama_host = ollama_host
         self.model = model
         self.base_url = f"http://{ollama_host}/api"
+        # Share a pooled client when one is provided (e.g. by the web app)
+        self.ollama_client = ollama_client or OllamaClient()
+        self.response_cache = response_cache
+        # Route generations across several Ollama hosts when a pool is provided
+        self.backend_pool = backend_pool
+        # How long Ollama should keep the model loaded after each request (e.g. "30m")
+        self.keep_alive = keep_alive
         self.conversation_history = []
         self.current_conversation_file = None
         self.session_start_time = datetime.now()
         
+        # Session metadata of the loaded conversation and how much of the history is saved
+        self.conversation_header = None
+        self.saved_history_ref = None
+        self.saved_exchange_count = 0
+        self.save_lock = threading.Lock()
+        # Saves happen in the background when a write-behind saver is provided
+        self.conversation_saver = conversation_saver
+        # Called with (conversation key, saved exchange count) after saves and conversation switches
+        self.on_conversation_change = None
+        
+        # Keep the most recent exchanges within a token budget, summarizing older ones
+        self.num_ctx = num_ctx
+        self.context_window = ContextWindow(
+            max_tokens=context_token_budget,
+            summarizer=self.summarize_exchanges
+        )
+        
+        # /api/chat messages for the current window, built once and appended to
+        self.chat_messages = []
+        self.chat_history_ref = None
+        self.chat_exchange_count = 0
+        self.chat_window_start = 0
+        self.chat_summary_version = 0
+        
         # Set up user-specific paths
         if user_info:
             self.user_id = user_info["user_id"]
@@ -34,8 +74,8 @@ class SpanishTutorChatbot:
             self.user_id = "legacy"
             self.conversations_dir = "conversations"
         
-        # Create conversations directory if it doesn't exist
-        os.makedirs(self.conversations_dir, exist_ok=True)
+        # Conversation files in conversations_dir unless another store is provided (e.g. the database)
+        self.conversation_store = conversation_store or FileConversationStore(self.conversations_dir)
         
         # System prompt to establish the chatbot's role
         self.system_prompt = """You are a helpful Spanish-English tutoring chatbot. Your role is to:
@@ -52,57 +92,153 @@ You can respond in both English and Spanish as appropriate for the learning cont
 
     def check_ollama_connection(self) -> bool:
         """Check if Ollama is running and accessible."""
-        try:
-            response = requests.get(f"{self.base_url}/tags", timeout=5)
-            return response.status_code == 200
-        except requests.exceptions.RequestException:
-            return False
+        if self.backend_pool is not None:
+            return self.backend_pool.check_connection()
+        return self.ollama_client.check_connection(self.base_url)
+
+    @contextmanager
+    def ollama_backend(self) -> Iterator[BackendLease]:
+        """Reserve the Ollama host to use for one request."""
+        if self.backend_pool is None:
+            yield BackendLease(self.base_url)
+        else:
+            with self.backend_pool.lease() as lease:
+                yield lease
 
-    def build_conversation_context(self, new_message: str) -> str:
-        """Build the full conversation context including history."""
-        context = self.system_prompt + "\n\n"
+    def sync_chat_messages(self) -> List[Dict]:
+        """Bring the cached chat messages up to date with the conversation history.
+
+        New exchanges are appended to the existing list. It is only rebuilt when
+        the history is replaced or shortened (e.g. a conversation is loaded or
+        cleared), or when the context window slides or its summary changes.
+        """
+        history = self.conversation_history
+        window = self.context_window
+        window.sync(history)
+        
+        if (history is not self.chat_history_ref
+                or len(history) < self.chat_exchange_count
+                or window.window_start != self.chat_window_start
+                or window.summary_version != self.chat_summary_version):
+            system_content = self.system_prompt.strip()
+            if window.summary:
+                system_content += f"\n\nSummary of the earlier conversation:\n{window.summary}"
+            
+            self.chat_messages = [{"role": "system", "content": system_content}]
+            self.chat_history_ref = history
+            self.chat_exchange_count = window.window_start
+            self.chat_window_start = window.window_start
+            self.chat_summary_version = window.summary_version
         
-        # Add conversation history
-        for exchange in self.conversation_history:
-            context += f"User: {exchange['user']}\n"
-            context += f"Assistant: {exchange['bot']}\n\n"
+        for exchange in history[self.chat_exchange_count:]:
+            self.chat_messages.append({"role": "user", "content": exchange["user"]})
+            self.chat_messages.append({"role": "assistant", "content": exchange["bot"]})
+        self.chat_exchange_count = len(history)
         
-        # Add the new message
-        context += f"User: {new_message}\n"
-        context += "Assistant:"
+        return self.chat_messages
+
+    def summarize_exchanges(self, previous_summary: str, exchanges: List[Dict]) -> Optional[str]:
+        """Fold exchanges that left the context window into the running summary."""
+        transcript = "\n".join(f"User: {e['user']}\nAssistant: {e['bot']}" for e in exchanges)
+        prompt = (
+            "Summarize this Spanish tutoring conversation in under 150 words. Keep the learner's "
+            "level, topics covered, recurring mistakes and any vocabulary being practiced.\n\n"
+        )
+        if previous_summary:
+            prompt += f"Summary so far:\n{previous_summary}\n\n"
+        prompt += f"New exchanges:\n{transcript}"
         
-        return context
+        with self.ollama_backend() as backend:
+            response = self.ollama_client.post(
+                f"{backend.base_url}/chat",
+                json={
+                    "model": self.model,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "stream": False,
+                    "options": {"temperature": 0.2, "num_ctx": self.num_ctx}
+                }
+            )
+            if response.status_code >= 500:
+                backend.mark_failed()
+        if response.status_code != 200:
+            return None
+        return response.json().get("message", {}).get("content", "").strip()
+
+    def build_chat_payload(self, message: str, stream: bool = False) -> Dict:
+        """Build the /api/chat request body for a new user message.
+
+        The message list keeps a stable prefix across turns, so Ollama can reuse
+        its cached prompt and only prefill the new user turn.
+        """
+        payload = {
+            "model": self.model,
+            "messages": self.sync_chat_messages() + [{"role": "user", "content": message}],
+            "stream": stream,
+            "options": {
+                "temperature": 0.7,
+                "num_ctx": self.num_ctx
+            }
+        }
+        if self.keep_alive:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def record_exchange(self, message: str, bot_response: str) -> None:
+        """Append a completed exchange to the history and persist it."""
+        exchange = {"user": message, "bot": bot_response, "timestamp": datetime.now().isoformat()}
+        self.conversation_history.append(exchange)
+        self.request_save()
+    
+    def request_save(self) -> None:
+        """Save the conversation, in the background if a saver is configured."""
+        if self.conversation_saver is not None:
+            self.conversation_saver.schedule(self)
+        else:
+            self.save_conversation()
+    
+    def flush_save(self) -> bool:
+        """Write any pending background save now. Returns False if the conversation could not be saved."""
+        if self.conversation_saver is not None and not self.conversation_saver.flush(self):
+            return False
+        # Also covers a save in progress on the worker (this waits for it) and one that
+        # failed earlier; a no-op when nothing has changed since the last save
+        return self.save_conversation()
+
+    def get_cache_key(self, message: str) -> Optional[str]:
+        """Get the response cache key for a message in the current context, if caching is enabled."""
+        if self.response_cache is None:
+            return None
+        return self.response_cache.make_key(self.model, message, self.sync_chat_messages())
 
     def send_message(self, message: str) -> Optional[str]:
         """Send a message to Ollama and get the response with full conversation context."""
+        cache_key = self.get_cache_key(message)
+        if cache_key:
+            cached_response = self.response_cache.get(cache_key)
+            if cached_response is not None:
+                self.record_exchange(message, cached_response)
+                return cached_response
+
         try:
-            # Build full conversation context
-            full_context = self.build_conversation_context(message)
-
-            payload = {
-                "model": self.model,
-                "prompt": full_context,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "num_ctx": 4096  # Increase context window for longer conversations
-                }
-            }
+            payload = self.build_chat_payload(message)
 
-            response = requests.post(
-                f"{self.base_url}/generate",
-                json=payload,
-                timeout=30
-            )
+            with self.ollama_backend() as backend:
+                response = self.ollama_client.post(
+                    f"{backend.base_url}/chat",
+                    json=payload
+                )
+                if response.status_code >= 500:
+                    backend.mark_failed()
 
             if response.status_code == 200:
                 result = response.json()
-                bot_response = result.get("response", "").strip()
+                bot_response = result.get("message", {}).get("content", "").strip()
+                
+                if cache_key and bot_response:
+                    self.response_cache.put(cache_key, bot_response)
                 
                 # Store conversation history
-                exchange = {"user": message, "bot": bot_response, "timestamp": datetime.now().isoformat()}
-                self.conversation_history.append(exchange)
-                self.save_conversation()
+                self.record_exchange(message, bot_response)
                 return bot_response
             else:
                 return f"Error: Received status code {response.status_code}"
@@ -110,56 +246,156 @@ You can respond in both English and Spanish as appropriate for the learning cont
         except requests.exceptions.RequestException as e:
             return f"Error connecting to Ollama: {str(e)}"
 
+    def stream_message(self, message: str) -> Iterator[str]:
+        """Stream the response to a message chunk by chunk as Ollama generates it.
+
+        The exchange is stored and saved once the final chunk arrives. Errors are
+        yielded as a single chunk, mirroring the strings returned by send_message.
+        Cached responses are yielded whole.
+        """
+        cache_key = self.get_cache_key(message)
+        if cache_key:
+            cached_response = self.response_cache.get(cache_key)
+            if cached_response is not None:
+                yield cached_response
+                self.record_exchange(message, cached_response)
+                return
+
+        try:
+            payload = self.build_chat_payload(message, stream=True)
+
+            # The read timeout applies between chunks, not to the whole reply
+            with self.ollama_backend() as backend, self.ollama_client.post(
+                f"{backend.base_url}/chat",
+                json=payload,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    if response.status_code >= 500:
+                        backend.mark_failed()
+                    yield f"Error: Received status code {response.status_code}"
+                    return
+
+                chunks = []
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    try:
+                        result = jsoncodec.loads(line)
+                    except jsoncodec.JSONDecodeError:
+                        # A truncated or garbled line ends the reply like any other failure
+                        yield "Error: Received a malformed response from Ollama"
+                        return
+                    if result.get("error"):
+                        # A model-level error (e.g. model not found) says nothing about the host's health
+                        yield f"Error: {result['error']}"
+                        return
+
+                    chunk = result.get("message", {}).get("content", "")
+                    if chunk:
+                        # Drop leading whitespace so the reply matches send_message
+                        if not chunks:
+                            chunk = chunk.lstrip()
+                        if chunk:
+                            chunks.append(chunk)
+                            yield chunk
+
+                    if result.get("done"):
+                        break
+
+            bot_response = "".join(chunks).strip()
+            if cache_key and bot_response:
+                self.response_cache.put(cache_key, bot_response)
+            self.record_exchange(message, bot_response)
+
+        except requests.exceptions.RequestException as e:
+            yield f"Error connecting to Ollama: {str(e)}"
+
 
     
-    def get_conversation_filename(self, timestamp: datetime = None) -> str:
-        """Generate a filename for conversation storage."""
-        if timestamp is None:
-            timestamp = self.session_start_time
-        return f"{self.conversations_dir}/conversation_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
+    def save_conversation(self) -> bool:
+        """Save current conversation, appending only exchanges not yet saved.
+
+        Returns False if the save failed, True otherwise (including when there was nothing to save).
+        """
+        with self.save_lock:
+            history = self.conversation_history
+            # Snapshot the length; another thread may record an exchange meanwhile
+            count = len(history)
+            if not count:
+                return True
+            if (self.current_conversation_file is not None and history is self.saved_history_ref
+                    and count == self.saved_exchange_count):
+                return True  # Nothing new since the last save
+            
+            if self.current_conversation_file is None:
+                self.current_conversation_file = self.conversation_store.new_key(self.session_start_time)
+                self.conversation_header = None
+            
+            try:
+                header = self.conversation_header or {}
+                session_start = header.get("session_start", self.session_start_time.isoformat())
+                model = header.get("model", self.model)
+                
+                if history is self.saved_history_ref and count >= self.saved_exchange_count:
+                    self.current_conversation_file = self.conversation_store.append(
+                        self.current_conversation_file, session_start, model, history[:count], self.saved_exchange_count
+                    )
+                else:
+                    # New, cleared or replaced history
+                    self.current_conversation_file = self.conversation_store.write(
+                        self.current_conversation_file, session_start, model, history[:count]
+                    )
+                
+                self.conversation_header = {"session_start": session_start, "model": model}
+                self.saved_history_ref = history
+                self.saved_exchange_count = count
+            except Exception as e:
+                print(f"⚠️ Could not save conversation: {str(e)}")
+                return False
+            self.notify_conversation_change()
+            return True
     
-    def save_conversation(self) -> None:
-        """Save current conversation to JSON file."""
-        if not self.conversation_history:
+    def notify_conversation_change(self) -> None:
+        """Report the active conversation and how many of its exchanges are saved to ``on_conversation_change``."""
+        if self.on_conversation_change is None:
             return
-        
-        if self.current_conversation_file is None:
-            self.current_conversation_file = self.get_conversation_filename()
-        
-        conversation_data = {
-            "session_start": self.session_start_time.isoformat(),
-            "model": self.model,
-            "conversation": self.conversation_history
-        }
-        
+        exchanges = self.saved_exchange_count if self.current_conversation_file else 0
         try:
-            with open(self.current_conversation_file, "w", encoding="utf-8") as f:
-                json.dump(conversation_data, f, indent=2, ensure_ascii=False)
+            self.on_conversation_change(self.current_conversation_file, exchanges)
         except Exception as e:
-            print(f"⚠️ Could not save conversation: {str(e)}")
+            print(f"⚠️ Could not report conversation change: {str(e)}")
     
     def load_latest_conversation(self) -> bool:
         """Load the most recent conversation on startup."""
         try:
-            conversation_files = glob.glob(f"{self.conversations_dir}/conversation_*.json")
-            if not conversation_files:
+            latest = self.conversation_store.latest()
+            if latest is None:
                 return False
             
             # Get the most recent file
-            latest_file = max(conversation_files, key=os.path.getmtime)
-            return self.load_conversation(latest_file)
+            return self.load_conversation(latest["file"])
         except Exception as e:
             print(f"⚠️ Could not load latest conversation: {str(e)}")
             return False
     
     def load_conversation(self, filename: str) -> bool:
-        """Load a specific conversation from file."""
+        """Load a specific conversation by file name."""
+        # Don't let a pending save of the current conversation land after the switch
+        self.flush_save()
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            key = self.conversation_store.resolve(filename)
+            if key is None:
+                print(f"⚠️ Conversation not found: {filename}")
+                return False
+            data = self.conversation_store.read(key)
             
             self.conversation_history = data.get("conversation", [])
-            self.current_conversation_file = filename
+            self.current_conversation_file = key
+            self.conversation_header = {"session_start": data.get("session_start"), "model": data.get("model")}
+            self.saved_history_ref = self.conversation_history
+            self.saved_exchange_count = len(self.conversation_history)
+            self.notify_conversation_change()
             
             # Extract session info
             session_start = data.get("session_start", "")
@@ -172,30 +408,62 @@ You can respond in both English and Spanish as appropriate for the learning cont
             print(f"⚠️ Could not load conversation from {filename}: {str(e)}")
             return False
     
-    def list_conversations(self) -> List[Dict]:
-        """List all saved conversations with metadata."""
-        conversations = []
+    def estimate_memory(self) -> int:
+        """Roughly estimate the bytes held by the conversation history and the chat context built from it."""
+        # Dicts, string headers and the list slot of each exchange or message
+        overhead = 300
+        history = sum(len(e.get("user", "")) + len(e.get("bot", "")) + overhead for e in self.conversation_history)
+        messages = sum(len(m.get("content", "")) + overhead for m in self.chat_messages)
+        return history + messages
+    
+    def get_current_conversation(self, filename: Optional[str] = None) -> Optional[Dict]:
+        """Get the active conversation from memory when it matches what is saved on disk.
+
+        Returns None if there is no active conversation, it is not ``filename``,
+        or it has exchanges that are not written yet; callers then read the file.
+        """
+        if self.current_conversation_file is None or self.conversation_header is None:
+            return None
+        if filename and os.path.basename(filename) != os.path.basename(self.current_conversation_file):
+            return None
+        history = self.conversation_history
+        if history is not self.saved_history_ref or len(history) != self.saved_exchange_count:
+            return None
+        
+        header = self.conversation_header
+        return {
+            "session_start": header.get("session_start", self.session_start_time.isoformat()),
+            "model": header.get("model", self.model),
+            "conversation": history
+        }
+    
+    def list_conversations(self, limit: Optional[int] = None, before: Optional[str] = None,
+                           validate: bool = True) -> List[Dict]:
+        """List saved conversations with metadata, newest first.
+
+        Pass the ``cursor`` of the last conversation of a page as ``before`` to get the next page;
+        a malformed cursor raises InvalidCursor.
+        With ``validate=False`` the index is trusted without checking the directory for outside changes.
+        """
         try:
-            conversation_files = glob.glob(f"{self.conversations_dir}/conversation_*.json")
-            
-            for file_path in sorted(conversation_files, key=os.path.getmtime, reverse=True):
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    
-                    conversations.append({
-                        "file": file_path,
-                        "session_start": data.get("session_start", "unknown"),
-                        "model": data.get("model", "unknown"),
-                        "exchanges": len(data.get("conversation", [])),
-                        "file_size": os.path.getsize(file_path)
-                    })
-                except Exception:
-                    continue
+            return self.conversation_store.list(limit=limit, before=before, validate=validate)
+        except InvalidCursor:
+            raise
         except Exception as e:
             print(f"⚠️ Error listing conversations: {str(e)}")
-        
-        return conversations
+            return []
+    
+    def search_conversations(self, query: str, limit: int = 20) -> List[Dict]:
+        """Search saved conversations for exchanges containing ``query``, best matches first.
+
+        Pending write-behind saves are flushed first, so the latest exchanges are searchable.
+        """
+        try:
+            self.flush_save()
+            return self.conversation_store.search(query, limit=limit)
+        except Exception as e:
+            print(f"⚠️ Error searching conversations: {str(e)}")
+            return []
     
     def display_conversations(self) -> None:
         """Display list of saved conversations."""
@@ -217,9 +485,12 @@ You can respond in both English and Spanish as appropriate for the learning cont
     
     def start_new_conversation(self) -> None:
         """Start a fresh conversation session."""
+        self.flush_save()
         self.conversation_history = []
         self.current_conversation_file = None
+        self.conversation_header = None
         self.session_start_time = datetime.now()
+        self.notify_conversation_change()
         print("🆕 Started new conversation session!")
 
     def display_welcome(self):
@@ -239,6 +510,8 @@ You can respond in both English and Spanish as appropriate for the learning cont
         print("• Type 'conversations' to list saved conversations")
         print("• Type 'load <number>' to load a specific conversation")
         print("• Type 'new' to start a fresh conversation")
+        print("• Type 'reindex' to rebuild the saved conversations index")
+        print("• Type 'archive <days>' to compress conversations older than <days>")
         print("=" * 60)
 
     def handle_special_commands(self, user_input: str) -> bool:
@@ -286,6 +559,24 @@ You can respond in both English and Spanish as appropriate for the learning cont
                 print("❌ Usage: load <number> (e.g., 'load 1')")
             return False
         
+        elif user_input_lower == 'reindex':
+            count = self.conversation_store.rebuild_index()
+            print(f"🗂️ Rebuilt conversation index ({count} conversations)")
+            return False
+        
+        elif user_input_lower == 'archive' or user_input_lower.startswith('archive '):
+            if not hasattr(self.conversation_store, 'archive'):
+                print("❌ This conversation store doesn't support archiving")
+                return False
+            try:
+                days = float(user_input_lower.split()[1]) if len(user_input_lower.split()) > 1 else 30
+            except ValueError:
+                print("❌ Usage: archive <days> (e.g., 'archive 30')")
+                return False
+            stats = self.conversation_store.archive(days)
+            print(f"🗜️ Archived {stats['archived']} conversations, reclaimed {stats['bytes_reclaimed'] / 1024:.1f} KB")
+            return False
+        
         elif user_input_lower in ['new', 'nuevo', 'fresh']:
             self.start_new_conversation()
             return False
@@ -323,12 +614,17 @@ You can respond in both English and Spanish as appropriate for the learning cont
                 if self.handle_special_commands(user_input):
                     break
                 
-                # Send message to Ollama
+                # Stream the reply from Ollama as it is generated
                 print("🤖 Thinking...")
-                response = self.send_message(user_input)
+                received = False
+                for chunk in self.stream_message(user_input):
+                    if not received:
+                        print("Tutor: ", end="", flush=True)
+                        received = True
+                    print(chunk, end="", flush=True)
                 
-                if response:
-                    print(f"Tutor: {response}\n")
+                if received:
+                    print("\n")
                 else:
                     print("❌ Sorry, I couldn't process your message. Please try again.\n")
 
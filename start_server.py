@@ -2,8 +2,12 @@
 """
 Robust Flask server startup script
 Keeps the server running with automatic restart on crashes
+
+Run with --production to serve through gunicorn with eventlet workers
+(see gunicorn.conf.py) instead of the development server.
 """
 
+import argparse
 import os
 import sys
 import time
@@ -15,56 +19,67 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-def start_flask_server():
+def server_command(production=False):
+    """Command line for the development server, or gunicorn in production"""
+    if production:
+        return [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "web_gui.app:app"]
+    return [sys.executable, "-m", "web_gui.app"]
+
+def start_flask_server(production=False):
     """Start the Flask server process"""
-    print("🚀 Starting Spanish Tutor Flask Server...")
+    print(f"🚀 Starting Spanish Tutor Flask Server{' (production)' if production else ''}...")
     
     # Change to project directory
     os.chdir(project_root)
     
-    # Start the Flask server
-    process = subprocess.Popen([
-        sys.executable, "-m", "web_gui.app"
-    ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+    # The server writes its logs straight to our stdout/stderr rather than through this process.
+    # Its own session keeps Ctrl+C from reaching it directly, so shutdown goes through signal_handler.
+    process = subprocess.Popen(server_command(production), start_new_session=True)
     
     return process
 
-def monitor_server():
+def monitor_server(production=False):
     """Monitor and restart Flask server if it crashes"""
     server_process = None
     restart_count = 0
     max_restarts = 5
+    shutting_down = False
     
     def signal_handler(signum, frame):
+        nonlocal shutting_down
         print(f"\n🛑 Received signal {signum}, shutting down...")
-        if server_process:
-            server_process.terminate()
-            server_process.wait()
-        sys.exit(0)
+        shutting_down = True
+        if server_process is None:
+            sys.exit(0)
+        # gunicorn finishes in-flight requests on SIGTERM; the wait below returns once it exits
+        server_process.terminate()
+    
+    def reload_handler(signum, frame):
+        if server_process and production:
+            print("🔄 Gracefully restarting workers...")
+            server_process.send_signal(signal.SIGHUP)
     
     # Handle Ctrl+C gracefully
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
+    # SIGHUP replaces gunicorn's workers one by one without dropping connections
+    signal.signal(signal.SIGHUP, reload_handler)
     
     while restart_count < max_restarts:
         try:
-            server_process = start_flask_server()
+            server_process = start_flask_server(production)
             print(f"✅ Flask server started with PID: {server_process.pid}")
-            print("🌐 Server should be available at: http://localhost:8080")
+            print(f"🌐 Server should be available at: http://{os.environ.get('WEB_BIND', 'localhost:8080') if production else 'localhost:8080'}")
             print("🔧 Press Ctrl+C to stop the server")
+            if production:
+                print(f"🔁 Send SIGHUP to {os.getpid()} for a graceful restart")
             
-            # Monitor the process
-            while True:
-                output = server_process.stdout.readline()
-                if output:
-                    print(output.strip())
-                
-                # Check if process is still running
-                if server_process.poll() is not None:
-                    print(f"⚠️  Flask server process ended with code: {server_process.returncode}")
-                    break
-                
-                time.sleep(0.1)
+            # Wait for the process to exit
+            server_process.wait()
+            if shutting_down:
+                print("✅ Server stopped")
+                sys.exit(0)
+            print(f"⚠️  Flask server process ended with code: {server_process.returncode}")
             
             # If we get here, the process ended
             restart_count += 1
@@ -82,6 +97,12 @@ def monitor_server():
                 time.sleep(5)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Spanish Tutor server and restart it if it crashes")
+    parser.add_argument("--production", action="store_true",
+                        default=os.environ.get("SERVER_MODE", "").lower() == "production",
+                        help="Serve with gunicorn and eventlet workers instead of the development server")
+    args = parser.parse_args()
+    
     print("🎓 Spanish Tutor Server Monitor")
     print("=" * 50)
-    monitor_server()
\ No newline at end of file
+    monitor_server(args.production)
\ No newline at end of file
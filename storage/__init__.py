@@ -0,0 +1,12 @@
+from storage.conversationlog import (
+    ConversationLog,
+    read_conversation,
+    find_conversation_files,
+    resolve_conversation_path,
+    write_file_atomic
+)
+from storage.conversationarchive import archive_conversation, archive_conversations
+from storage.conversationindex import ConversationIndex
+from storage.conversationstore import ConversationStore, InvalidCursor, make_cursor, parse_cursor
+from storage.fileconversationstore import FileConversationStore
+from storage.conversationsaver import ConversationSaver
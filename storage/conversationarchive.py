@@ -0,0 +1,64 @@
+import gzip
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from storage import jsoncodec
+from storage.conversationlog import (
+    ARCHIVE_EXTENSION,
+    conversation_stem,
+    find_conversation_files,
+    read_conversation,
+    write_file_atomic
+)
+
+
+def archive_conversation(path: str, compress_level: int = 6) -> str:
+    """Rewrite a conversation file as gzipped compact JSON and remove the original.
+
+    The archive keeps the original modification time, so conversation
+    ordering doesn't change. Returns the archive's path.
+    """
+    data = read_conversation(path)
+    archive_path = conversation_stem(path) + ARCHIVE_EXTENSION
+
+    # mtime=0 keeps the gzip output deterministic for identical conversations
+    write_file_atomic(archive_path, gzip.compress(jsoncodec.dumps_bytes(data), compresslevel=compress_level, mtime=0))
+    stat = os.stat(path)
+    os.utime(archive_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.remove(path)
+    return archive_path
+
+
+def archive_conversations(conversations_dir: str, max_age_days: float,
+                          on_archived: Optional[Callable[[str, str], None]] = None) -> Dict:
+    """Archive every conversation in a directory untouched for ``max_age_days``.
+
+    ``on_archived(old_path, new_path)`` is called for each archived file, e.g.
+    to update an index. Returns the number of files archived and the bytes
+    they took before and after.
+    """
+    stats = {"archived": 0, "failed": 0, "bytes_before": 0, "bytes_after": 0}
+    cutoff = time.time() - max_age_days * 86400
+
+    for path in find_conversation_files(conversations_dir):
+        if path.endswith(ARCHIVE_EXTENSION):
+            continue
+        try:
+            stat = os.stat(path)
+            if stat.st_mtime > cutoff:
+                continue
+            archive_path = archive_conversation(path)
+        except Exception as e:
+            print(f"⚠️ Could not archive {path}: {str(e)}")
+            stats["failed"] += 1
+            continue
+
+        stats["archived"] += 1
+        stats["bytes_before"] += stat.st_size
+        stats["bytes_after"] += os.path.getsize(archive_path)
+        if on_archived:
+            on_archived(path, archive_path)
+
+    stats["bytes_reclaimed"] = stats["bytes_before"] - stats["bytes_after"]
+    return stats
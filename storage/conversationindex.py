@@ -0,0 +1,217 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from background import run_blocking
+from storage.conversationlog import conversation_stem, find_conversation_files, read_conversation
+from storage.conversationstore import make_cursor, parse_cursor
+from storage.conversationsearch import (
+    FTS_TOKENIZER,
+    SNIPPET_END,
+    SNIPPET_START,
+    SNIPPET_TOKENS,
+    build_match_query,
+    format_snippet
+)
+
+INDEX_FILENAME = ".conversation_index.sqlite3"
+# Bumped when the schema gains data that existing indexes lack; forces a re-index
+SCHEMA_VERSION = 2
+
+
+class ConversationIndex:
+    """Per-user SQLite index of conversation metadata.
+
+    Saves update the index incrementally, so listing conversations is a single
+    indexed query instead of opening and parsing every file. Before listing,
+    the index is validated against file mtimes and sizes (a directory scan,
+    no parsing) and only new or externally modified files are re-read.
+
+    Exchange text is also kept in an FTS5 table for full-text search, updated
+    with the same incremental saves.
+    """
+
+    def __init__(self, conversations_dir: str):
+        self.conversations_dir = conversations_dir
+        self.db_path = os.path.join(conversations_dir, INDEX_FILENAME)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                file TEXT PRIMARY KEY,
+                session_start TEXT,
+                model TEXT,
+                exchanges INTEGER NOT NULL,
+                file_size INTEGER NOT NULL,
+                mtime REAL NOT NULL
+            )
+        """)
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_conversations_mtime_file ON conversations (mtime DESC, file DESC)"
+        )
+        self.connection.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS exchanges_fts USING fts5(
+                user, bot, file UNINDEXED, position UNINDEXED, timestamp UNINDEXED,
+                tokenize = '{FTS_TOKENIZER}'
+            )
+        """)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Forget indexed files so the next validation re-reads them into the new tables
+            self.connection.execute("DELETE FROM conversations")
+            self.connection.execute("DELETE FROM exchanges_fts")
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        run_blocking(self.connection.commit)
+
+    def update(self, path: str, session_start: str, model: str, exchanges: int,
+               new_exchanges: Optional[List[Dict]] = None, start: int = 0) -> None:
+        """Record the metadata of a conversation file that was just written.
+
+        ``new_exchanges`` are added to the search index at positions from
+        ``start``; with ``start=0`` the file's previous entries are replaced.
+        """
+        stat = os.stat(path)
+        file = os.path.basename(path)
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO conversations (file, session_start, model, exchanges, file_size, mtime) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (file, session_start, model, exchanges, stat.st_size, stat.st_mtime)
+            )
+            if new_exchanges is not None:
+                if start == 0:
+                    self.connection.execute("DELETE FROM exchanges_fts WHERE file = ?", (file,))
+                self.connection.executemany(
+                    "INSERT INTO exchanges_fts (user, bot, file, position, timestamp) VALUES (?, ?, ?, ?, ?)",
+                    [(exchange.get("user", ""), exchange.get("bot", ""), file, position, exchange.get("timestamp"))
+                     for position, exchange in enumerate(new_exchanges, start)]
+                )
+            run_blocking(self.connection.commit)
+
+    def remove(self, path: str) -> None:
+        """Drop a conversation file from the index."""
+        file = os.path.basename(path)
+        with self.lock:
+            self.connection.execute("DELETE FROM conversations WHERE file = ?", (file,))
+            self.connection.execute("DELETE FROM exchanges_fts WHERE file = ?", (file,))
+            run_blocking(self.connection.commit)
+
+    def index_file(self, path: str) -> bool:
+        """Parse a conversation file and index it. Returns False if it could not be read."""
+        try:
+            data = read_conversation(path)
+        except Exception:
+            self.remove(path)
+            return False
+        exchanges = data.get("conversation", [])
+        self.update(path, data.get("session_start", "unknown"), data.get("model", "unknown"),
+                    len(exchanges), exchanges)
+        return True
+
+    def validate(self) -> None:
+        """Re-index files that are new or changed on disk and forget deleted ones."""
+        on_disk = {}
+        for path in find_conversation_files(self.conversations_dir):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            on_disk[os.path.basename(path)] = (path, stat.st_mtime, stat.st_size)
+
+        with self.lock:
+            indexed = {
+                file: (mtime, file_size)
+                for file, mtime, file_size in self.connection.execute("SELECT file, mtime, file_size FROM conversations")
+            }
+            missing = [file for file in indexed if file not in on_disk]
+            if missing:
+                self.connection.executemany("DELETE FROM conversations WHERE file = ?", [(file,) for file in missing])
+                self.connection.executemany("DELETE FROM exchanges_fts WHERE file = ?", [(file,) for file in missing])
+                run_blocking(self.connection.commit)
+
+        for file, (path, mtime, file_size) in on_disk.items():
+            if indexed.get(file) != (mtime, file_size):
+                self.index_file(path)
+
+    def rebuild(self) -> int:
+        """Rebuild the index from scratch. Returns the number of conversations indexed."""
+        with self.lock:
+            self.connection.execute("DELETE FROM conversations")
+            self.connection.execute("DELETE FROM exchanges_fts")
+            run_blocking(self.connection.commit)
+        return sum(1 for path in find_conversation_files(self.conversations_dir) if self.index_file(path))
+
+    def list(self, limit: Optional[int] = None, before: Optional[str] = None,
+             validate: bool = True) -> List[Dict]:
+        """List conversations, most recently modified first.
+
+        ``before`` is the ``cursor`` of the last conversation on the previous
+        page, its (mtime, filename) pair. Only conversations ordered after it
+        are returned, even if that file has since been deleted or archived.
+        The filename is kept without its extension, which sorts before every
+        format of the same conversation, so an archived copy isn't listed again.
+        """
+        if validate:
+            self.validate()
+
+        query = "SELECT file, session_start, model, exchanges, file_size, mtime FROM conversations"
+        params = []
+        if before:
+            mtime, file = parse_cursor(before, float)
+            query += " WHERE (mtime, file) < (?, ?)"
+            params.extend([mtime, os.path.basename(file)])
+        query += " ORDER BY mtime DESC, file DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+        return [{
+            "file": os.path.join(self.conversations_dir, file),
+            "session_start": session_start,
+            "model": model,
+            "exchanges": exchanges,
+            "file_size": file_size,
+            "cursor": make_cursor(repr(mtime), conversation_stem(file))
+        } for file, session_start, model, exchanges, file_size, mtime in rows]
+
+    def count(self) -> int:
+        """Count indexed conversations."""
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+    def latest(self, validate: bool = True) -> Optional[Dict]:
+        """Get the most recently modified conversation, if any."""
+        conversations = self.list(limit=1, validate=validate)
+        return conversations[0] if conversations else None
+
+    def search(self, text: str, limit: int = 20, validate: bool = True) -> List[Dict]:
+        """Find exchanges matching ``text``, best matches first, with highlighted snippets."""
+        match = build_match_query(text)
+        if match is None:
+            return []
+        if validate:
+            self.validate()
+
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT f.file, f.position, f.timestamp, c.session_start, "
+                "snippet(exchanges_fts, -1, ?, ?, '…', ?), bm25(exchanges_fts) "
+                "FROM exchanges_fts f JOIN conversations c ON c.file = f.file "
+                "WHERE exchanges_fts MATCH ? ORDER BY bm25(exchanges_fts) LIMIT ?",
+                (SNIPPET_START, SNIPPET_END, SNIPPET_TOKENS, match, limit)
+            ).fetchall()
+        return [{
+            "file": os.path.join(self.conversations_dir, file),
+            "position": int(position),
+            "timestamp": timestamp,
+            "session_start": session_start,
+            "snippet": format_snippet(snippet),
+            "score": round(-score, 4)
+        } for file, position, timestamp, session_start, snippet, score in rows]
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,184 @@
+import glob
+import gzip
+import os
+import tempfile
+from typing import Dict, List, Optional, Union
+
+from background import run_blocking
+from storage import jsoncodec
+
+LOG_EXTENSION = ".jsonl"
+LEGACY_EXTENSION = ".json"
+ARCHIVE_EXTENSION = ".json.gz"
+FORMAT_VERSION = 1
+
+
+def write_file_atomic(path: str, data: Union[str, bytes]) -> None:
+    """Write a file via a synced temp file and rename, so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=os.path.basename(path))
+    try:
+        if isinstance(data, bytes):
+            f = os.fdopen(fd, "wb")
+        else:
+            f = os.fdopen(fd, "w", encoding="utf-8")
+        with f:
+            f.write(data)
+            f.flush()
+            run_blocking(os.fsync, f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory: str) -> None:
+    # Persist the rename itself; not supported on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        run_blocking(os.fsync, fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def find_conversation_files(conversations_dir: str) -> List[str]:
+    """Find conversation files in the append-only, legacy and archived formats."""
+    return [
+        path
+        for extension in (LOG_EXTENSION, LEGACY_EXTENSION, ARCHIVE_EXTENSION)
+        for path in glob.glob(os.path.join(conversations_dir, f"conversation_*{extension}"))
+    ]
+
+
+def conversation_stem(path: str) -> str:
+    """Strip the conversation file extension, whichever format it is in."""
+    for extension in (ARCHIVE_EXTENSION, LOG_EXTENSION, LEGACY_EXTENSION):
+        if path.endswith(extension):
+            return path[:-len(extension)]
+    return path
+
+
+def resolve_conversation_path(path: str) -> Optional[str]:
+    """Find the file for a conversation path, following conversions to the log format and archiving."""
+    if os.path.exists(path):
+        return path
+    stem = conversation_stem(path)
+    for extension in (LOG_EXTENSION, ARCHIVE_EXTENSION):
+        if os.path.exists(stem + extension):
+            return stem + extension
+    return None
+
+
+def read_conversation(path: str) -> Dict:
+    """Read a conversation file in either format.
+
+    Returns the same shape as the legacy JSON files:
+    ``{"session_start": ..., "model": ..., "conversation": [...]}``.
+    """
+    if path.endswith(LOG_EXTENSION):
+        return ConversationLog(path).read()
+    if path.endswith(ARCHIVE_EXTENSION):
+        with gzip.open(path, "rb") as f:
+            return jsoncodec.loads(f.read())
+    with open(path, "rb") as f:
+        return jsoncodec.loads(f.read())
+
+
+class ConversationLog:
+    """Append-only conversation file.
+
+    The file holds one JSON record per line: a header record with the session
+    metadata followed by one record per exchange. Saving a new exchange appends
+    a single line and fsyncs, so the cost per turn is independent of the
+    history size. A torn final line left by a crash is ignored when reading,
+    and the file is periodically compacted back into canonical form with an
+    atomic rewrite.
+    """
+
+    def __init__(self, path: str, compact_every: int = 500):
+        self.path = path
+        self.compact_every = compact_every
+        self.appends_since_compaction = 0
+        self.needs_compaction = False
+        self.header = None
+
+    @staticmethod
+    def header_record(session_start: str, model: str) -> Dict:
+        return {"type": "header", "version": FORMAT_VERSION, "session_start": session_start, "model": model}
+
+    @staticmethod
+    def exchange_record(exchange: Dict) -> Dict:
+        return {"type": "exchange", **exchange}
+
+    def read(self) -> Dict:
+        """Read the header and exchanges, skipping a torn or corrupt final line."""
+        header = {}
+        exchanges = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+
+        for index, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                record = jsoncodec.loads(line)
+            except jsoncodec.JSONDecodeError:
+                if index == len(lines) - 1:
+                    # Partial write from a crash; rewrite the file on next save
+                    self.needs_compaction = True
+                    continue
+                raise
+
+            record_type = record.pop("type", "exchange")
+            if record_type == "header":
+                header = record
+            else:
+                exchanges.append(record)
+
+        if lines and not lines[-1].endswith("\n"):
+            self.needs_compaction = True
+
+        self.header = header
+        return {
+            "session_start": header.get("session_start", "unknown"),
+            "model": header.get("model", "unknown"),
+            "conversation": exchanges
+        }
+
+    def append(self, exchanges: List[Dict]) -> None:
+        """Append exchanges to the log and sync them to disk."""
+        if not exchanges:
+            return
+        lines = "".join(jsoncodec.dumps(self.exchange_record(e)) + "\n" for e in exchanges)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            run_blocking(os.fsync, f.fileno())
+        self.appends_since_compaction += len(exchanges)
+
+    def write(self, session_start: str, model: str, exchanges: List[Dict]) -> None:
+        """Atomically rewrite the whole log (used for new files and compaction)."""
+        if self.header:
+            # Keep the original session metadata of an existing conversation
+            session_start = self.header.get("session_start", session_start)
+            model = self.header.get("model", model)
+        header = self.header_record(session_start, model)
+
+        lines = [jsoncodec.dumps(header)]
+        lines.extend(jsoncodec.dumps(self.exchange_record(e)) for e in exchanges)
+        write_file_atomic(self.path, "\n".join(lines) + "\n")
+
+        header.pop("type")
+        self.header = header
+        self.appends_since_compaction = 0
+        self.needs_compaction = False
+
+    def should_compact(self) -> bool:
+        return self.needs_compaction or self.appends_since_compaction >= self.compact_every
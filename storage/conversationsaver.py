@@ -0,0 +1,108 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from background import PeriodicTask
+
+
+class ConversationSaver(PeriodicTask):
+    """Write-behind persistence for conversations.
+
+    Chatbots mark themselves dirty with ``schedule()`` and return to the
+    caller immediately; a background worker wakes every ``delay`` seconds and
+    saves each dirty chatbot once, so several exchanges recorded in quick
+    succession are written together. ``flush()`` saves synchronously, e.g.
+    before a chatbot is dropped or the process exits.
+    """
+
+    def __init__(self, delay: float = 0.5, spawn: Optional[Callable] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        super().__init__(delay, spawn, sleep)
+        # Dirty chatbots in the order they were first scheduled, with that time
+        self.pending: "OrderedDict[int, tuple]" = OrderedDict()
+
+        self.scheduled = 0
+        self.coalesced = 0
+        self.saves = 0
+        self.failed = 0
+        self.flushes = 0
+        self.total_flush_time = 0.0
+        self.max_flush_time = 0.0
+        self.max_save_delay = 0.0
+
+    def stop(self) -> None:
+        """Stop the worker and save everything still pending."""
+        super().stop()
+        self.flush()
+
+    def run_once(self) -> None:
+        self.flush()
+
+    def schedule(self, chatbot) -> None:
+        """Queue a chatbot's conversation to be saved by the worker."""
+        self.start()
+        with self.lock:
+            self.scheduled += 1
+            if id(chatbot) in self.pending:
+                self.coalesced += 1
+            else:
+                self.pending[id(chatbot)] = (chatbot, time.monotonic())
+
+    def flush(self, chatbot=None) -> bool:
+        """Save pending conversations now: all of them, or only ``chatbot``'s.
+
+        Failed saves stay pending, so the worker retries them. Returns False if
+        any save failed, True otherwise (including when nothing was pending).
+        """
+        with self.lock:
+            if chatbot is None:
+                batch = list(self.pending.values())
+                self.pending.clear()
+            else:
+                entry = self.pending.pop(id(chatbot), None)
+                batch = [entry] if entry else []
+        if not batch:
+            return True
+
+        start = time.monotonic()
+        all_saved = True
+        for target, scheduled_at in batch:
+            try:
+                # save_conversation() reports its own errors and returns False
+                saved = target.save_conversation()
+            except Exception as e:
+                saved = False
+                print(f"⚠️ Background conversation save failed: {str(e)}")
+            with self.lock:
+                if saved:
+                    self.saves += 1
+                    self.max_save_delay = max(self.max_save_delay, time.monotonic() - scheduled_at)
+                else:
+                    self.failed += 1
+                    # Keep the original time unless it was scheduled again meanwhile
+                    self.pending.setdefault(id(target), (target, scheduled_at))
+                    all_saved = False
+
+        elapsed = time.monotonic() - start
+        with self.lock:
+            self.flushes += 1
+            self.total_flush_time += elapsed
+            self.max_flush_time = max(self.max_flush_time, elapsed)
+        return all_saved
+
+    def get_stats(self) -> Dict:
+        """Get queue depth, coalescing and flush latency statistics."""
+        with self.lock:
+            return {
+                "running": self.running,
+                "queue_depth": len(self.pending),
+                "delay_seconds": self.interval,
+                "scheduled": self.scheduled,
+                "coalesced": self.coalesced,
+                "saves": self.saves,
+                "failed": self.failed,
+                "flushes": self.flushes,
+                "avg_flush_ms": round(self.total_flush_time / self.flushes * 1000, 2) if self.flushes else 0.0,
+                "max_flush_ms": round(self.max_flush_time * 1000, 2),
+                "max_save_delay_ms": round(self.max_save_delay * 1000, 2)
+            }
@@ -0,0 +1,31 @@
+import html
+import re
+from typing import Optional
+
+# Case- and accent-insensitive, so "subjuntivo" matches "Subjuntivo" and "explicacion" matches "explicación"
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+
+# Control characters mark matches in raw snippets; they can't occur in the escaped output
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+SNIPPET_TOKENS = 12
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every word must appear; the last one may be a prefix so results show up
+    while the user is still typing. FTS5 operators in the input are treated as
+    plain words. Returns None when the text has no searchable words.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def format_snippet(raw: str) -> str:
+    """HTML-escape a raw FTS5 snippet and wrap the matches in <mark> tags."""
+    return html.escape(raw).replace(SNIPPET_START, "<mark>").replace(SNIPPET_END, "</mark>")
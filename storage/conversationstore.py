@@ -0,0 +1,101 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CURSOR_SEPARATOR = "|"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a page cursor was not produced by a conversation listing."""
+
+
+def make_cursor(position: Any, key: str) -> str:
+    """Encode a conversation's place in a listing (its sort value and key) as a page cursor."""
+    return f"{position}{CURSOR_SEPARATOR}{key}"
+
+
+def parse_cursor(cursor: str, convert: Callable[[str], Any]) -> Tuple[Any, str]:
+    """Split a page cursor into its sort value, parsed with ``convert``, and key."""
+    position, separator, key = cursor.partition(CURSOR_SEPARATOR)
+    if not separator or not key:
+        raise InvalidCursor(f"Invalid page cursor: {cursor!r}")
+    try:
+        return convert(position), key
+    except ValueError:
+        raise InvalidCursor(f"Invalid page cursor: {cursor!r}") from None
+
+
+class ConversationStore(ABC):
+    """Where a chatbot keeps its conversations.
+
+    Each conversation is identified by a key chosen by the store (a file path,
+    a row name, ...). Listings return dicts with ``file`` (the key),
+    ``session_start``, ``model``, ``exchanges``, ``file_size`` and ``cursor``
+    (the conversation's place in the listing, for paging), and reads
+    return ``{"session_start": ..., "model": ..., "conversation": [...]}``.
+    """
+
+    @abstractmethod
+    def new_key(self, session_start: datetime) -> str:
+        """Choose the key for a conversation started at ``session_start``."""
+
+    @abstractmethod
+    def resolve(self, name: str) -> Optional[str]:
+        """Map a client-supplied conversation name to a key in this store.
+
+        Returns None if no such conversation exists. Only conversations that
+        belong to this store resolve, so a name can't reach anyone else's data.
+        """
+
+    @abstractmethod
+    def read(self, key: str) -> Dict:
+        """Read a whole conversation."""
+
+    @abstractmethod
+    def append(self, key: str, session_start: str, model: str, history: List[Dict], start: int) -> str:
+        """Save ``history[start:]``, the exchanges added since the last save.
+
+        Returns the key the conversation is now stored under.
+        """
+
+    @abstractmethod
+    def write(self, key: str, session_start: str, model: str, history: List[Dict]) -> str:
+        """Replace a conversation with ``history``, keeping its original session metadata.
+
+        Returns the key the conversation is now stored under.
+        """
+
+    @abstractmethod
+    def list(self, limit: Optional[int] = None, before: Optional[str] = None,
+             validate: bool = True) -> List[Dict]:
+        """List conversations, most recently updated first.
+
+        ``before`` is the ``cursor`` of the last conversation on the previous
+        page. It still works after that conversation is deleted or archived;
+        a malformed cursor raises InvalidCursor.
+        """
+
+    def latest(self, validate: bool = True) -> Optional[Dict]:
+        """Get the most recently updated conversation, if any."""
+        conversations = self.list(limit=1, validate=validate)
+        return conversations[0] if conversations else None
+
+    @abstractmethod
+    def search(self, text: str, limit: int = 20) -> List[Dict]:
+        """Full-text search over exchanges, best matches first.
+
+        Each hit has the conversation key (``file``), the exchange
+        ``position``, its ``timestamp``, the conversation's ``session_start``,
+        an HTML ``snippet`` with matches in ``<mark>`` tags and a ``score``.
+        """
+
+    @abstractmethod
+    def version(self, key: str) -> Optional[Tuple[str, datetime]]:
+        """Get a token that changes whenever the conversation does, and its last modification time (UTC)."""
+
+    def rebuild_index(self) -> int:
+        """Rebuild any metadata index. Returns the number of conversations."""
+        return len(self.list())
+
+    def close(self) -> None:
+        """Release resources held by the store."""
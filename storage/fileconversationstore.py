@@ -0,0 +1,129 @@
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from storage.conversationarchive import archive_conversations
+from storage.conversationindex import ConversationIndex
+from storage.conversationlog import (
+    ARCHIVE_EXTENSION,
+    LOG_EXTENSION,
+    ConversationLog,
+    conversation_stem,
+    read_conversation,
+    resolve_conversation_path
+)
+from storage.conversationstore import ConversationStore
+
+
+class FileConversationStore(ConversationStore):
+    """Conversations as append-only log files in a directory, with a SQLite metadata index.
+
+    Keys are file paths. Legacy ``.json`` and archived ``.json.gz``
+    conversations are read transparently and are converted back to the log
+    format the first time they are saved.
+    """
+
+    def __init__(self, conversations_dir: str):
+        self.conversations_dir = conversations_dir
+        os.makedirs(conversations_dir, exist_ok=True)
+        self.index = ConversationIndex(conversations_dir)
+        # Log of the conversation being written, so appends don't re-read the file
+        self.log: Optional[ConversationLog] = None
+
+    def new_key(self, session_start: datetime) -> str:
+        return f"{self.conversations_dir}/conversation_{session_start.strftime('%Y%m%d_%H%M%S')}{LOG_EXTENSION}"
+
+    def resolve(self, name: str) -> Optional[str]:
+        return resolve_conversation_path(os.path.join(self.conversations_dir, os.path.basename(name)))
+
+    def read(self, key: str) -> Dict:
+        if not key.endswith(LOG_EXTENSION):
+            return read_conversation(key)
+        log = ConversationLog(key)
+        data = log.read()
+        self.log = log
+        return data
+
+    def get_log(self, path: str) -> ConversationLog:
+        if self.log is None or self.log.path != path:
+            self.log = ConversationLog(path)
+            if os.path.exists(path):
+                # Pick up the existing header and compaction state
+                self.log.read()
+        return self.log
+
+    def append(self, key: str, session_start: str, model: str, history: List[Dict], start: int) -> str:
+        if not key.endswith(LOG_EXTENSION) or not os.path.exists(key):
+            return self.write(key, session_start, model, history)
+
+        log = self.get_log(key)
+        if log.should_compact():
+            return self.write(key, session_start, model, history)
+
+        log.append(history[start:])
+        self.update_index(key, session_start, model, history, start)
+        return key
+
+    def write(self, key: str, session_start: str, model: str, history: List[Dict]) -> str:
+        if not key.endswith(LOG_EXTENSION):
+            # Convert a legacy or archived conversation to the append-only format
+            legacy_file = key
+            key = conversation_stem(legacy_file) + LOG_EXTENSION
+            self.log = ConversationLog(key)
+            if os.path.exists(legacy_file):
+                self.log.header = {"session_start": read_conversation(legacy_file).get("session_start", session_start)}
+            self.log.write(session_start, model, history)
+            self.update_index(key, session_start, model, history)
+            if os.path.exists(legacy_file):
+                os.remove(legacy_file)
+            self.index.remove(legacy_file)
+            return key
+
+        log = self.get_log(key)
+        log.write(session_start, model, history)
+        self.update_index(key, session_start, model, history)
+
+        # The conversation may have been archived while it was open
+        archive_path = conversation_stem(key) + ARCHIVE_EXTENSION
+        if os.path.exists(archive_path):
+            os.remove(archive_path)
+            self.index.remove(archive_path)
+        return key
+
+    def update_index(self, key: str, session_start: str, model: str, history: List[Dict], start: int = 0) -> None:
+        header = self.log.header or {}
+        self.index.update(key, header.get("session_start", session_start), header.get("model", model),
+                          len(history), history[start:], start)
+
+    def list(self, limit: Optional[int] = None, before: Optional[str] = None,
+             validate: bool = True) -> List[Dict]:
+        return self.index.list(limit=limit, before=before, validate=validate)
+
+    def latest(self, validate: bool = True) -> Optional[Dict]:
+        return self.index.latest(validate=validate)
+
+    def version(self, key: str) -> Optional[Tuple[str, datetime]]:
+        try:
+            stat = os.stat(key)
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_size}:{stat.st_mtime_ns}", datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+
+    def search(self, text: str, limit: int = 20) -> List[Dict]:
+        return self.index.search(text, limit=limit)
+
+    def archive(self, max_age_days: float) -> Dict:
+        """Compress conversations untouched for ``max_age_days`` into the archive format."""
+        def on_archived(path: str, archive_path: str) -> None:
+            if self.log is not None and self.log.path == path:
+                self.log = None
+            self.index.remove(path)
+            self.index.index_file(archive_path)
+
+        return archive_conversations(self.conversations_dir, max_age_days, on_archived)
+
+    def rebuild_index(self) -> int:
+        return self.index.rebuild()
+
+    def close(self) -> None:
+        self.index.close()
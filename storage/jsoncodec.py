@@ -0,0 +1,34 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    # Optional speedup; the stdlib encoder produces the same JSON
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+# orjson.JSONDecodeError subclasses this, so one except clause covers both backends
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to compact JSON text, keeping non-ASCII characters as they are."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 encoded JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return dumps(obj).encode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text or UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
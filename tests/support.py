@@ -0,0 +1,230 @@
+"""
+Test helpers for Spanish Tutor
+A fake Ollama HTTP server, throwaway database apps and loaders for the hyphenated root scripts
+"""
+
+import atexit
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def load_tutor_module():
+    """Import spanish-tutor.py, whose name isn't a valid module name."""
+    module = sys.modules.get("spanish_tutor")
+    if module is None:
+        spec = importlib.util.spec_from_file_location("spanish_tutor", os.path.join(PROJECT_ROOT, "spanish-tutor.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["spanish_tutor"] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def load_web_app():
+    """Import web_gui.app once per test run, against a throwaway database and working directory.
+
+    Conversation directories are relative to the working directory, so the
+    tests run from a temporary one. Ollama points at a closed port, saves wait
+    a minute for the write-behind worker and rate limits are off.
+    """
+    module = sys.modules.get("web_gui.app")
+    if module is None:
+        directory = tempfile.mkdtemp()
+        atexit.register(shutil.rmtree, directory, True)
+        os.environ.update({
+            "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'spanish_tutor.db')}",
+            "FLASK_DEBUG": "true",  # no log file
+            "LOG_LEVEL": "WARNING",
+            "LOG_LEVELS": "web_gui.app=WARNING",  # Flask sets the app logger to DEBUG in debug mode
+            "OLLAMA_HOST": "127.0.0.1:9",
+            "CONVERSATION_SAVE_DELAY": "60",
+            "RESPONSE_CACHE_SIZE": "0",
+        })
+        os.chdir(directory)
+        with warnings.catch_warnings():
+            # Flask-Limiter's in-memory storage is fine for tests
+            warnings.simplefilter("ignore", UserWarning)
+            import web_gui.app as module
+        module.limiter.enabled = False
+    return module
+
+
+def make_db_app(directory: str):
+    """A bare Flask app bound to a fresh SQLite database in ``directory``, with the tables created."""
+    from flask import Flask
+    from web_gui.models import db
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(directory, 'test.db')}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def add_user(app, email: str = "ana@example.com"):
+    """Create a user and return its id."""
+    from web_gui.models import db, User
+
+    with app.app_context():
+        user = User(email=email, display_name=email.split("@")[0], provider="email")
+        user.set_password("Password123")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """A throwaway database app in a temporary directory with one user, ``self.user_id``, per test."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.app = make_db_app(self.directory)
+        self.user_id = add_user(self.app)
+
+    def tearDown(self):
+        from web_gui.models import db
+
+        # Return the session's connection and close the pool, so no SQLite connection outlives the test
+        with self.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class FakeOllama:
+    """Just enough of the Ollama HTTP API, served from localhost.
+
+    ``reply`` is streamed word by word from /api/chat. Setting ``status``
+    makes every request fail with that code, ``chat_lines`` replaces the
+    streamed NDJSON lines verbatim, ``delay`` holds each POST before
+    answering and ``load_duration`` (nanoseconds) is reported for model
+    preloads. Requests are recorded as (method, path, body) and accepted TCP
+    connections are counted in ``connections``.
+    """
+
+    def __init__(self, reply: str = "Hola amigo, ¿qué tal?", models=("llama3:latest",)):
+        self.reply = reply
+        self.models = list(models)
+        self.status = 200
+        self.chat_lines = None
+        self.delay = 0.0
+        self.load_duration = 1_500_000
+        self.requests = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = 0
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, obj, code=200):
+                body = json.dumps(obj).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def send_lines(self, lines):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for line in lines:
+                    data = line.encode() + b"\n"
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.write(b"0\r\n\r\n")
+
+            def do_GET(self):
+                fake.record("GET", self.path, None)
+                if fake.status != 200:
+                    self.send_json({"error": "unavailable"}, fake.status)
+                elif self.path == "/api/tags":
+                    self.send_json({"models": [{"name": name} for name in fake.models]})
+                elif self.path == "/api/ps":
+                    self.send_json({"models": []})
+                else:
+                    self.send_json({}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                fake.record("POST", self.path, body)
+                with fake.lock:
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                try:
+                    time.sleep(fake.delay)
+                    if fake.status != 200:
+                        self.send_json({"error": "unavailable"}, fake.status)
+                    elif self.path == "/api/generate" and not body.get("prompt"):
+                        # A model preload request
+                        self.send_json({"model": body.get("model"), "response": "", "done": True,
+                                        "load_duration": fake.load_duration})
+                    elif self.path == "/api/chat" and body.get("stream", True):
+                        self.send_lines(fake.chat_lines if fake.chat_lines is not None else fake.stream_lines())
+                    elif self.path == "/api/chat":
+                        self.send_json({"message": {"role": "assistant", "content": fake.reply}, "done": True})
+                    else:
+                        self.send_json({"response": fake.reply, "done": True})
+                finally:
+                    with fake.lock:
+                        fake.in_flight -= 1
+
+        class Server(ThreadingHTTPServer):
+            def process_request(self, request, client_address):
+                with fake.lock:
+                    fake.connections += 1
+                super().process_request(request, client_address)
+
+            def handle_error(self, request, client_address):
+                # Clients closing pooled keep-alive connections isn't worth a traceback
+                if not isinstance(sys.exc_info()[1], ConnectionError):
+                    super().handle_error(request, client_address)
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def host(self) -> str:
+        return f"127.0.0.1:{self.server.server_address[1]}"
+
+    def record(self, method, path, body):
+        with self.lock:
+            self.requests.append((method, path, body))
+
+    def posts(self, path: str = "/api/chat"):
+        with self.lock:
+            return [body for method, request_path, body in self.requests if method == "POST" and request_path == path]
+
+    def stream_lines(self):
+        words = self.reply.split(" ")
+        lines = [json.dumps({"message": {"role": "assistant", "content": (" " if i else "") + word}, "done": False})
+                 for i, word in enumerate(words)]
+        lines.append(json.dumps({"message": {"role": "assistant", "content": ""}, "done": True}))
+        return lines
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
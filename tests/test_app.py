@@ -0,0 +1,318 @@
+import sqlite3
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+
+from support import add_user, load_web_app
+from storage import read_conversation
+
+web = load_web_app()
+
+
+class AppTestCase(unittest.TestCase):
+    """Signs a fresh user in to the web app with a test client."""
+
+    password = "Password123"
+    user_count = 0
+
+    def setUp(self):
+        AppTestCase.user_count += 1
+        self.email = f"user{AppTestCase.user_count}@example.com"
+        self.user_id = add_user(web.app, self.email)
+        self.client = web.app.test_client()
+
+    def tearDown(self):
+        web.chatbot_manager.remove_chatbot(self.user_id)
+
+    def login(self):
+        response = self.client.post("/auth/login", json={"email": self.email, "password": self.password})
+        self.assertEqual(response.status_code, 200)
+
+    def get_user(self):
+        with web.app.app_context():
+            return web.db.session.get(web.User, self.user_id)
+
+    def add_exchange(self, chatbot, n=1):
+        chatbot.record_exchange(f"pregunta {n}", f"respuesta {n}")
+
+    def add_conversations(self, count, exchanges=1):
+        """Save ``count`` conversations a minute apart; the last one stays active."""
+        chatbot = web.chatbot_manager.get_chatbot(self.get_user())
+        for index in range(count):
+            if index:
+                with redirect_stdout(StringIO()):
+                    chatbot.start_new_conversation()
+            chatbot.session_start_time = datetime(2024, 1, 1, 12, index)
+            for n in range(exchanges):
+                self.add_exchange(chatbot, n)
+            self.assertTrue(chatbot.flush_save())
+        return chatbot
+
+
+class FakeDispatcher:
+    def __init__(self):
+        self.busy = set()
+
+    def has_jobs(self, user_key):
+        return user_key in self.busy
+
+
+class WebChatbotManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = FakeDispatcher()
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            for user_key in list(manager.chatbots):
+                manager.remove_chatbot(int(user_key[len("user_"):]))
+
+    def make_manager(self, **kwargs):
+        # No sweep thread and synchronous saves: the tests sweep by hand
+        kwargs.setdefault("idle_timeout", 0)
+        manager = web.WebChatbotManager(web.ollama_client, web.ollama_backend_pool,
+                                        inference_dispatcher=self.dispatcher, **kwargs)
+        self.managers.append(manager)
+        return manager
+
+    def make_user(self):
+        AppTestCase.user_count += 1
+        user_id = add_user(web.app, f"user{AppTestCase.user_count}@example.com")
+        with web.app.app_context():
+            return web.db.session.get(web.User, user_id)
+
+    def resident(self, manager):
+        return set(manager.chatbots)
+
+    def test_evicts_idle_chatbots_and_closes_their_stores(self):
+        manager = self.make_manager(idle_timeout=60)
+        idle_user, active_user = self.make_user(), self.make_user()
+        idle = manager.get_chatbot(idle_user)
+        manager.get_chatbot(active_user)
+        manager.chatbots[f"user_{idle_user.id}"].last_used -= 120
+
+        manager.sweep()
+        self.assertEqual(self.resident(manager), {f"user_{active_user.id}"})
+        self.assertEqual(manager.get_stats()["evictions"]["idle"], 1)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            idle.conversation_store.index.connection.execute("SELECT 1")
+
+    def test_evicts_least_recently_used_over_memory_limit(self):
+        first, second = self.make_user(), self.make_user()
+        manager = self.make_manager()
+        for user in (first, second):
+            chatbot = manager.get_chatbot(user)
+            for n in range(5):
+                chatbot.record_exchange(f"pregunta {n}", "respuesta " * 50)
+        manager.max_bytes = chatbot.estimate_memory() + 1
+
+        manager.sweep()
+        self.assertEqual(self.resident(manager), {f"user_{second.id}"})
+        stats = manager.get_stats()
+        self.assertEqual(stats["evictions"]["memory"], 1)
+        self.assertLessEqual(stats["resident_bytes"], manager.max_bytes)
+
+    def test_evicts_over_instance_limit(self):
+        manager = self.make_manager(max_instances=1)
+        first, second = self.make_user(), self.make_user()
+        manager.get_chatbot(first)
+        manager.get_chatbot(second)
+        self.assertEqual(self.resident(manager), {f"user_{second.id}"})
+        self.assertEqual(manager.get_stats()["evictions"]["capacity"], 1)
+
+    def test_skips_busy_users(self):
+        manager = self.make_manager(idle_timeout=60)
+        user = self.make_user()
+        manager.get_chatbot(user)
+        manager.chatbots[f"user_{user.id}"].last_used -= 120
+        self.dispatcher.busy.add(f"user_{user.id}")
+
+        manager.sweep()
+        self.assertEqual(self.resident(manager), {f"user_{user.id}"})
+        self.assertEqual(manager.evict(manager.select_lru(1), "capacity"), 0)
+
+    def test_skips_chatbots_used_while_saving(self):
+        manager = self.make_manager()
+        user = self.make_user()
+        user_key = f"user_{user.id}"
+        chatbot = manager.get_chatbot(user)
+        victims = manager.select_lru(1)
+
+        def flush_save():
+            # A request hands the chatbot out while the eviction is writing its save
+            time.sleep(0.01)
+            manager.touch(user_key)
+            return True
+
+        with mock.patch.object(chatbot, "flush_save", side_effect=flush_save):
+            self.assertEqual(manager.evict(victims, "idle"), 0)
+        self.assertIs(manager.get_chatbot(user), chatbot)
+
+    def test_keeps_chatbots_whose_save_failed(self):
+        manager = self.make_manager()
+        user = self.make_user()
+        chatbot = manager.get_chatbot(user)
+        with mock.patch.object(chatbot, "flush_save", return_value=False):
+            self.assertEqual(manager.evict(manager.select_lru(1), "idle"), 0)
+        self.assertEqual(manager.get_stats()["eviction_failures"], 1)
+        self.assertIs(manager.get_chatbot(user), chatbot)
+
+    def test_lookup_rechecks_residency_after_stamping(self):
+        manager = self.make_manager()
+        user = self.make_user()
+        user_key = f"user_{user.id}"
+        evicted = manager.get_chatbot(user)
+
+        class EvictedAfterRead(dict):
+            """Drops the entry right after the lookup reads it, as a concurrent eviction would."""
+            def get(self, key, default=None):
+                entry = super().get(key, default)
+                if entry is not None:
+                    del self[key]
+                return entry
+
+        manager.chatbots = EvictedAfterRead(manager.chatbots)
+        self.assertIsNone(manager.touch(user_key))
+        manager.chatbots = dict(manager.chatbots)
+        self.assertIsNot(manager.get_chatbot(user), evicted)
+        self.assertEqual(manager.get_stats()["created"], 2)
+        evicted.conversation_store.close()
+
+    def test_concurrent_first_requests_create_one_chatbot(self):
+        manager = self.make_manager()
+        user = self.make_user()
+        create_chatbot = manager.create_chatbot
+
+        def slow_create(*args, **kwargs):
+            time.sleep(0.05)
+            return create_chatbot(*args, **kwargs)
+
+        chatbots = []
+        barrier = threading.Barrier(8)
+
+        def request():
+            barrier.wait()
+            chatbots.append(manager.get_chatbot(user))
+
+        with mock.patch.object(manager, "create_chatbot", side_effect=slow_create):
+            threads = [threading.Thread(target=request) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(len(chatbots), 8)
+        self.assertEqual(len({id(chatbot) for chatbot in chatbots}), 1)
+        self.assertEqual(manager.get_stats()["created"], 1)
+
+
+class HealthTest(AppTestCase):
+    def test_statistics_need_sign_in(self):
+        anonymous = self.client.get("/api/health").get_json()
+        self.assertEqual(set(anonymous), {"status", "timestamp"})
+
+        self.login()
+        health = self.client.get("/api/health").get_json()
+        self.assertEqual(health["status"], "healthy")
+        self.assertIn("resident", health["chatbots"])
+        self.assertIn("inference", health)
+
+
+class PaginationTest(AppTestCase):
+    def test_lists_conversations_a_page_at_a_time(self):
+        self.login()
+        self.add_conversations(3)
+
+        first = self.client.get("/api/conversations/list?limit=2").get_json()
+        self.assertEqual((first["count"], first["has_more"]), (2, True))
+        second = self.client.get(f"/api/conversations/list?limit=2&before={first['next_cursor']}").get_json()
+        self.assertEqual((second["count"], second["has_more"], second["next_cursor"]), (1, False, None))
+
+        starts = [c["session_start"] for c in first["conversations"] + second["conversations"]]
+        self.assertEqual(starts, sorted(starts, reverse=True))
+        self.assertEqual(len(set(starts)), 3)
+
+    def test_rejects_malformed_cursor(self):
+        self.login()
+        self.assertEqual(self.client.get("/api/conversations/list?before=nonsense").status_code, 400)
+
+    def test_returns_a_window_of_a_conversation(self):
+        self.login()
+        chatbot = self.add_conversations(1, exchanges=5)
+        filename = chatbot.current_conversation_file.split("/")[-1]
+
+        page = self.client.get(f"/api/conversations/{filename}?offset=-2&limit=2").get_json()
+        self.assertEqual([e["user"] for e in page["conversation"]], ["pregunta 3", "pregunta 4"])
+        self.assertEqual((page["total_exchanges"], page["offset"], page["limit"]), (5, 3, 2))
+
+        latest = self.client.get("/api/conversations/latest?limit=3").get_json()
+        self.assertEqual(latest["offset"], 2)
+        self.assertEqual(len(latest["conversation"]), 3)
+
+
+class ConditionalGetTest(AppTestCase):
+    def assert_revalidates(self, url, chatbot):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+        self.assertEqual(response.headers["Cache-Control"], "private, no-cache")
+
+        for headers in ({"If-None-Match": etag}, {"If-Modified-Since": last_modified}):
+            cached = self.client.get(url, headers=headers)
+            self.assertEqual(cached.status_code, 304)
+            self.assertEqual(cached.data, b"")
+            self.assertEqual(cached.headers["ETag"], etag)
+
+        # A saved exchange changes the version
+        time.sleep(0.01)
+        self.add_exchange(chatbot, 9)
+        self.assertTrue(chatbot.flush_save())
+        changed = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], etag)
+
+    def test_conversation_answers_not_modified(self):
+        self.login()
+        chatbot = self.add_conversations(1, exchanges=2)
+        filename = chatbot.current_conversation_file.split("/")[-1]
+        self.assert_revalidates(f"/api/conversations/{filename}", chatbot)
+
+    def test_latest_conversation_answers_not_modified(self):
+        self.login()
+        chatbot = self.add_conversations(2)
+        self.assert_revalidates("/api/conversations/latest", chatbot)
+
+    def test_pages_have_their_own_etags(self):
+        self.login()
+        chatbot = self.add_conversations(1, exchanges=4)
+        filename = chatbot.current_conversation_file.split("/")[-1]
+        whole = self.client.get(f"/api/conversations/{filename}")
+        page = self.client.get(f"/api/conversations/{filename}?offset=-2&limit=2",
+                               headers={"If-None-Match": whole.headers["ETag"]})
+        self.assertEqual(page.status_code, 200)
+        self.assertNotEqual(page.headers["ETag"], whole.headers["ETag"])
+
+    def test_unknown_conversation_is_not_found(self):
+        self.login()
+        self.assertEqual(self.client.get("/api/conversations/missing.jsonl").status_code, 404)
+
+
+class LogoutTest(AppTestCase):
+    def test_logout_writes_pending_save(self):
+        self.login()
+        chatbot = web.chatbot_manager.get_chatbot(self.get_user())
+        self.add_exchange(chatbot)
+        self.assertEqual(web.conversation_saver.get_stats()["queue_depth"], 1)
+
+        self.assertEqual(self.client.post("/auth/logout").status_code, 200)
+        self.assertNotIn(f"user_{self.user_id}", web.chatbot_manager.chatbots)
+        saved = read_conversation(chatbot.current_conversation_file)
+        self.assertEqual([e["user"] for e in saved["conversation"]], ["pregunta 1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
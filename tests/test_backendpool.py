@@ -0,0 +1,107 @@
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from support import FakeOllama, load_tutor_module
+from backends import OllamaBackendPool, OllamaClient
+
+
+class OllamaBackendPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.servers = [FakeOllama(reply="Hola"), FakeOllama(reply="Hola")]
+        self.client = OllamaClient()
+        self.pool = OllamaBackendPool([server.host for server in self.servers], self.client,
+                                      failure_threshold=2, base_backoff=30)
+        self.directory = tempfile.mkdtemp()
+        tutor = load_tutor_module()
+        self.chatbot = tutor.SpanishTutorChatbot(
+            model="llama3", ollama_client=self.client, backend_pool=self.pool,
+            user_info={"user_id": "test", "conversations_dir": self.directory}
+        )
+
+    def tearDown(self):
+        self.chatbot.conversation_store.close()
+        self.client.close()
+        for server in self.servers:
+            server.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def chat_counts(self):
+        return [len(server.posts("/api/chat")) for server in self.servers]
+
+    def test_routes_to_least_loaded_host(self):
+        self.servers[0].delay = 0.3
+        self.servers[1].delay = 0.3
+        threads = [threading.Thread(target=lambda: list(self.chatbot.stream_message("hola"))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.chat_counts(), [2, 2])
+        self.assertEqual([server.max_in_flight for server in self.servers], [2, 2])
+
+    def test_ejects_failing_host(self):
+        self.servers[0].status = 503
+        for _ in range(6):
+            list(self.chatbot.stream_message("hola"))
+
+        # Failures only reach the bad host until it crosses the threshold
+        self.assertEqual(self.chat_counts()[0], 2)
+        stats = self.pool.get_stats()
+        self.assertFalse(stats[0]["healthy"])
+        self.assertEqual(stats[0]["consecutive_failures"], 2)
+        self.assertTrue(stats[1]["healthy"])
+
+    def test_model_errors_do_not_eject_host(self):
+        self.servers[0].chat_lines = [json.dumps({"error": "model 'llama3' not found"})]
+        replies = ["".join(self.chatbot.stream_message("hola")) for _ in range(4)]
+
+        # Never ejected, so the idle first host keeps getting them
+        self.assertEqual(replies, ["Error: model 'llama3' not found"] * 4)
+        self.assertEqual(self.chat_counts(), [4, 0])
+        stats = self.pool.get_stats()
+        self.assertTrue(stats[0]["healthy"])
+        self.assertEqual(stats[0]["failures"], 0)
+
+    def test_readmits_host_after_backoff(self):
+        self.servers[0].status = 503
+        for _ in range(4):
+            list(self.chatbot.stream_message("hola"))
+        self.assertFalse(self.pool.get_stats()[0]["healthy"])
+
+        # Let the backoff lapse with the host healthy again: one trial request brings it back
+        self.servers[0].status = 200
+        self.pool.backends[0].ejected_until = time.time() - 1
+        list(self.chatbot.stream_message("hola"))
+        stats = self.pool.get_stats()
+        self.assertTrue(stats[0]["healthy"])
+        self.assertEqual(stats[0]["consecutive_failures"], 0)
+
+    def test_failed_trial_doubles_backoff(self):
+        self.servers[0].status = 503
+        for _ in range(2):
+            list(self.chatbot.stream_message("hola"))
+        first_backoff = self.pool.get_stats()[0]["ejected_for_seconds"]
+
+        self.pool.backends[0].ejected_until = time.time() - 1
+        before = self.chat_counts()[0]
+        list(self.chatbot.stream_message("hola"))
+        self.assertEqual(self.chat_counts()[0], before + 1)
+        self.assertAlmostEqual(self.pool.get_stats()[0]["ejected_for_seconds"], first_backoff * 2, delta=1)
+
+    def test_all_ejected_uses_host_due_back_soonest(self):
+        for server in self.servers:
+            server.status = 503
+        for _ in range(4):
+            list(self.chatbot.stream_message("hola"))
+        self.pool.backends[1].ejected_until = time.time() + 1
+        self.servers[1].status = 200
+        chunks = list(self.chatbot.stream_message("hola"))
+        self.assertEqual("".join(chunks), "Hola")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import importlib.util
+import subprocess
+import sys
+import textwrap
+import threading
+import unittest
+
+from support import PROJECT_ROOT
+from background import run_blocking
+
+# Monkey patching is process-wide, so the eventlet case runs in a child interpreter
+EVENTLET_SCRIPT = textwrap.dedent("""
+    import eventlet
+    eventlet.monkey_patch()
+    from eventlet import patcher
+    from background import run_blocking
+
+    native_threading = patcher.original("threading")
+    native_time = patcher.original("time")
+    ticks = []
+
+    def tick():
+        for _ in range(10):
+            ticks.append(1)
+            eventlet.sleep(0.01)
+
+    ticker = eventlet.spawn(tick)
+    caller = native_threading.get_ident()
+    worker = run_blocking(lambda: native_time.sleep(0.2) or native_threading.get_ident())
+    ticker.wait()
+    assert worker != caller, "ran on the hub's thread"
+    assert len(ticks) >= 5, f"hub stalled: {len(ticks)} ticks"
+""")
+
+
+class RunBlockingTest(unittest.TestCase):
+    def test_calls_inline_without_eventlet(self):
+        self.assertEqual(run_blocking(lambda a, b=0: a + b, 1, b=2), 3)
+        self.assertEqual(run_blocking(threading.get_ident), threading.get_ident())
+
+    @unittest.skipIf(importlib.util.find_spec("eventlet") is None, "eventlet is not installed")
+    def test_keeps_the_hub_running_when_monkey_patched(self):
+        result = subprocess.run([sys.executable, "-c", EVENTLET_SCRIPT], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=30)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
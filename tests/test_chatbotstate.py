@@ -0,0 +1,142 @@
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import types
+import unittest
+
+from support import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+from web_gui.chatbotstate import LocalChatbotState, SQLiteChatbotState, create_chatbot_state
+from web_gui.messagequeue import SQLiteManager, create_client_manager
+
+
+class ChatbotStateTests:
+    """Behaviour every state backend shares; mixed into a TestCase per backend."""
+
+    def make_state(self):
+        raise NotImplementedError
+
+    def test_set_bumps_version(self):
+        state = self.make_state()
+        self.assertIsNone(state.get("user_1"))
+        self.assertEqual(state.set("user_1", "conversation_a", 1), 1)
+        self.assertEqual(state.set("user_1", "conversation_b", 3), 2)
+        self.assertEqual(state.get("user_1"), {"conversation": "conversation_b", "exchanges": 3, "version": 2})
+
+    def test_users_are_independent(self):
+        state = self.make_state()
+        state.set("user_1", "conversation_a", 1)
+        state.set("user_2", None, 0)
+        self.assertEqual(state.get("user_2"), {"conversation": None, "exchanges": 0, "version": 1})
+        self.assertEqual(state.get("user_1")["conversation"], "conversation_a")
+
+    def test_delete(self):
+        state = self.make_state()
+        state.set("user_1", "conversation_a", 1)
+        state.delete("user_1")
+        self.assertIsNone(state.get("user_1"))
+
+
+class LocalChatbotStateTest(ChatbotStateTests, unittest.TestCase):
+    def make_state(self):
+        return LocalChatbotState()
+
+    def test_keeps_most_recently_updated_users(self):
+        state = LocalChatbotState(max_entries=2)
+        state.set("user_1", "a", 1)
+        state.set("user_2", "b", 1)
+        state.set("user_1", "c", 2)
+        state.set("user_3", "d", 1)
+        self.assertIsNone(state.get("user_2"))
+        self.assertIsNotNone(state.get("user_1"))
+        self.assertFalse(state.shared)
+
+
+class SQLiteChatbotStateTest(ChatbotStateTests, unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "state", "chatbots.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_state(self):
+        return SQLiteChatbotState(self.path)
+
+    def test_versions_are_shared_between_instances(self):
+        # Two instances stand in for two worker processes
+        first, second = self.make_state(), self.make_state()
+        first.set("user_1", "conversation_a", 1)
+        self.assertEqual(second.set("user_1", "conversation_b", 2), 2)
+        self.assertEqual(first.get("user_1")["conversation"], "conversation_b")
+        self.assertTrue(first.shared)
+
+
+class CreateChatbotStateTest(unittest.TestCase):
+    def test_picks_backend_from_url(self):
+        directory = tempfile.mkdtemp()
+        try:
+            self.assertIsInstance(create_chatbot_state(None), LocalChatbotState)
+            self.assertIsInstance(create_chatbot_state("local"), LocalChatbotState)
+            state = create_chatbot_state(f"sqlite:///{directory}/state.db")
+            self.assertIsInstance(state, SQLiteChatbotState)
+            with self.assertRaises(ValueError):
+                create_chatbot_state("memcached://localhost")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+class SQLiteManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.url = f"sqlite:///{self.directory}/socketio.db"
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_listener(self, **kwargs):
+        manager = SQLiteManager(self.url, **kwargs)
+        # _listen only needs the server for sleeping between polls
+        manager.server = types.SimpleNamespace(sleep=time.sleep)
+        return manager
+
+    def test_relays_messages_between_managers(self):
+        publisher = SQLiteManager(self.url)
+        other_channel = SQLiteManager(self.url, channel="elsewhere")
+        publisher._publish({"method": "emit", "event": "old"})
+
+        listener = self.make_listener(poll_interval=0.01)
+        received = queue.Queue()
+
+        def listen():
+            for message in listener._listen():
+                received.put(message)
+
+        threading.Thread(target=listen, daemon=True).start()
+        # Give the listener time to note the newest existing row
+        time.sleep(0.2)
+        other_channel._publish({"method": "emit", "event": "ignored"})
+        publisher._publish({"method": "emit", "event": "new", "data": "¿qué tal?"})
+
+        self.assertEqual(received.get(timeout=5), {"method": "emit", "event": "new", "data": "¿qué tal?"})
+        time.sleep(0.1)
+        self.assertTrue(received.empty())
+
+    def test_prunes_old_messages(self):
+        manager = SQLiteManager(self.url, retention=0)
+        manager._publish({"event": "stale"})
+        time.sleep(0.01)
+        manager.prune()
+        count = manager.connect().execute("SELECT COUNT(*) FROM socketio_messages").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_client_manager_for_url(self):
+        self.assertEqual(create_client_manager(""), {})
+        self.assertEqual(create_client_manager("redis://localhost:6379/0"), {"message_queue": "redis://localhost:6379/0"})
+        self.assertIsInstance(create_client_manager(self.url)["client_manager"], SQLiteManager)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import shutil
+import tempfile
+import unittest
+
+from support import FakeOllama, load_tutor_module
+
+
+def exchange(n):
+    return {"user": f"pregunta {n}", "bot": f"respuesta {n}", "timestamp": f"2024-01-01T00:00:{n:02d}"}
+
+
+class SyncChatMessagesTest(unittest.TestCase):
+    def setUp(self):
+        self.ollama = FakeOllama(reply="Hola amigo")
+        self.directory = tempfile.mkdtemp()
+        tutor = load_tutor_module()
+        self.chatbot = tutor.SpanishTutorChatbot(
+            ollama_host=self.ollama.host, model="llama3",
+            user_info={"user_id": "test", "conversations_dir": self.directory}
+        )
+
+    def tearDown(self):
+        self.chatbot.conversation_store.close()
+        self.ollama.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def contents(self, messages):
+        return [message["content"] for message in messages[1:]]
+
+    def test_appends_new_exchanges_to_the_same_list(self):
+        self.chatbot.conversation_history.append(exchange(1))
+        messages = self.chatbot.sync_chat_messages()
+        first_turn = list(messages)
+
+        self.chatbot.conversation_history.extend([exchange(2), exchange(3)])
+        self.assertIs(self.chatbot.sync_chat_messages(), messages)
+        self.assertEqual(messages[:len(first_turn)], first_turn)
+        self.assertEqual(self.contents(messages), ["pregunta 1", "respuesta 1", "pregunta 2", "respuesta 2",
+                                                   "pregunta 3", "respuesta 3"])
+        self.assertEqual([m["role"] for m in messages[1:3]], ["user", "assistant"])
+
+    def test_rebuilds_when_history_is_replaced_or_shortened(self):
+        self.chatbot.conversation_history.extend([exchange(1), exchange(2)])
+        messages = self.chatbot.sync_chat_messages()
+
+        self.chatbot.conversation_history = [exchange(5)]
+        replaced = self.chatbot.sync_chat_messages()
+        self.assertIsNot(replaced, messages)
+        self.assertEqual(self.contents(replaced), ["pregunta 5", "respuesta 5"])
+
+        self.chatbot.conversation_history.clear()
+        cleared = self.chatbot.sync_chat_messages()
+        self.assertEqual(cleared, [replaced[0]])
+        self.assertEqual(cleared[0]["role"], "system")
+
+    def test_each_turn_extends_the_previous_request(self):
+        list(self.chatbot.stream_message("hola"))
+        list(self.chatbot.stream_message("¿qué tal?"))
+        first, second = [body["messages"] for body in self.ollama.posts("/api/chat")]
+        # An unchanged prefix lets Ollama reuse its cached prompt
+        self.assertEqual(second[:len(first)], first)
+        self.assertEqual(second[len(first):], [{"role": "assistant", "content": "Hola amigo"},
+                                               {"role": "user", "content": "¿qué tal?"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
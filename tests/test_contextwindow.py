@@ -0,0 +1,119 @@
+import threading
+import time
+import unittest
+
+from support import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+from context import ContextWindow
+
+
+def exchanges(count, size=40):
+    return [{"user": "u" * size, "bot": "b" * size} for _ in range(count)]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.01)
+
+
+class ContextWindowTest(unittest.TestCase):
+    def test_within_budget_keeps_everything(self):
+        window = ContextWindow(max_tokens=1000)
+        history = exchanges(5)
+        window.sync(history)
+        self.assertEqual(window.window_start, 0)
+        self.assertEqual(window.get_stats()["exchanges"], 5)
+
+    def test_slides_to_low_water_mark_and_keeps_latest(self):
+        window = ContextWindow(max_tokens=100, low_water_ratio=0.5)
+        history = exchanges(10)  # 28 tokens each
+        window.sync(history)
+        self.assertLessEqual(window.window_tokens, 50)
+        self.assertLess(window.window_start, len(history))
+
+    def test_new_history_resets(self):
+        window = ContextWindow(max_tokens=100)
+        window.sync(exchanges(10))
+        window.sync(exchanges(1))
+        self.assertEqual(window.window_start, 0)
+        self.assertEqual(window.summary, "")
+
+    def test_long_backlog_is_summarized_in_budgeted_chunks(self):
+        calls = []
+
+        def summarizer(previous, chunk):
+            calls.append((previous, len(chunk)))
+            return f"summary {len(calls)}"
+
+        window = ContextWindow(max_tokens=100, summarizer=summarizer)
+        history = exchanges(200)  # 28 tokens each, so three per chunk
+        window.sync(history)
+        wait_for(lambda: window.summarized_upto == window.window_start and not window.summarizing)
+
+        self.assertGreater(len(calls), 1)
+        self.assertTrue(all(size * 28 <= 100 for _, size in calls))
+        self.assertEqual(sum(size for _, size in calls), window.window_start)
+        # Each call builds on the previous summary
+        self.assertEqual(calls[1][0], "summary 1")
+        self.assertEqual(window.summary, f"summary {len(calls)}")
+
+    def test_oversized_exchange_is_summarized_alone(self):
+        calls = []
+        window = ContextWindow(max_tokens=50, summarizer=lambda previous, chunk: calls.append(len(chunk)) or "s")
+        window.sync(exchanges(3, size=400))
+        wait_for(lambda: window.summarized_upto == window.window_start and not window.summarizing)
+        self.assertEqual(calls, [1, 1])
+
+    def test_failed_summary_is_retried_with_backoff(self):
+        results = [None, None, "recovered"]
+        sleeps = []
+        retried = threading.Event()
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            # Nothing is folded in while the summarizer keeps failing
+            self.assertEqual((window.summary, window.summarized_upto), ("", 0))
+            if len(sleeps) == 2:
+                retried.set()
+
+        window = ContextWindow(max_tokens=100, summarizer=lambda previous, chunk: results.pop(0) if results else "s",
+                               retry_delay=2, max_retry_delay=3, sleep=sleep)
+        window.sync(exchanges(5))
+        self.assertTrue(retried.wait(5))
+        wait_for(lambda: window.summarized_upto == window.window_start and not window.summarizing)
+
+        self.assertEqual(sleeps, [2, 3])
+        self.assertEqual(window.summary, "recovered")
+        self.assertEqual(window.get_stats()["summary_failures"], 2)
+
+    def test_retry_stops_when_history_is_replaced(self):
+        calls = []
+
+        def sleep(seconds):
+            window.sync(exchanges(1))
+
+        window = ContextWindow(max_tokens=100, summarizer=lambda previous, chunk: calls.append(1), sleep=sleep)
+        window.sync(exchanges(5))
+        wait_for(lambda: not window.summarizing)
+        time.sleep(0.05)
+        self.assertEqual(len(calls), 1)
+
+    def test_summary_of_replaced_history_is_discarded(self):
+        release = threading.Event()
+
+        def summarizer(previous, chunk):
+            release.wait(5)
+            return "stale"
+
+        window = ContextWindow(max_tokens=100, summarizer=summarizer)
+        window.sync(exchanges(20))
+        window.sync(exchanges(1))
+        release.set()
+        time.sleep(0.1)
+        self.assertEqual(window.summary, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
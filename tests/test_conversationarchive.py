@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from support import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+from storage import ConversationLog, archive_conversation, archive_conversations, read_conversation
+
+
+class ConversationArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, name, age_days):
+        path = os.path.join(self.directory, name)
+        exchanges = [{"user": "hola " * 50, "bot": "¿qué tal? " * 50} for _ in range(20)]
+        ConversationLog(path).write("2024-01-01T00:00:00", "llama3", exchanges)
+        mtime = time.time() - age_days * 86400
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_archive_keeps_content_and_mtime(self):
+        path = self.write("conversation_20240101_000000.jsonl", age_days=40)
+        original = read_conversation(path)
+        mtime = os.path.getmtime(path)
+
+        archive_path = archive_conversation(path)
+        self.assertTrue(archive_path.endswith("conversation_20240101_000000.json.gz"))
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(read_conversation(archive_path), original)
+        self.assertEqual(os.path.getmtime(archive_path), mtime)
+
+    def test_archives_only_old_conversations(self):
+        old = self.write("conversation_20240101_000000.jsonl", age_days=40)
+        recent = self.write("conversation_20240201_000000.jsonl", age_days=1)
+        archived = []
+
+        stats = archive_conversations(self.directory, max_age_days=30,
+                                      on_archived=lambda path, new_path: archived.append((path, new_path)))
+        self.assertEqual(stats["archived"], 1)
+        self.assertLess(stats["bytes_after"], stats["bytes_before"])
+        self.assertEqual(stats["bytes_reclaimed"], stats["bytes_before"] - stats["bytes_after"])
+        self.assertEqual(archived, [(old, old[:-len(".jsonl")] + ".json.gz")])
+        self.assertTrue(os.path.exists(recent))
+
+        # Archives are left alone on the next run
+        self.assertEqual(archive_conversations(self.directory, max_age_days=30)["archived"], 0)
+
+    def test_unreadable_file_is_counted_and_kept(self):
+        path = os.path.join(self.directory, "conversation_20240101_000000.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        os.utime(path, (0, 0))
+        with redirect_stdout(StringIO()):
+            stats = archive_conversations(self.directory, max_age_days=30)
+        self.assertEqual((stats["archived"], stats["failed"]), (0, 1))
+        self.assertTrue(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from support import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+from storage import ConversationIndex, ConversationLog, InvalidCursor, archive_conversation
+
+
+class ConversationIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index = ConversationIndex(self.directory)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, n, exchanges=None, mtime=None):
+        path = os.path.join(self.directory, f"conversation_20240101_0000{n:02d}.jsonl")
+        exchanges = exchanges if exchanges is not None else [{"user": f"hola {n}", "bot": "hola"}]
+        ConversationLog(path).write(f"2024-01-01T00:00:{n:02d}", "llama3", exchanges)
+        mtime = mtime if mtime is not None else 1_700_000_000 + n
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def names(self, conversations):
+        return [os.path.basename(c["file"]) for c in conversations]
+
+    def test_lists_newest_first_with_metadata(self):
+        for n in range(3):
+            self.write(n)
+        conversations = self.index.list()
+        self.assertEqual(self.names(conversations), [
+            "conversation_20240101_000002.jsonl",
+            "conversation_20240101_000001.jsonl",
+            "conversation_20240101_000000.jsonl",
+        ])
+        self.assertEqual(conversations[0]["model"], "llama3")
+        self.assertEqual(conversations[0]["exchanges"], 1)
+        self.assertEqual(self.index.count(), 3)
+
+    def test_pages_with_cursor(self):
+        for n in range(5):
+            self.write(n)
+        first = self.index.list(limit=2)
+        second = self.index.list(limit=2, before=first[-1]["cursor"])
+        third = self.index.list(limit=2, before=second[-1]["cursor"])
+        self.assertEqual(len(self.names(first + second + third)), 5)
+        self.assertEqual(len(set(self.names(first + second + third))), 5)
+
+    def test_ties_on_mtime_are_ordered_by_name(self):
+        for n in range(3):
+            self.write(n, mtime=1_700_000_000)
+        first = self.index.list(limit=1)
+        rest = self.index.list(before=first[0]["cursor"])
+        self.assertEqual(self.names(first + rest), self.names(self.index.list()))
+        self.assertEqual(len(rest), 2)
+
+    def test_cursor_survives_deletion_and_archiving(self):
+        paths = [self.write(n) for n in range(4)]
+        first = self.index.list(limit=2)
+        os.remove(paths[2])
+        self.assertEqual(self.names(self.index.list(before=first[-1]["cursor"])),
+                         ["conversation_20240101_000001.jsonl", "conversation_20240101_000000.jsonl"])
+
+        first = self.index.list(limit=1)
+        archive_conversation(paths[3])
+        self.assertEqual(self.names(self.index.list(before=first[-1]["cursor"])),
+                         ["conversation_20240101_000001.jsonl", "conversation_20240101_000000.jsonl"])
+
+    def test_malformed_cursor_raises(self):
+        self.write(0)
+        for cursor in ("conversation_20240101_000000.jsonl", "soon|conversation_20240101_000000.jsonl", "1.0|"):
+            with self.assertRaises(InvalidCursor):
+                self.index.list(before=cursor)
+
+    def test_validate_picks_up_outside_changes(self):
+        path = self.write(0)
+        self.assertEqual(self.index.list()[0]["exchanges"], 1)
+        self.write(0, exchanges=[{"user": "a", "bot": "b"}, {"user": "c", "bot": "d"}], mtime=1_800_000_000)
+        self.assertEqual(self.index.list()[0]["exchanges"], 2)
+        os.remove(path)
+        self.assertEqual(self.index.list(), [])
+
+    def test_search_finds_accent_insensitive_prefix(self):
+        path = self.write(0, exchanges=[{"user": "¿Qué es el subjuntivo?", "bot": "Una explicación"}])
+        hits = self.index.search("explicacion")
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0]["file"], path)
+        self.assertIn("<mark>", hits[0]["snippet"])
+        self.assertEqual(len(self.index.search("subj")), 1)
+        self.assertEqual(self.index.search("   "), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from support import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+from storage import ConversationLog, read_conversation, find_conversation_files, resolve_conversation_path
+
+
+def exchange(n):
+    return {"user": f"pregunta {n}", "bot": f"respuesta {n}", "timestamp": f"2024-01-01T00:00:{n:02d}"}
+
+
+class ConversationLogTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "conversation_20240101_000000.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_write_append_and_read(self):
+        log = ConversationLog(self.path)
+        log.write("2024-01-01T00:00:00", "llama3", [exchange(1)])
+        log.append([exchange(2), exchange(3)])
+
+        data = ConversationLog(self.path).read()
+        self.assertEqual(data["session_start"], "2024-01-01T00:00:00")
+        self.assertEqual(data["model"], "llama3")
+        self.assertEqual(data["conversation"], [exchange(1), exchange(2), exchange(3)])
+
+    def test_append_adds_one_line_per_exchange(self):
+        log = ConversationLog(self.path)
+        log.write("2024-01-01T00:00:00", "llama3", [])
+        log.append([exchange(1)])
+        log.append([exchange(2)])
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+    def test_torn_final_line_is_skipped_and_compacted(self):
+        log = ConversationLog(self.path)
+        log.write("2024-01-01T00:00:00", "llama3", [exchange(1)])
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"type": "exchange", "user": "pregu')
+
+        reader = ConversationLog(self.path)
+        self.assertEqual(reader.read()["conversation"], [exchange(1)])
+        self.assertTrue(reader.should_compact())
+
+        reader.write("ignored", "ignored", [exchange(1)])
+        self.assertFalse(reader.should_compact())
+        data = read_conversation(self.path)
+        self.assertEqual(data["session_start"], "2024-01-01T00:00:00")
+        self.assertEqual(data["conversation"], [exchange(1)])
+
+    def test_corrupt_middle_line_raises(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"type": "header"}\nnot json\n{"type": "exchange"}\n')
+        with self.assertRaises(ValueError):
+            ConversationLog(self.path).read()
+
+    def test_compacts_after_threshold(self):
+        log = ConversationLog(self.path, compact_every=2)
+        log.write("2024-01-01T00:00:00", "llama3", [])
+        log.append([exchange(1)])
+        self.assertFalse(log.should_compact())
+        log.append([exchange(2)])
+        self.assertTrue(log.should_compact())
+
+    def test_reads_every_format(self):
+        legacy = os.path.join(self.directory, "conversation_20240102_000000.json")
+        archived = os.path.join(self.directory, "conversation_20240103_000000.json.gz")
+        payload = {"session_start": "s", "model": "m", "conversation": [exchange(1)]}
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        with gzip.open(archived, "wt", encoding="utf-8") as f:
+            json.dump(payload, f)
+        ConversationLog(self.path).write("s", "m", [exchange(1)])
+
+        self.assertEqual(sorted(find_conversation_files(self.directory)), sorted([self.path, legacy, archived]))
+        for path in (self.path, legacy, archived):
+            self.assertEqual(read_conversation(path)["conversation"], [exchange(1)])
+
+    def test_resolves_converted_and_archived_paths(self):
+        stem = os.path.join(self.directory, "conversation_20240101_000000")
+        self.assertIsNone(resolve_conversation_path(stem + ".json"))
+        ConversationLog(self.path).write("s", "m", [])
+        self.assertEqual(resolve_conversation_path(stem + ".json"), self.path)
+        os.remove(self.path)
+        with gzip.open(stem + ".json.gz", "wt", encoding="utf-8") as f:
+            f.write("{}")
+        self.assertEqual(resolve_conversation_path(stem + ".jsonl"), stem + ".json.gz")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from support import load_tutor_module
+from storage import ConversationSaver, FileConversationStore
+
+
+class Target:
+    def __init__(self, result=True, error=None):
+        self.result = result
+        self.error = error
+        self.saves = 0
+
+    def save_conversation(self):
+        self.saves += 1
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class BrokenStore(FileConversationStore):
+    broken = True
+
+    def write(self, *args, **kwargs):
+        if self.broken:
+            raise OSError("disk full")
+        return super().write(*args, **kwargs)
+
+
+class ConversationSaverTest(unittest.TestCase):
+    def setUp(self):
+        # No worker: the tests flush by hand
+        self.saver = ConversationSaver(spawn=lambda target: None)
+
+    def test_coalesces_repeated_schedules(self):
+        target = Target()
+        for _ in range(3):
+            self.saver.schedule(target)
+        self.saver.flush()
+        self.assertEqual(target.saves, 1)
+        stats = self.saver.get_stats()
+        self.assertEqual((stats["scheduled"], stats["coalesced"], stats["saves"]), (3, 2, 1))
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_flushes_only_the_given_chatbot(self):
+        first, second = Target(), Target()
+        self.saver.schedule(first)
+        self.saver.schedule(second)
+        self.saver.flush(first)
+        self.assertEqual((first.saves, second.saves), (1, 0))
+        self.assertEqual(self.saver.get_stats()["queue_depth"], 1)
+
+    def test_counts_failed_saves(self):
+        self.saver.schedule(Target(result=False))
+        self.saver.schedule(Target(error=RuntimeError("boom")))
+        self.saver.schedule(Target())
+        with redirect_stdout(StringIO()):
+            self.saver.flush()
+        stats = self.saver.get_stats()
+        self.assertEqual((stats["saves"], stats["failed"], stats["flushes"]), (1, 2, 1))
+        self.assertGreaterEqual(stats["max_save_delay_ms"], 0)
+
+    def test_failed_saves_stay_pending(self):
+        target = Target(result=False)
+        self.saver.schedule(target)
+        self.assertFalse(self.saver.flush())
+        self.assertEqual(self.saver.get_stats()["queue_depth"], 1)
+
+        target.result = True
+        self.assertTrue(self.saver.flush(target))
+        self.assertEqual(target.saves, 2)
+        self.assertEqual(self.saver.get_stats()["queue_depth"], 0)
+
+    def test_stop_flushes_pending(self):
+        target = Target()
+        self.saver.schedule(target)
+        self.saver.stop()
+        self.assertEqual(target.saves, 1)
+        self.assertFalse(self.saver.get_stats()["running"])
+
+
+class ChatbotSaveTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.tutor = load_tutor_module()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_chatbot(self, store, saver):
+        return self.tutor.SpanishTutorChatbot(
+            model="llama3", conversation_store=store, conversation_saver=saver,
+            user_info={"user_id": "test", "conversations_dir": self.directory}
+        )
+
+    def test_failed_chatbot_save_is_retried(self):
+        saver = ConversationSaver(spawn=lambda target: None)
+        store = BrokenStore(self.directory)
+        chatbot = self.make_chatbot(store, saver)
+        chatbot.conversation_history.append({"user": "hola", "bot": "hola", "timestamp": "t"})
+        chatbot.request_save()
+        with redirect_stdout(StringIO()):
+            self.assertFalse(chatbot.flush_save())
+        self.assertEqual(saver.get_stats()["failed"], 1)
+
+        # Not reported as saved just because the saver has nothing pending for it
+        saver.pending.clear()
+        with redirect_stdout(StringIO()):
+            self.assertFalse(chatbot.flush_save())
+        store.broken = False
+        self.assertTrue(chatbot.flush_save())
+        self.assertEqual(store.list()[0]["exchanges"], 1)
+        store.close()
+
+    def test_chatbot_save_is_written(self):
+        saver = ConversationSaver(spawn=lambda target: None)
+        store = FileConversationStore(self.directory)
+        chatbot = self.make_chatbot(store, saver)
+        chatbot.conversation_history.append({"user": "hola", "bot": "hola", "timestamp": "t"})
+        chatbot.request_save()
+        self.assertTrue(chatbot.flush_save())
+        self.assertEqual(saver.get_stats()["saves"], 1)
+        self.assertEqual(store.list()[0]["exchanges"], 1)
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
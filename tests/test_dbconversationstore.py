@@ -0,0 +1,107 @@
+import gzip
+import json
+import os
+import unittest
+from datetime import datetime
+
+from support import DatabaseTestCase, add_user
+from storage import ConversationLog, InvalidCursor
+from web_gui.conversationstore import DatabaseConversationStore, import_conversation_files, init_search_index
+from web_gui.models import db, User
+
+
+def exchange(n, user=None):
+    return {"user": user or f"pregunta {n}", "bot": f"respuesta {n}", "timestamp": f"2024-01-01T00:00:{n:02d}"}
+
+
+class DatabaseConversationStoreTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        init_search_index(self.app)
+        self.store = DatabaseConversationStore(self.app, self.user_id)
+
+    def save(self, n, exchanges):
+        key = self.store.new_key(datetime(2024, 1, 1, 0, 0, n))
+        return self.store.write(key, f"2024-01-01T00:00:{n:02d}", "llama3", exchanges)
+
+    def test_write_append_and_read(self):
+        key = self.save(0, [exchange(1)])
+        history = [exchange(1), exchange(2), exchange(3)]
+        self.assertEqual(self.store.append(key, "ignored", "ignored", history, 1), key)
+
+        data = self.store.read(key)
+        self.assertEqual(data["session_start"], "2024-01-01T00:00:00")
+        self.assertEqual(data["model"], "llama3")
+        self.assertEqual([e["user"] for e in data["conversation"]], [e["user"] for e in history])
+        self.assertEqual(self.store.list()[0]["exchanges"], 3)
+
+    def test_write_replaces_exchanges(self):
+        key = self.save(0, [exchange(1), exchange(2)])
+        self.store.write(key, "later", "other", [exchange(3)])
+        data = self.store.read(key)
+        self.assertEqual(data["session_start"], "2024-01-01T00:00:00")
+        self.assertEqual([e["user"] for e in data["conversation"]], ["pregunta 3"])
+
+    def test_resolve_is_scoped_to_user(self):
+        key = self.save(0, [exchange(1)])
+        self.assertEqual(self.store.resolve(key + ".jsonl"), key)
+        other = DatabaseConversationStore(self.app, add_user(self.app, "luis@example.com"))
+        self.assertIsNone(other.resolve(key))
+        with self.assertRaises(LookupError):
+            other.read(key)
+
+    def test_pages_with_cursor_after_delete(self):
+        keys = [self.save(n, [exchange(n)]) for n in range(4)]
+        first = self.store.list(limit=2)
+        self.assertEqual([c["file"] for c in first], [keys[3], keys[2]])
+
+        with self.app.app_context():
+            db.session.delete(self.store.get_conversation(keys[2]))
+            db.session.commit()
+        rest = self.store.list(before=first[-1]["cursor"])
+        self.assertEqual([c["file"] for c in rest], [keys[1], keys[0]])
+
+        with self.assertRaises(InvalidCursor):
+            self.store.list(before="yesterday|" + keys[0])
+
+    def test_version_changes_with_each_save(self):
+        key = self.save(0, [exchange(1)])
+        version, modified_at = self.store.version(key)
+        self.store.append(key, "", "", [exchange(1), exchange(2)], 1)
+        self.assertNotEqual(self.store.version(key)[0], version)
+        self.assertIsNotNone(modified_at.tzinfo)
+        self.assertIsNone(self.store.version("conversation_missing"))
+
+    def test_search_only_sees_own_conversations(self):
+        self.save(0, [exchange(1, "¿Cuándo uso el subjuntivo?")])
+        other = DatabaseConversationStore(self.app, add_user(self.app, "luis@example.com"))
+        other.write("conversation_20240101_000009", "s", "m", [exchange(1, "subjuntivo otra vez")])
+
+        hits = self.store.search("subjuntivo")
+        self.assertEqual(len(hits), 1)
+        self.assertIn("<mark>", hits[0]["snippet"])
+        self.assertEqual([(hit["file"], hit["position"]) for hit in self.store.search("cuando")],
+                         [(hits[0]["file"], hits[0]["position"])])
+
+    def test_imports_files_once(self):
+        with self.app.app_context():
+            directory_id = db.session.get(User, self.user_id).get_user_directory_id()
+        conversations_dir = os.path.join(self.directory, "users", directory_id, "conversations")
+        os.makedirs(conversations_dir)
+        ConversationLog(os.path.join(conversations_dir, "conversation_20240101_000000.jsonl")).write(
+            "s", "m", [exchange(1), exchange(2)])
+        with gzip.open(os.path.join(conversations_dir, "conversation_20240101_000001.json.gz"), "wt") as f:
+            json.dump({"session_start": "s", "model": "m", "conversation": [exchange(3)]}, f)
+
+        users_dir = os.path.join(self.directory, "users")
+        with self.app.app_context():
+            stats = import_conversation_files(users_dir, log=lambda message: None)
+            again = import_conversation_files(users_dir, log=lambda message: None)
+        self.assertEqual((stats["imported"], stats["exchanges"]), (2, 3))
+        self.assertEqual(again["skipped"], 2)
+        self.assertEqual(sorted(c["file"] for c in self.store.list()),
+                         ["conversation_20240101_000000", "conversation_20240101_000001"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import threading
+import time
+import unittest
+
+from support import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+from web_gui.dispatcher import InferenceDispatcher, DispatcherQueueFull
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.01)
+
+
+class InferenceDispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = None
+
+    def tearDown(self):
+        if self.dispatcher is not None:
+            self.dispatcher.stop()
+
+    def make(self, **kwargs):
+        self.dispatcher = InferenceDispatcher(**kwargs)
+        return self.dispatcher
+
+    def test_runs_each_users_jobs_in_order(self):
+        dispatcher = self.make(max_workers=4)
+        order = []
+        lock = threading.Lock()
+
+        def job(user, n):
+            def run():
+                time.sleep(0.005)
+                with lock:
+                    order.append((user, n))
+            return run
+
+        for n in range(5):
+            for user in ("a", "b"):
+                dispatcher.submit(user, job(user, n))
+        wait_for(lambda: dispatcher.get_stats()['completed'] == 10)
+
+        for user in ("a", "b"):
+            self.assertEqual([n for u, n in order if u == user], list(range(5)))
+
+    def test_one_job_per_user_at_a_time(self):
+        dispatcher = self.make(max_workers=4)
+        running = []
+        overlap = []
+
+        def run():
+            running.append(1)
+            overlap.append(len(running))
+            time.sleep(0.01)
+            running.pop()
+
+        for _ in range(4):
+            dispatcher.submit("a", run)
+        wait_for(lambda: dispatcher.get_stats()['completed'] == 4)
+        self.assertEqual(max(overlap), 1)
+
+    def test_reports_position_in_line(self):
+        dispatcher = self.make(max_workers=1)
+        release = threading.Event()
+        self.assertEqual(dispatcher.submit("a", release.wait), 0)
+        wait_for(lambda: dispatcher.get_stats()['active'] == 1)
+        self.assertEqual(dispatcher.submit("b", lambda: None), 1)
+        # Behind the ready user b, then also behind its own earlier job
+        self.assertEqual(dispatcher.submit("a", lambda: None), 2)
+        self.assertEqual(dispatcher.submit("a", lambda: None), 3)
+        release.set()
+        wait_for(lambda: dispatcher.get_stats()['completed'] == 4)
+        self.assertEqual(dispatcher.submit("c", lambda: None), 0)
+
+    def test_rejects_when_user_queue_full(self):
+        dispatcher = self.make(max_workers=1, max_per_user=2)
+        release = threading.Event()
+        dispatcher.submit("a", release.wait)
+        wait_for(lambda: dispatcher.get_stats()['active'] == 1)
+        dispatcher.submit("a", lambda: None)
+        dispatcher.submit("a", lambda: None)
+        with self.assertRaises(DispatcherQueueFull):
+            dispatcher.submit("a", lambda: None)
+        # Other users still get in
+        dispatcher.submit("b", lambda: None)
+        release.set()
+        wait_for(lambda: dispatcher.get_stats()['completed'] == 4)
+        self.assertEqual(dispatcher.get_stats()['rejected'], 1)
+
+    def test_rejects_when_global_queue_full(self):
+        dispatcher = self.make(max_workers=1, max_queue_depth=2)
+        release = threading.Event()
+        dispatcher.submit("a", release.wait)
+        wait_for(lambda: dispatcher.get_stats()['active'] == 1)
+        dispatcher.submit("b", lambda: None)
+        dispatcher.submit("c", lambda: None)
+        with self.assertRaises(DispatcherQueueFull):
+            dispatcher.submit("d", lambda: None)
+        release.set()
+        wait_for(lambda: dispatcher.get_stats()['completed'] == 3)
+        self.assertEqual(dispatcher.get_stats()['queued'], 0)
+
+    def test_failed_job_does_not_stall_user(self):
+        dispatcher = self.make(max_workers=1)
+        done = threading.Event()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertLogs("web_gui.dispatcher", level="ERROR"):
+            dispatcher.submit("a", fail)
+            dispatcher.submit("a", done.set)
+            self.assertTrue(done.wait(5))
+            wait_for(lambda: dispatcher.get_stats()['failed'] == 1)
+        self.assertFalse(dispatcher.has_jobs("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
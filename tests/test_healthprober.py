@@ -0,0 +1,57 @@
+import threading
+import unittest
+
+from support import FakeOllama
+from backends import OllamaBackendPool, OllamaClient, OllamaHealthProber
+
+
+class OllamaHealthProberTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeOllama(models=("llama3:latest", "mistral:latest"))
+        self.client = OllamaClient()
+        self.pool = OllamaBackendPool([self.server.host], self.client)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def tag_requests(self):
+        return [path for method, path, _ in self.server.requests if path == "/api/tags"]
+
+    def test_concurrent_callers_share_the_first_probe(self):
+        prober = OllamaHealthProber(self.pool, self.client, interval=3600)
+        statuses = []
+        threads = [threading.Thread(target=lambda: statuses.append(prober.get_status())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        prober.stop()
+
+        self.assertEqual(len(self.tag_requests()), 1)
+        for status in statuses:
+            self.assertTrue(status["connected"])
+            self.assertIsNotNone(status["checked_at"])
+            self.assertEqual(status["models"], ["llama3:latest", "mistral:latest"])
+
+    def test_reports_not_checked_until_first_probe(self):
+        prober = OllamaHealthProber(self.pool, self.client, timeout=0.05, spawn=lambda target: None)
+        status = prober.get_status()
+        self.assertFalse(status["connected"])
+        self.assertIsNone(status["checked_at"])
+        self.assertEqual(self.tag_requests(), [])
+
+    def test_unhealthy_host_is_reported_to_pool(self):
+        self.server.status = 503
+        prober = OllamaHealthProber(self.pool, self.client, interval=3600)
+        prober.probe()
+        prober.probe()
+        status = prober.get_status()
+        prober.stop()
+        self.assertFalse(status["connected"])
+        self.assertEqual(status["hosts"][0]["error"], "Received status code 503")
+        self.assertFalse(self.pool.get_stats()[0]["healthy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import logging
+import queue
+import unittest
+
+from support import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+from web_gui.logpipeline import (
+    JSONFormatter,
+    LogPipeline,
+    PipelineQueueHandler,
+    SamplingFilter,
+    parse_level,
+    parse_mapping
+)
+
+
+def make_record(name="spanish_tutor.chat", level=logging.INFO, message="hola %s", args=("ana",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, message, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class SettingsTest(unittest.TestCase):
+    def test_parse_mapping(self):
+        self.assertEqual(parse_mapping("werkzeug=warning, spanish_tutor.chat = 0.1", str),
+                         {"werkzeug": "warning", "spanish_tutor.chat": "0.1"})
+        self.assertEqual(parse_mapping("a=0.5,junk", float), {"a": 0.5})
+        self.assertEqual(parse_mapping(None), {})
+
+    def test_parse_level(self):
+        self.assertEqual(parse_level("warning"), logging.WARNING)
+        self.assertEqual(parse_level("10"), logging.DEBUG)
+        with self.assertRaises(ValueError):
+            parse_level("loud")
+
+
+class JSONFormatterTest(unittest.TestCase):
+    def test_includes_extra_fields(self):
+        record = make_record(user="ana@example.com", duration_ms=12, session=object())
+        entry = json.loads(JSONFormatter().format(record))
+        self.assertEqual(entry["message"], "hola ana")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["user"], "ana@example.com")
+        self.assertEqual(entry["duration_ms"], 12)
+        self.assertIsInstance(entry["session"], str)
+        self.assertNotIn("args", entry)
+
+
+class SamplingFilterTest(unittest.TestCase):
+    def test_keeps_an_even_fraction(self):
+        sampler = SamplingFilter({"spanish_tutor.chat": 0.25})
+        kept = [sampler.filter(make_record()) for _ in range(100)]
+        self.assertEqual(sum(kept), 25)
+        self.assertEqual(sampler.sampled_out, 75)
+
+    def test_applies_to_child_loggers_only(self):
+        sampler = SamplingFilter({"spanish_tutor": 0.0})
+        self.assertFalse(sampler.filter(make_record("spanish_tutor.chat")))
+        self.assertTrue(sampler.filter(make_record("web_gui.app")))
+
+    def test_always_keeps_warnings(self):
+        sampler = SamplingFilter({"spanish_tutor.chat": 0.0})
+        self.assertTrue(sampler.filter(make_record(level=logging.WARNING)))
+
+    def test_marks_kept_records(self):
+        sampler = SamplingFilter({"spanish_tutor.chat": 0.5})
+        records = [make_record() for _ in range(2)]
+        kept = [record for record in records if sampler.filter(record)]
+        self.assertEqual([record.sample_rate for record in kept], [0.5])
+
+
+class PipelineQueueHandlerTest(unittest.TestCase):
+    def test_drops_when_full(self):
+        handler = PipelineQueueHandler(queue.Queue(1))
+        handler.handle(make_record())
+        handler.handle(make_record())
+        self.assertEqual(handler.dropped, 1)
+        # Records are queued as they are, to be formatted by the listener
+        self.assertEqual(handler.queue.get_nowait().args, ("ana",))
+
+
+class LogPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.root_level = self.root.level
+        self.handler = ListHandler()
+        self.pipeline = LogPipeline([self.handler], level=logging.INFO,
+                                    levels={"test.noisy": logging.ERROR},
+                                    sample_rates={"test.sampled": 0.5})
+
+    def tearDown(self):
+        self.pipeline.stop()
+        self.root.removeHandler(self.pipeline.queue_handler)
+        self.root.setLevel(self.root_level)
+        logging.getLogger("test.noisy").setLevel(logging.NOTSET)
+
+    def test_writes_on_listener_with_levels_and_sampling(self):
+        self.pipeline.start()
+        self.pipeline.start()
+        logging.getLogger("test.app").info("kept")
+        logging.getLogger("test.app").debug("below root level")
+        logging.getLogger("test.noisy").warning("below logger level")
+        for n in range(4):
+            logging.getLogger("test.sampled").info("turn %d", n)
+        self.pipeline.stop()
+
+        messages = [record.getMessage() for record in self.handler.records]
+        self.assertEqual(messages, ["kept", "turn 1", "turn 3"])
+        stats = self.pipeline.get_stats()
+        self.assertEqual((stats["sampled_out"], stats["dropped"]), (2, 0))
+        self.assertEqual(stats["levels"], {"test.noisy": "ERROR"})
+
+
+if __name__ == "__main__":
+    unittest.main()
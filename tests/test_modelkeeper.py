@@ -0,0 +1,48 @@
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from support import FakeOllama
+from backends import OllamaBackendPool, OllamaClient, OllamaModelKeeper
+
+
+class OllamaModelKeeperTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeOllama()
+        self.client = OllamaClient()
+        self.pool = OllamaBackendPool([self.server.host], self.client)
+        self.keeper = OllamaModelKeeper(self.pool, self.client, ["llama3"], keep_alive="10m",
+                                        spawn=lambda target: None)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def warm_up(self):
+        with redirect_stdout(StringIO()):
+            self.keeper.run_once()
+        return self.keeper.get_stats()["models"][0]
+
+    def test_preloads_with_keep_alive(self):
+        status = self.warm_up()
+        self.assertTrue(status["loaded"])
+        self.assertEqual(status["load_duration_ms"], 1.5)
+        self.assertEqual(self.server.posts("/api/generate"), [{"model": "llama3", "keep_alive": "10m"}])
+
+    def test_first_load_is_the_first_successful_one(self):
+        self.server.status = 503
+        status = self.warm_up()
+        self.assertFalse(status["loaded"])
+        self.assertIsNone(status["first_load_ms"])
+
+        self.server.status = 200
+        self.assertEqual(self.warm_up()["first_load_ms"], 1.5)
+
+        # Later refreshes of a resident model don't replace the cold load time
+        self.server.load_duration = 100_000
+        status = self.warm_up()
+        self.assertEqual((status["load_duration_ms"], status["first_load_ms"], status["refreshes"]), (0.1, 1.5, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+import requests
+
+from support import FakeOllama
+from backends import OllamaClient
+
+
+class OllamaClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeOllama()
+        self.client = OllamaClient(pool_size=2)
+        self.base_url = f"http://{self.server.host}/api"
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def test_reuses_pooled_connections(self):
+        for _ in range(5):
+            self.assertTrue(self.client.check_connection(self.base_url))
+        self.client.post(f"{self.base_url}/chat", json={"model": "llama3", "stream": False}).json()
+        self.assertEqual(len(self.server.requests), 6)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_records_latency_per_endpoint(self):
+        for _ in range(3):
+            self.client.get(f"{self.base_url}/tags")
+        self.server.status = 503
+        self.client.post(f"{self.base_url}/chat", json={"stream": False})
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.client.get("http://127.0.0.1:9/api/tags", timeout=1)
+
+        stats = self.client.get_stats()
+        self.assertEqual((stats["requests"], stats["errors"], stats["pool_size"]), (5, 2, 2))
+        self.assertEqual(stats["endpoints"]["/api/tags"]["requests"], 4)
+        self.assertEqual(stats["endpoints"]["/api/tags"]["errors"], 1)
+        self.assertEqual(stats["endpoints"]["/api/chat"]["errors"], 1)
+
+    def test_latency_percentiles(self):
+        for ms in range(1, 101):
+            self.client.record_latency("/api/chat", ms / 1000)
+        stats = self.client.get_stats()["endpoints"]["/api/chat"]
+        self.assertEqual(stats["avg_latency_ms"], 50.5)
+        self.assertEqual(stats["max_latency_ms"], 100.0)
+        self.assertEqual(stats["p50_latency_ms"], 51.0)
+        self.assertEqual(stats["p95_latency_ms"], 96.0)
+
+    def test_latency_window_keeps_recent_requests(self):
+        client = OllamaClient(latency_window=2)
+        for ms in (500, 10, 20):
+            client.record_latency("/api/chat", ms / 1000)
+        stats = client.get_stats()["endpoints"]["/api/chat"]
+        # Percentiles cover the window; totals and the maximum cover every request
+        self.assertEqual((stats["p50_latency_ms"], stats["p95_latency_ms"]), (20.0, 20.0))
+        self.assertEqual((stats["requests"], stats["max_latency_ms"]), (3, 500.0))
+        client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
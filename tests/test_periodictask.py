@@ -0,0 +1,49 @@
+import threading
+import unittest
+
+from support import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+from background import PeriodicTask, spawn_thread
+
+
+class CountingTask(PeriodicTask):
+    def __init__(self, runs_before_stop, **kwargs):
+        super().__init__(interval=5, **kwargs)
+        self.runs = 0
+        self.runs_before_stop = runs_before_stop
+
+    def run_once(self):
+        self.runs += 1
+        if self.runs == self.runs_before_stop:
+            self.stop()
+
+
+class PeriodicTaskTest(unittest.TestCase):
+    def test_runs_until_stopped_sleeping_between_runs(self):
+        spawned, sleeps = [], []
+        task = CountingTask(3, spawn=spawned.append, sleep=sleeps.append)
+        task.start()
+        task.start()
+        self.assertEqual(len(spawned), 1)
+
+        spawned[0]()
+        self.assertEqual(task.runs, 3)
+        self.assertEqual(sleeps, [5, 5, 5])
+        self.assertFalse(task.running)
+
+        # Can be started again once stopped
+        task.start()
+        self.assertEqual(len(spawned), 2)
+
+    def test_default_spawn_uses_a_daemon_thread(self):
+        done = threading.Event()
+        thread = spawn_thread(done.set)
+        self.assertTrue(done.wait(5))
+        self.assertTrue(thread.daemon)
+
+    def test_subclasses_must_implement_run_once(self):
+        with self.assertRaises(TypeError):
+            PeriodicTask(interval=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from support import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+from caching import ResponseCache
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_key_ignores_case_whitespace_and_punctuation(self):
+        cache = ResponseCache()
+        context = [{"role": "system", "content": "tutor"}]
+        self.assertEqual(cache.make_key("m", "¿Cómo  estás?", context), cache.make_key("m", "cómo estás", context))
+        self.assertNotEqual(cache.make_key("m", "hola", context), cache.make_key("m", "hola", []))
+        self.assertNotEqual(cache.make_key("m", "hola", context), cache.make_key("n", "hola", context))
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+        self.assertEqual(cache.get("a"), "A")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+    def test_expired_entries_miss(self):
+        cache = ResponseCache(ttl_seconds=60)
+        cache.put("a", "A")
+        cache.entries["a"] = ("A", time.time() - 120)
+        self.assertIsNone(cache.get("a"))
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expirations"]), (0, 1, 1))
+
+    def test_save_and_load_round_trip(self):
+        cache = ResponseCache(persist_path=self.path)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.save()
+
+        reloaded = ResponseCache(persist_path=self.path)
+        self.assertEqual(reloaded.get("a"), "A")
+        self.assertEqual(reloaded.get("b"), "B")
+
+    def test_failed_save_is_retried(self):
+        cache = ResponseCache(persist_path=self.path)
+        cache.put("a", "A")
+        with mock.patch("os.replace", side_effect=OSError("disk full")), redirect_stdout(StringIO()):
+            cache.save()
+        # No temp file left behind, and still dirty so the next save writes it
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertTrue(cache.dirty)
+
+        cache.save()
+        self.assertFalse(cache.dirty)
+        self.assertEqual(ResponseCache(persist_path=self.path).get("a"), "A")
+
+    def test_load_skips_expired_entries(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"entries": [["old", "Old", time.time() - 120], ["new", "New", time.time()]]}, f)
+        cache = ResponseCache(ttl_seconds=60, persist_path=self.path)
+        self.assertIsNone(cache.get("old"))
+        self.assertEqual(cache.get("new"), "New")
+
+    def test_put_does_not_write_on_the_calling_thread(self):
+        spawned = []
+        cache = ResponseCache(persist_path=self.path, save_interval=0, spawn=spawned.append)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        self.assertFalse(os.path.exists(self.path))
+        # Only one save is in flight at a time
+        self.assertEqual(len(spawned), 1)
+
+        spawned[0]()
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)["entries"]), 2)
+        cache.put("c", "C")
+        self.assertEqual(len(spawned), 2)
+
+    def test_without_spawn_saves_only_on_request(self):
+        cache = ResponseCache(persist_path=self.path, save_interval=0)
+        cache.put("a", "A")
+        self.assertFalse(os.path.exists(self.path))
+        cache.save()
+        self.assertTrue(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import gzip
+import json
+import unittest
+from datetime import datetime
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from support import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+from storage.jsoncodec import orjson
+from web_gui.responses import FastJSONProvider, ResponseCompressor
+
+PAYLOAD = {"b": "¿Qué tal?", "a": [1, 2.5, None, True], "when": datetime(2024, 1, 2, 3, 4, 5)}
+
+
+class FastJSONProviderTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.default = DefaultJSONProvider(self.app)
+        self.app.json = FastJSONProvider(self.app)
+
+    def test_matches_the_default_provider(self):
+        self.assertEqual(json.loads(self.app.json.dumps(PAYLOAD)), json.loads(self.default.dumps(PAYLOAD)))
+        self.assertEqual(self.app.json.loads('{"a": "ñ"}'), {"a": "ñ"})
+        with self.app.app_context():
+            body = jsonify(PAYLOAD).get_data()
+        self.assertEqual(json.loads(body), json.loads(self.default.response(PAYLOAD).get_data()))
+        self.assertEqual(json.loads(body)["when"], "Tue, 02 Jan 2024 03:04:05 GMT")
+
+    def test_keeps_key_order_sorted(self):
+        keys = list(json.loads(self.app.json.dumps({"z": 1, "m": 2, "a": 3})))
+        self.assertEqual(keys, ["a", "m", "z"])
+
+    def test_extra_dumps_arguments_use_the_stdlib_encoder(self):
+        self.assertEqual(self.app.json.dumps({"a": 1}, indent=2), '{\n  "a": 1\n}')
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_serializes_with_orjson(self):
+        with self.app.app_context():
+            body = jsonify(PAYLOAD).get_data()
+        self.assertEqual(body, orjson.dumps(json.loads(body), option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE))
+
+
+class ResponseCompressorTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.compressor = ResponseCompressor(min_size=100)
+        self.compressor.init_app(self.app)
+
+        @self.app.route("/big")
+        def big():
+            response = jsonify({"messages": ["hola amigo"] * 100})
+            response.set_etag("v1")
+            return response
+
+        @self.app.route("/small")
+        def small():
+            return jsonify({"ok": True})
+
+        @self.app.route("/stream")
+        def stream():
+            return self.app.response_class((chunk for chunk in ["hola " * 100]), mimetype="text/plain")
+
+        self.client = self.app.test_client()
+
+    def test_gzips_large_responses(self):
+        plain = self.client.get("/big").get_data()
+        response = self.client.get("/big", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(gzip.decompress(response.get_data()), plain)
+        # The same ETag would otherwise promise identical bytes for both encodings
+        self.assertEqual(response.headers["ETag"], 'W/"v1"')
+
+        stats = self.compressor.get_stats()
+        self.assertEqual(stats["compressed"]["gzip"], 1)
+        self.assertEqual(stats["bytes_in"], len(plain))
+        self.assertLess(stats["bytes_out"], stats["bytes_in"])
+
+    def test_leaves_small_responses_alone(self):
+        response = self.client.get("/small", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.get_json(), {"ok": True})
+        self.assertEqual(self.compressor.get_stats()["skipped_small"], 1)
+
+    def test_honours_accept_encoding(self):
+        for accept in (None, "identity", "gzip;q=0"):
+            headers = {"Accept-Encoding": accept} if accept else {}
+            response = self.client.get("/big", headers=headers)
+            self.assertNotIn("Content-Encoding", response.headers)
+            self.assertIn("Accept-Encoding", response.headers["Vary"])
+        preferred = self.client.get("/big", headers={"Accept-Encoding": "br;q=0.5, gzip"})
+        self.assertEqual(preferred.headers["Content-Encoding"], "gzip")
+
+    def test_skips_streamed_responses(self):
+        response = self.client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.get_data(as_text=True), "hola " * 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
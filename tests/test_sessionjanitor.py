@@ -0,0 +1,79 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from support import DatabaseTestCase
+from web_gui.models import db, UserSession
+from web_gui.sessionjanitor import SessionJanitor
+
+
+class SessionJanitorTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sleeps = []
+
+    def add_sessions(self, expired, active=0):
+        now = datetime.utcnow()
+        with self.app.app_context():
+            db.session.add_all([
+                UserSession(session_id=f"s{index}", user_id=self.user_id,
+                            expires_at=now - timedelta(hours=1) if index < expired else now + timedelta(hours=1))
+                for index in range(expired + active)
+            ])
+            db.session.commit()
+
+    def remaining(self):
+        with self.app.app_context():
+            return UserSession.query.count()
+
+    def make_janitor(self, **kwargs):
+        return SessionJanitor(self.app, sleep=self.sleeps.append, **kwargs)
+
+    def test_purges_expired_in_batches(self):
+        self.add_sessions(expired=25, active=3)
+        janitor = self.make_janitor(batch_size=10)
+        with self.assertLogs("web_gui.sessionjanitor", level="INFO") as logs:
+            self.assertEqual(janitor.purge(), 25)
+        self.assertEqual(self.remaining(), 3)
+        # Yields between full batches, not after the last partial one
+        self.assertEqual(self.sleeps, [0, 0])
+        self.assertIn("Purged 25 expired session(s)", logs.output[0])
+
+        stats = janitor.get_stats()
+        self.assertEqual((stats["runs"], stats["rows_purged"], stats["last_purged"]), (1, 25, 25))
+
+    def test_stops_after_max_batches(self):
+        self.add_sessions(expired=25)
+        janitor = self.make_janitor(batch_size=10, max_batches=2)
+        self.assertEqual(janitor.purge(), 20)
+        self.assertEqual(janitor.purge(), 5)
+        self.assertEqual(self.remaining(), 0)
+
+    def test_counts_failures_and_rolls_back(self):
+        janitor = self.make_janitor()
+        with mock.patch.object(UserSession, "cleanup_expired_sessions", side_effect=RuntimeError("locked")):
+            with self.assertRaises(RuntimeError):
+                janitor.purge()
+        stats = janitor.get_stats()
+        self.assertEqual((stats["failures"], stats["runs"]), (1, 1))
+
+    def test_background_loop_survives_errors(self):
+        spawned = []
+        janitor = SessionJanitor(self.app, interval=5, spawn=spawned.append, sleep=lambda seconds: janitor.stop())
+        janitor.start()
+        janitor.start()
+        self.assertEqual(len(spawned), 1)
+
+        with mock.patch.object(janitor, "purge", side_effect=RuntimeError("locked")):
+            with self.assertLogs("web_gui.sessionjanitor", level="ERROR") as logs:
+                spawned[0]()
+        self.assertIn("Session cleanup failed: locked", logs.output[0])
+
+    def test_disabled_without_interval(self):
+        spawned = []
+        SessionJanitor(self.app, interval=0, spawn=spawned.append).start()
+        self.assertEqual(spawned, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
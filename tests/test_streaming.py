@@ -0,0 +1,47 @@
+import json
+import shutil
+import tempfile
+import unittest
+
+from support import FakeOllama, load_tutor_module
+
+
+class StreamMessageTest(unittest.TestCase):
+    def setUp(self):
+        self.ollama = FakeOllama(reply="Hola amigo")
+        self.directory = tempfile.mkdtemp()
+        tutor = load_tutor_module()
+        self.chatbot = tutor.SpanishTutorChatbot(
+            ollama_host=self.ollama.host, model="llama3",
+            user_info={"user_id": "test", "conversations_dir": self.directory}
+        )
+
+    def tearDown(self):
+        self.chatbot.conversation_store.close()
+        self.ollama.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_streams_chunks_and_records_exchange(self):
+        chunks = list(self.chatbot.stream_message("hola"))
+        self.assertEqual("".join(chunks), "Hola amigo")
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(self.chatbot.conversation_history[-1]["bot"], "Hola amigo")
+
+    def test_malformed_line_yields_error_chunk(self):
+        self.ollama.chat_lines = [
+            json.dumps({"message": {"content": "Hola"}, "done": False}),
+            '{"message": {"content": " ami',
+        ]
+        chunks = list(self.chatbot.stream_message("hola"))
+        self.assertEqual(chunks[0], "Hola")
+        self.assertTrue(chunks[-1].startswith("Error:"))
+        self.assertEqual(self.chatbot.conversation_history, [])
+
+    def test_http_error_yields_error_chunk(self):
+        self.ollama.status = 503
+        chunks = list(self.chatbot.stream_message("hola"))
+        self.assertEqual(chunks, ["Error: Received status code 503"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import time
+import unittest
+
+from support import DatabaseTestCase, add_user
+from web_gui.models import db, User
+from web_gui.usercache import UserCache, invalidate_cached_user
+
+
+class UserCacheTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = UserCache(ttl_seconds=60)
+        self.cache.init_app(self.app)
+
+    def rename(self, display_name):
+        with self.app.app_context():
+            db.session.get(User, self.user_id).display_name = display_name
+            db.session.commit()
+
+    def test_snapshot_matches_user(self):
+        with self.app.app_context():
+            user = db.session.get(User, self.user_id)
+            snapshot = self.cache.get(self.user_id)
+            self.assertEqual(snapshot.email, user.email)
+            self.assertEqual(snapshot.get_user_directory_id(), user.get_user_directory_id())
+            self.assertEqual(snapshot.get_data_paths(), user.get_data_paths())
+            self.assertEqual(snapshot.to_dict(), user.to_dict())
+            self.assertTrue(snapshot.is_authenticated)
+            self.assertEqual(snapshot.get_id(), str(self.user_id))
+
+    def test_serves_from_memory_until_invalidated(self):
+        with self.app.app_context():
+            first = self.cache.get(self.user_id)
+        self.rename("renamed")
+        with self.app.app_context():
+            self.assertIs(self.cache.get(self.user_id), first)
+            invalidate_cached_user(self.app, self.user_id)
+            self.assertEqual(self.cache.get(self.user_id).display_name, "renamed")
+        stats = self.cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["invalidations"]), (1, 2, 1))
+
+    def test_expires_after_ttl(self):
+        self.cache.ttl_seconds = 0.05
+        with self.app.app_context():
+            self.cache.get(self.user_id)
+            self.rename("later")
+            time.sleep(0.1)
+            self.assertEqual(self.cache.get(self.user_id).display_name, "later")
+
+    def test_unknown_user_is_not_cached(self):
+        with self.app.app_context():
+            self.assertIsNone(self.cache.get(9999))
+        self.assertEqual(self.cache.get_stats()["entries"], 0)
+
+    def test_keeps_most_recently_used(self):
+        cache = UserCache(max_entries=1)
+        other_id = add_user(self.app, "luis@example.com")
+        with self.app.app_context():
+            cache.get(self.user_id)
+            cache.get(other_id)
+        self.assertEqual(list(cache.entries), [other_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
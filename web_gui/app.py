@@ -8,16 +8,21 @@ Provides a modern, responsive chat interface with user authentication.
 
 import os
 import sys
-import json
+import atexit
+import hashlib
 import importlib.util
+import click
+import functools
 from datetime import datetime
 from typing import Dict, List, Optional
 import threading
+import time
 import queue
 import logging
 from logging.handlers import RotatingFileHandler
 
 from flask import Flask, render_template, request, jsonify, send_file, send_from_directory
+from flask.logging import default_handler
 from flask_socketio import SocketIO, emit, disconnect
 from flask_cors import CORS
 from flask_login import LoginManager, current_user
@@ -26,10 +31,23 @@ from flask_limiter.util import get_remote_address
 
 from web_gui.models import db, User, UserSession, init_database
 from web_gui.auth import auth_bp, require_auth_api
+from web_gui.dispatcher import InferenceDispatcher, DispatcherQueueFull
+from web_gui.responses import FastJSONProvider, ResponseCompressor
+from web_gui.chatbotstate import ChatbotState, LocalChatbotState, create_chatbot_state
+from web_gui.messagequeue import create_client_manager
+from web_gui.logpipeline import JSONFormatter, LogPipeline, parse_level, parse_mapping
+from web_gui.usercache import UserCache
+from web_gui.sessionjanitor import SessionJanitor
 
 # Add parent directory to path to import the chatbot
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from backends import OllamaClient, OllamaBackendPool, OllamaHealthProber, OllamaModelKeeper
+from caching import ResponseCache
+from storage import ConversationSaver, FileConversationStore, InvalidCursor
+from storage.jsoncodec import JSON_BACKEND
+from web_gui.conversationstore import DatabaseConversationStore, import_conversation_files, init_search_index
+
 # Import the existing chatbot logic
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 spanish_tutor_path = os.path.join(parent_dir, "spanish-tutor.py")
@@ -42,6 +60,7 @@ SpanishTutorChatbot = spanish_tutor_module.SpanishTutorChatbot
 
 # Initialize Flask app
 app = Flask(__name__, static_folder='static/dist', static_url_path='/static')
+app.json = FastJSONProvider(app)
 
 # Configuration
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'spanish-tutor-secret-key-change-in-production')
@@ -51,12 +70,100 @@ app.config['DEBUG'] = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///spanish_tutor.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Ollama configuration
+app.config['OLLAMA_HOST'] = os.environ.get('OLLAMA_HOST', 'localhost:11434')
+app.config['OLLAMA_HOSTS'] = [
+    host.strip() for host in os.environ.get('OLLAMA_HOSTS', app.config['OLLAMA_HOST']).split(',') if host.strip()
+]
+app.config['OLLAMA_POOL_SIZE'] = int(os.environ.get('OLLAMA_POOL_SIZE', '20'))
+app.config['OLLAMA_CONNECT_TIMEOUT'] = float(os.environ.get('OLLAMA_CONNECT_TIMEOUT', '5'))
+app.config['OLLAMA_READ_TIMEOUT'] = float(os.environ.get('OLLAMA_READ_TIMEOUT', '30'))
+app.config['OLLAMA_MODELS'] = [
+    model.strip() for model in os.environ.get('OLLAMA_MODELS', 'llama3').split(',') if model.strip()
+]
+app.config['OLLAMA_KEEP_ALIVE'] = os.environ.get('OLLAMA_KEEP_ALIVE', '30m')
+app.config['OLLAMA_KEEPER_INTERVAL'] = float(os.environ.get('OLLAMA_KEEPER_INTERVAL', '600'))
+app.config['OLLAMA_LOAD_TIMEOUT'] = float(os.environ.get('OLLAMA_LOAD_TIMEOUT', '300'))
+app.config['OLLAMA_PROBE_INTERVAL'] = float(os.environ.get('OLLAMA_PROBE_INTERVAL', '15'))
+app.config['OLLAMA_NUM_CTX'] = int(os.environ.get('OLLAMA_NUM_CTX', '4096'))
+app.config['CONTEXT_TOKEN_BUDGET'] = int(os.environ.get('CONTEXT_TOKEN_BUDGET', '2048'))
+
+# Response cache configuration (set RESPONSE_CACHE_SIZE=0 to disable)
+app.config['RESPONSE_CACHE_SIZE'] = int(os.environ.get('RESPONSE_CACHE_SIZE', '1000'))
+app.config['RESPONSE_CACHE_TTL'] = float(os.environ.get('RESPONSE_CACHE_TTL', '86400'))
+app.config['RESPONSE_CACHE_PATH'] = os.environ.get('RESPONSE_CACHE_PATH')
+
+# Inference worker pool configuration
+app.config['INFERENCE_WORKERS'] = int(os.environ.get('INFERENCE_WORKERS', '8'))
+app.config['INFERENCE_MAX_QUEUE'] = int(os.environ.get('INFERENCE_MAX_QUEUE', '100'))
+app.config['INFERENCE_MAX_PER_USER'] = int(os.environ.get('INFERENCE_MAX_PER_USER', '5'))
+
+# Conversation storage: 'file' (per-user JSONL files) or 'database' (Conversation/Exchange tables)
+app.config['CONVERSATION_STORE'] = os.environ.get('CONVERSATION_STORE', 'file').lower()
+
+# Write-behind saves: seconds between background flushes (0 saves synchronously)
+app.config['CONVERSATION_SAVE_DELAY'] = float(os.environ.get('CONVERSATION_SAVE_DELAY', '0.5'))
+
+# Conversation files untouched this many days are compressed by 'flask archive-conversations'
+app.config['CONVERSATION_ARCHIVE_DAYS'] = float(os.environ.get('CONVERSATION_ARCHIVE_DAYS', '30'))
+
+# Pagination configuration
+app.config['CONVERSATION_PAGE_SIZE'] = int(os.environ.get('CONVERSATION_PAGE_SIZE', '50'))
+app.config['MESSAGE_PAGE_SIZE'] = int(os.environ.get('MESSAGE_PAGE_SIZE', '50'))
+app.config['MAX_PAGE_SIZE'] = int(os.environ.get('MAX_PAGE_SIZE', '500'))
+app.config['SEARCH_PAGE_SIZE'] = int(os.environ.get('SEARCH_PAGE_SIZE', '20'))
+
+# Resident chatbots: instance cap, approximate memory cap (0 disables) and idle eviction
+app.config['CHATBOT_MAX_INSTANCES'] = int(os.environ.get('CHATBOT_MAX_INSTANCES', '1000'))
+app.config['CHATBOT_MAX_MEMORY_MB'] = float(os.environ.get('CHATBOT_MAX_MEMORY_MB', '0'))
+app.config['CHATBOT_IDLE_TIMEOUT'] = float(os.environ.get('CHATBOT_IDLE_TIMEOUT', '1800'))
+app.config['CHATBOT_SWEEP_INTERVAL'] = float(os.environ.get('CHATBOT_SWEEP_INTERVAL', '60'))
+
+# Signed-in users are cached per process for USER_CACHE_TTL seconds (0 loads them from the database every time)
+app.config['USER_CACHE_TTL'] = float(os.environ.get('USER_CACHE_TTL', '60'))
+app.config['USER_CACHE_SIZE'] = int(os.environ.get('USER_CACHE_SIZE', '10000'))
+
+# Expired login sessions are deleted every SESSION_CLEANUP_INTERVAL seconds (0 disables), in batches
+app.config['SESSION_CLEANUP_INTERVAL'] = float(os.environ.get('SESSION_CLEANUP_INTERVAL', '3600'))
+app.config['SESSION_CLEANUP_BATCH_SIZE'] = int(os.environ.get('SESSION_CLEANUP_BATCH_SIZE', '1000'))
+
+# Multi-worker deployments: where each user's active conversation is recorded (empty for in-process,
+# sqlite:///path or redis://...) and the Socket.IO message queue workers relay events through
+app.config['CHATBOT_STATE_URL'] = os.environ.get('CHATBOT_STATE_URL', '')
+app.config['SOCKETIO_MESSAGE_QUEUE'] = os.environ.get('SOCKETIO_MESSAGE_QUEUE', '')
+
+# Response compression: bodies of at least RESPONSE_COMPRESSION_MIN_SIZE bytes are sent brotli- or gzip-encoded
+app.config['RESPONSE_COMPRESSION'] = os.environ.get('RESPONSE_COMPRESSION', 'true').lower() == 'true'
+app.config['RESPONSE_COMPRESSION_MIN_SIZE'] = int(os.environ.get('RESPONSE_COMPRESSION_MIN_SIZE', '1024'))
+app.config['RESPONSE_GZIP_LEVEL'] = int(os.environ.get('RESPONSE_GZIP_LEVEL', '6'))
+app.config['RESPONSE_BROTLI_QUALITY'] = int(os.environ.get('RESPONSE_BROTLI_QUALITY', '4'))
+
 # OAuth configuration
 app.config['GOOGLE_CLIENT_ID'] = os.environ.get('GOOGLE_CLIENT_ID')
 app.config['FACEBOOK_APP_ID'] = os.environ.get('FACEBOOK_APP_ID')
 app.config['FACEBOOK_APP_SECRET'] = os.environ.get('FACEBOOK_APP_SECRET')
 
-# Set up file logging
+# Logging: LOG_LEVELS sets per-logger levels ("socketio.server=INFO,spanish_tutor.chat=WARNING") and
+# LOG_SAMPLING keeps a fraction of sub-WARNING records from busy loggers ("spanish_tutor.chat=0.1")
+app.config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', 'INFO')
+app.config['LOG_LEVELS'] = parse_mapping(os.environ.get('LOG_LEVELS', ''), parse_level)
+app.config['LOG_SAMPLING'] = parse_mapping(os.environ.get('LOG_SAMPLING', ''), float)
+app.config['LOG_FORMAT'] = os.environ.get('LOG_FORMAT', 'text')
+app.config['LOG_QUEUE_SIZE'] = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+# Socket.IO and Engine.IO log every event and packet, so they are off unless asked for
+app.config['SOCKETIO_LOGGER'] = os.environ.get('SOCKETIO_LOGGER', 'false').lower() == 'true'
+app.config['ENGINEIO_LOGGER'] = os.environ.get('ENGINEIO_LOGGER', 'false').lower() == 'true'
+
+# Set up logging: records are queued by the caller and written to the console and log file on a listener thread
+if app.config['LOG_FORMAT'] == 'json':
+    log_formatter = JSONFormatter()
+else:
+    log_formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+console_handler = logging.StreamHandler(sys.stderr)
+console_handler.setFormatter(log_formatter)
+log_handlers = [console_handler]
+
+# Skip the reloader's parent process, which never serves requests
 if not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
     log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
     if not os.path.exists(log_dir):
@@ -67,24 +174,61 @@ if not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
         maxBytes=10240000, 
         backupCount=10
     )
-    file_handler.setFormatter(logging.Formatter(
-        '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-    ))
+    if app.config['LOG_FORMAT'] == 'json':
+        file_handler.setFormatter(log_formatter)
+    else:
+        file_handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
+        ))
     file_handler.setLevel(logging.INFO)
-    app.logger.addHandler(file_handler)
-    app.logger.setLevel(logging.INFO)
-    app.logger.info('Spanish Tutor Web GUI startup')
+    log_handlers.append(file_handler)
+
+log_pipeline = LogPipeline(
+    log_handlers,
+    level=parse_level(app.config['LOG_LEVEL']),
+    levels=app.config['LOG_LEVELS'],
+    sample_rates=app.config['LOG_SAMPLING'],
+    max_queue=app.config['LOG_QUEUE_SIZE']
+)
+log_pipeline.start()
+atexit.register(log_pipeline.stop)
+# Flask's own handler would write to stderr on the calling thread
+app.logger.removeHandler(default_handler)
+app.logger.info('Spanish Tutor Web GUI startup')
+
+# Per-message socket events, which are frequent enough to sample
+chat_logger = logging.getLogger('spanish_tutor.chat')
 
 # Initialize extensions
 init_database(app)
+init_search_index(app)
 CORS(app)
 
+# Compress large API responses for clients that accept it
+response_compressor = None
+if app.config['RESPONSE_COMPRESSION']:
+    response_compressor = ResponseCompressor(
+        min_size=app.config['RESPONSE_COMPRESSION_MIN_SIZE'],
+        gzip_level=app.config['RESPONSE_GZIP_LEVEL'],
+        brotli_quality=app.config['RESPONSE_BROTLI_QUALITY']
+    )
+    response_compressor.init_app(app)
+
 # Initialize Flask-Login
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'auth.login'
 login_manager.login_message = 'Please log in to access this page.'
 
+# Snapshots of signed-in users, so each request and socket event doesn't query the users table
+user_cache = None
+if app.config['USER_CACHE_TTL'] > 0:
+    user_cache = UserCache(
+        ttl_seconds=app.config['USER_CACHE_TTL'],
+        max_entries=app.config['USER_CACHE_SIZE']
+    )
+    user_cache.init_app(app)
+
 # Initialize rate limiter
 limiter = Limiter(
     key_func=get_remote_address,
@@ -96,77 +240,534 @@ limiter.init_app(app)
 app.register_blueprint(auth_bp)
 
 # Initialize SocketIO
-socketio = SocketIO(app, cors_allowed_origins="*", logger=True, engineio_logger=True)
+# With a message queue, events emitted by any worker process reach clients connected to the others
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    logger=app.config['SOCKETIO_LOGGER'],
+    engineio_logger=app.config['ENGINEIO_LOGGER'],
+    **create_client_manager(app.config['SOCKETIO_MESSAGE_QUEUE'])
+)
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Load user for Flask-Login."""
+    """Load user for Flask-Login, from the user cache when it is enabled."""
+    if user_cache is not None:
+        return user_cache.get(int(user_id))
     return User.query.get(int(user_id))
 
 # Global chatbot instances (one per session)
 chatbots: Dict[str, SpanishTutorChatbot] = {}
 chatbot_lock = threading.Lock()
 
+class ChatbotEntry:
+    """A resident chatbot, when it was last handed out and the state version it reflects."""
+    __slots__ = ('chatbot', 'last_used', 'state_version', 'syncing')
+    
+    def __init__(self, chatbot: SpanishTutorChatbot, state_version: Optional[int] = None):
+        self.chatbot = chatbot
+        self.last_used = time.monotonic()
+        self.state_version = state_version
+        self.syncing = False
+
+
 class WebChatbotManager:
-    """Manages chatbot instances for authenticated users."""
+    """Manages chatbot instances for authenticated users.
+
+    Instances are kept in least-recently-used order and bounded. Chatbots
+    unused for ``idle_timeout`` seconds are evicted by a background sweep;
+    the least recently used ones are evicted as soon as there are more than
+    ``max_instances``, and at each sweep while their conversations are
+    estimated to take more than ``max_bytes`` (0 disables either limit).
+    Pending saves are written before a chatbot is dropped, and users with
+    inference jobs queued or running are never evicted. The next request from
+    an evicted user creates a fresh chatbot and reloads the conversation it
+    was on.
+    
+    Which conversation each user has open is kept in ``state``. With a
+    shared backend (SQLite or Redis) several worker processes can serve the
+    same user: every save or switch bumps the user's state version, and a
+    worker whose resident chatbot reflects an older version reloads it from
+    the conversation store before handing it out.
     
-    def __init__(self):
-        self.chatbots = {}
+    Looking up a resident chatbot takes no lock: ``chatbots`` is only
+    changed under ``lock``, and a hit just reads it, stamps the entry and
+    checks it is still resident, since an eviction may have dropped it
+    before seeing the stamp.
+    Creating a chatbot (directories, store, rehydration) happens under one of
+    ``CREATION_LOCK_STRIPES`` locks chosen by user, so first requests from
+    different users don't wait for each other.
+    """
+    
+    CREATION_LOCK_STRIPES = 64
+    
+    def __init__(self, ollama_client: OllamaClient, backend_pool: OllamaBackendPool,
+                 response_cache: Optional[ResponseCache] = None,
+                 conversation_saver: Optional[ConversationSaver] = None,
+                 inference_dispatcher: Optional[InferenceDispatcher] = None,
+                 max_instances: int = 1000, max_bytes: int = 0, idle_timeout: float = 1800,
+                 sweep_interval: float = 60, spawn=None, sleep=time.sleep,
+                 state: Optional[ChatbotState] = None):
+        self.chatbots: Dict[str, ChatbotEntry] = {}
+        self.creation_locks = [threading.Lock() for _ in range(self.CREATION_LOCK_STRIPES)]
+        self.state = state or LocalChatbotState()
         self.lock = threading.Lock()
+        self.ollama_client = ollama_client
+        self.backend_pool = backend_pool
+        self.response_cache = response_cache
+        self.conversation_saver = conversation_saver
+        self.inference_dispatcher = inference_dispatcher
+        
+        self.max_instances = max_instances
+        self.max_bytes = max_bytes
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self.spawn = spawn
+        self.sleep = sleep
+        self.sweeping = False
+        
+        self.created = 0
+        self.rehydrated = 0
+        self.state_syncs = 0
+        self.state_errors = 0
+        self.evictions = {'idle': 0, 'capacity': 0, 'memory': 0}
+        self.eviction_failures = 0
+        self.resident_bytes = 0
     
-    def get_chatbot(self, user: User, ollama_host: str = "localhost:11434", model: str = "llama3") -> SpanishTutorChatbot:
+    def start(self) -> None:
+        """Start the background eviction sweep if not already running."""
+        if self.spawn is None or (not self.idle_timeout and not self.max_bytes):
+            return
+        with self.lock:
+            if self.sweeping:
+                return
+            self.sweeping = True
+        self.spawn(self._run)
+    
+    def stop(self) -> None:
+        with self.lock:
+            self.sweeping = False
+    
+    def _run(self) -> None:
+        while self.sweeping:
+            self.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                app.logger.error(f"Chatbot eviction sweep failed: {e}")
+    
+    def get_chatbot(self, user: User, ollama_host: str = None, model: str = None) -> SpanishTutorChatbot:
         """Get or create a chatbot instance for an authenticated user."""
+        user_key = f"user_{user.id}"
+        entry = self.touch(user_key)
+        if entry is not None:
+            if self.state.shared:
+                self.sync_chatbot(user_key, entry)
+            return entry.chatbot
+        
+        with self.creation_locks[hash(user_key) % self.CREATION_LOCK_STRIPES]:
+            # Another request may have created it while we waited
+            entry = self.touch(user_key)
+            if entry is not None:
+                return entry.chatbot
+            chatbot = self.create_chatbot(user, user_key, ollama_host, model)
+            entry = ChatbotEntry(chatbot, self.restore_conversation(user, user_key, chatbot))
+            chatbot.on_conversation_change = functools.partial(self.record_conversation_change, user_key, entry)
+            
+            with self.lock:
+                self.chatbots[user_key] = entry
+                self.created += 1
+                over_capacity = self.max_instances and len(self.chatbots) > self.max_instances
+        
+        self.start()
+        if over_capacity:
+            self.evict(self.select_lru(len(self.chatbots) - self.max_instances, exclude=user_key), 'capacity')
+        return chatbot
+    
+    def touch(self, user_key: str) -> Optional[ChatbotEntry]:
+        """Mark a resident chatbot as used. Returns None if it isn't resident."""
+        entry = self.chatbots.get(user_key)
+        if entry is None:
+            return None
+        entry.last_used = time.monotonic()
+        # An eviction that read last_used before the stamp may have dropped the entry meanwhile
+        return entry if self.chatbots.get(user_key) is entry else None
+    
+    def create_chatbot(self, user: User, user_key: str, ollama_host: str = None,
+                       model: str = None) -> SpanishTutorChatbot:
+        ollama_host = ollama_host or app.config['OLLAMA_HOST']
+        model = model or app.config['OLLAMA_MODELS'][0]
+        try:
+            app.logger.info(f"Creating new chatbot for user {user.email} with model {model}")
+            
+            # Get user-specific paths
+            user_paths = user.get_data_paths()
+            
+            # Create chatbot with user-specific info (the file store creates its directory)
+            user_info = {
+                'user_id': user_paths['user_id'],
+                'conversations_dir': user_paths['conversations_dir']
+            }
+            
+            conversation_store = None
+            if app.config['CONVERSATION_STORE'] == 'database':
+                conversation_store = DatabaseConversationStore(app, user.id)
+            
+            chatbot = SpanishTutorChatbot(
+                ollama_host=ollama_host,
+                model=model,
+                user_info=user_info,
+                ollama_client=self.ollama_client,
+                num_ctx=app.config['OLLAMA_NUM_CTX'],
+                context_token_budget=app.config['CONTEXT_TOKEN_BUDGET'],
+                response_cache=self.response_cache,
+                backend_pool=self.backend_pool,
+                keep_alive=app.config['OLLAMA_KEEP_ALIVE'],
+                conversation_store=conversation_store,
+                conversation_saver=self.conversation_saver
+            )
+            app.logger.info(f"Chatbot created successfully for user {user.email}")
+        except Exception as e:
+            app.logger.error(f"Failed to create chatbot for user {user.email}: {e}")
+            raise
+        return chatbot
+    
+    def read_state(self, user_key: str) -> Optional[Dict]:
+        try:
+            return self.state.get(user_key)
+        except Exception as e:
+            # Serve from memory rather than fail the request
+            app.logger.error(f"Failed to read chatbot state for {user_key}: {e}")
+            with self.lock:
+                self.state_errors += 1
+            return None
+    
+    def restore_conversation(self, user: User, user_key: str, chatbot: SpanishTutorChatbot) -> Optional[int]:
+        """Reopen the conversation the user last had open, e.g. before eviction. Returns the state version."""
+        record = self.read_state(user_key)
+        if record is None:
+            return None
+        if record['conversation'] and chatbot.load_conversation(record['conversation']):
+            with self.lock:
+                self.rehydrated += 1
+            app.logger.info(f"Restored conversation {record['conversation']} for user {user.email}")
+        return record['version']
+    
+    def sync_chatbot(self, user_key: str, entry: ChatbotEntry) -> None:
+        """Reload a resident chatbot whose conversation another worker has changed since."""
+        record = self.read_state(user_key)
+        if record is None or record['version'] == entry.state_version:
+            return
+        with self.creation_locks[hash(user_key) % self.CREATION_LOCK_STRIPES]:
+            record = self.read_state(user_key)
+            if record is None or record['version'] == entry.state_version:
+                return
+            chatbot = entry.chatbot
+            chatbot.flush_save()
+            # Switching to the other worker's conversation isn't a change to publish
+            entry.syncing = True
+            try:
+                if record['conversation']:
+                    chatbot.load_conversation(record['conversation'])
+                else:
+                    chatbot.start_new_conversation()
+            finally:
+                entry.syncing = False
+            entry.state_version = record['version']
+            with self.lock:
+                self.state_syncs += 1
+    
+    def record_conversation_change(self, user_key: str, entry: ChatbotEntry,
+                                   conversation: Optional[str], exchanges: int) -> None:
+        """Publish a chatbot's active conversation after it saves or switches conversations."""
+        if entry.syncing:
+            return
+        name = os.path.basename(conversation) if conversation else None
+        try:
+            entry.state_version = self.state.set(user_key, name, exchanges)
+        except Exception as e:
+            app.logger.error(f"Failed to record chatbot state for {user_key}: {e}")
+            with self.lock:
+                self.state_errors += 1
+    
+    def is_busy(self, user_key: str) -> bool:
+        return self.inference_dispatcher is not None and self.inference_dispatcher.has_jobs(user_key)
+    
+    def select_lru(self, count: int, exclude: Optional[str] = None) -> List[tuple]:
+        """Pick up to ``count`` evictable chatbots, least recently used first."""
+        victims = []
         with self.lock:
-            user_key = f"user_{user.id}"
-            if user_key not in self.chatbots:
-                try:
-                    app.logger.info(f"Creating new chatbot for user {user.email} with model {model}")
-                    
-                    # Get user-specific paths
-                    user_paths = user.get_data_paths()
-                    
-                    # Ensure user directories exist
-                    os.makedirs(user_paths['conversations_dir'], exist_ok=True)
-                    
-                    # Create chatbot with user-specific info
-                    user_info = {
-                        'user_id': user_paths['user_id'],
-                        'conversations_dir': user_paths['conversations_dir']
-                    }
-                    
-                    self.chatbots[user_key] = SpanishTutorChatbot(
-                        ollama_host=ollama_host,
-                        model=model,
-                        user_info=user_info
-                    )
-                    app.logger.info(f"Chatbot created successfully for user {user.email}")
-                except Exception as e:
-                    app.logger.error(f"Failed to create chatbot for user {user.email}: {e}")
-                    raise
-            return self.chatbots[user_key]
+            entries = sorted(self.chatbots.items(), key=lambda item: item[1].last_used)
+            for user_key, entry in entries:
+                if len(victims) >= count:
+                    break
+                if user_key != exclude and not self.is_busy(user_key):
+                    victims.append((user_key, entry, entry.last_used))
+        return victims
+    
+    def evict(self, victims: List[tuple], reason: str) -> int:
+        """Save and drop chatbots picked by a sweep or capacity check. Returns how many were evicted."""
+        evicted = 0
+        for user_key, entry, last_used in victims:
+            chatbot = entry.chatbot
+            # Save outside the lock so other users aren't held up by the write
+            try:
+                saved = chatbot.flush_save()
+            except Exception as e:
+                app.logger.error(f"Failed to save conversation before evicting {user_key}: {e}")
+                saved = False
+            if not saved:
+                # Keep it resident so the unsaved exchanges aren't lost; the saver retries
+                with self.lock:
+                    self.eviction_failures += 1
+                continue
+            
+            with self.lock:
+                # Keep the chatbot if it was used again while saving
+                if self.chatbots.get(user_key) is not entry or entry.last_used != last_used or self.is_busy(user_key):
+                    continue
+                del self.chatbots[user_key]
+                self.evictions[reason] += 1
+            chatbot.conversation_store.close()
+            evicted += 1
+        
+        if evicted:
+            app.logger.info(f"Evicted {evicted} chatbot(s) ({reason}), {len(self.chatbots)} resident")
+        return evicted
+    
+    def sweep(self) -> None:
+        """Evict idle chatbots, then the least recently used ones while over the memory limit."""
+        if self.idle_timeout:
+            cutoff = time.monotonic() - self.idle_timeout
+            with self.lock:
+                idle = [(user_key, entry, entry.last_used)
+                        for user_key, entry in self.chatbots.items()
+                        if entry.last_used <= cutoff and not self.is_busy(user_key)]
+            self.evict(idle, 'idle')
+        
+        with self.lock:
+            resident = list(self.chatbots.items())
+        sizes = {user_key: entry.chatbot.estimate_memory() for user_key, entry in resident}
+        total = sum(sizes.values())
+        
+        if self.max_bytes and total > self.max_bytes:
+            victims = []
+            excess = total - self.max_bytes
+            for victim in self.select_lru(len(resident)):
+                if excess <= 0:
+                    break
+                victims.append(victim)
+                excess -= sizes.get(victim[0], 0)
+            self.evict(victims, 'memory')
+            with self.lock:
+                total = sum(size for user_key, size in sizes.items() if user_key in self.chatbots)
+        
+        with self.lock:
+            self.resident_bytes = total
     
     def remove_chatbot(self, user_id: int):
         """Remove a chatbot instance when user logs out."""
         with self.lock:
-            user_key = f"user_{user_id}"
-            if user_key in self.chatbots:
-                # Save conversation before removing
-                try:
-                    chatbot = self.chatbots[user_key]
-                    if hasattr(chatbot, 'save_conversation'):
-                        chatbot.save_conversation()
-                except Exception as e:
-                    app.logger.error(f"Failed to save conversation for user {user_id}: {e}")
-                
-                del self.chatbots[user_key]
+            entry = self.chatbots.pop(f"user_{user_id}", None)
+        if entry is None:
+            return
+        # Write any pending save outside the lock so other users aren't held up by the write
+        try:
+            saved = entry.chatbot.flush_save()
+        except Exception as e:
+            app.logger.error(f"Failed to save conversation for user {user_id}: {e}")
+            return
+        if not saved:
+            # Still pending on the saver, which keeps retrying it with the open store
+            app.logger.error(f"Failed to save conversation for user {user_id}")
+            return
+        entry.chatbot.conversation_store.close()
     
     def get_active_user_count(self) -> int:
         """Get number of active user chatbots."""
         with self.lock:
             return len(self.chatbots)
+    
+    def get_stats(self) -> Dict:
+        """Get resident instance gauges and eviction counts."""
+        with self.lock:
+            return {
+                'resident': len(self.chatbots),
+                'max_instances': self.max_instances,
+                'resident_bytes': self.resident_bytes,
+                'max_bytes': self.max_bytes,
+                'idle_timeout_seconds': self.idle_timeout,
+                'created': self.created,
+                'rehydrated': self.rehydrated,
+                'state_backend': self.state.name,
+                'state_syncs': self.state_syncs,
+                'state_errors': self.state_errors,
+                'evictions': dict(self.evictions),
+                'eviction_failures': self.eviction_failures
+            }
+
+# Shared pooled HTTP client for all Ollama traffic
+ollama_client = OllamaClient(
+    pool_size=app.config['OLLAMA_POOL_SIZE'],
+    connect_timeout=app.config['OLLAMA_CONNECT_TIMEOUT'],
+    read_timeout=app.config['OLLAMA_READ_TIMEOUT']
+)
+
+# Route generations to the least-loaded healthy Ollama host
+ollama_backend_pool = OllamaBackendPool(app.config['OLLAMA_HOSTS'], ollama_client)
 
-# Initialize chatbot manager
-chatbot_manager = WebChatbotManager()
+# Poll Ollama health in the background so connects and status checks answer from memory
+ollama_prober = OllamaHealthProber(
+    ollama_backend_pool,
+    ollama_client,
+    interval=app.config['OLLAMA_PROBE_INTERVAL'],
+    spawn=socketio.start_background_task,
+    sleep=socketio.sleep
+)
+
+# Preload the configured models and stop Ollama from unloading them while idle
+ollama_model_keeper = OllamaModelKeeper(
+    ollama_backend_pool,
+    ollama_client,
+    app.config['OLLAMA_MODELS'],
+    keep_alive=app.config['OLLAMA_KEEP_ALIVE'],
+    refresh_interval=app.config['OLLAMA_KEEPER_INTERVAL'],
+    load_timeout=app.config['OLLAMA_LOAD_TIMEOUT'],
+    spawn=socketio.start_background_task,
+    sleep=socketio.sleep
+)
+
+# Shared cache of responses for identical prompts in identical contexts
+response_cache = None
+if app.config['RESPONSE_CACHE_SIZE'] > 0:
+    response_cache = ResponseCache(
+        max_entries=app.config['RESPONSE_CACHE_SIZE'],
+        ttl_seconds=app.config['RESPONSE_CACHE_TTL'],
+        persist_path=app.config['RESPONSE_CACHE_PATH'],
+        spawn=socketio.start_background_task
+    )
+    atexit.register(response_cache.save)
+
+# Background writer for conversation saves, started on first use
+conversation_saver = None
+if app.config['CONVERSATION_SAVE_DELAY'] > 0:
+    conversation_saver = ConversationSaver(
+        delay=app.config['CONVERSATION_SAVE_DELAY'],
+        spawn=socketio.start_background_task,
+        sleep=socketio.sleep
+    )
+    atexit.register(conversation_saver.stop)
+
+# Periodic purge of expired login sessions, started with the other background services
+session_janitor = SessionJanitor(
+    app,
+    interval=app.config['SESSION_CLEANUP_INTERVAL'],
+    batch_size=app.config['SESSION_CLEANUP_BATCH_SIZE'],
+    spawn=socketio.start_background_task,
+    sleep=socketio.sleep
+)
+
+# Worker pool for LLM generations, started on first use
+inference_dispatcher = InferenceDispatcher(
+    max_workers=app.config['INFERENCE_WORKERS'],
+    max_queue_depth=app.config['INFERENCE_MAX_QUEUE'],
+    max_per_user=app.config['INFERENCE_MAX_PER_USER'],
+    spawn=socketio.start_background_task
+)
+
+# Initialize chatbot manager; idle chatbots are evicted by a background sweep
+chatbot_manager = WebChatbotManager(
+    ollama_client,
+    ollama_backend_pool,
+    response_cache,
+    conversation_saver,
+    inference_dispatcher,
+    max_instances=app.config['CHATBOT_MAX_INSTANCES'],
+    max_bytes=int(app.config['CHATBOT_MAX_MEMORY_MB'] * 1024 * 1024),
+    idle_timeout=app.config['CHATBOT_IDLE_TIMEOUT'],
+    sweep_interval=app.config['CHATBOT_SWEEP_INTERVAL'],
+    spawn=socketio.start_background_task,
+    sleep=socketio.sleep,
+    state=create_chatbot_state(app.config['CHATBOT_STATE_URL'])
+)
+# For the auth blueprint, which drops a user's chatbot on logout
+app.extensions['chatbot_manager'] = chatbot_manager
+
+def get_page_size(value, default: int) -> int:
+    """Parse a client-supplied page size, falling back to the default and capping it."""
+    try:
+        limit = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, app.config['MAX_PAGE_SIZE']))
+
+def get_exchange_window(total: int, offset, limit) -> tuple:
+    """Resolve an offset/limit pair into a (start, end) slice of a conversation.
+
+    A negative offset counts back from the end, so offset=-50 selects the last 50 exchanges.
+    """
+    try:
+        offset = int(offset) if offset is not None else 0
+    except (TypeError, ValueError):
+        offset = 0
+    if offset < 0:
+        offset = max(0, total + offset)
+    start = min(offset, total)
+    end = total if limit is None else min(start + limit, total)
+    return start, end
+
+def exchanges_to_messages(exchanges: List[Dict]) -> List[Dict]:
+    """Expand conversation exchanges into the user/bot message list the client renders."""
+    messages = []
+    for exchange in exchanges:
+        timestamp = exchange.get('timestamp', datetime.now().isoformat())
+        messages.extend([
+            {'type': 'user', 'message': exchange.get('user', ''), 'timestamp': timestamp},
+            {'type': 'bot', 'message': exchange.get('bot', ''), 'timestamp': timestamp}
+        ])
+    return messages
+
+def get_conversation_exchanges(chatbot, filename: str) -> Optional[List[Dict]]:
+    """Get a conversation's exchanges, from memory when it is the chatbot's active conversation."""
+    key = chatbot.conversation_store.resolve(filename)
+    if not key:
+        return None
+    current = chatbot.get_current_conversation(key)
+    if current:
+        return current['conversation']
+    return chatbot.conversation_store.read(key).get('conversation', [])
+
+def get_conversation_validators(chatbot, key: str) -> Optional[tuple]:
+    """Build the ETag and Last-Modified of a conversation from its stored version.
+
+    The query string is part of the ETag because paginated requests return different bodies.
+    """
+    stored_version = chatbot.conversation_store.version(key)
+    if stored_version is None:
+        return None
+    token, last_modified = stored_version
+    version = f"{os.path.basename(key)}:{token}:{request.query_string.decode()}"
+    return hashlib.sha1(version.encode()).hexdigest(), last_modified
+
+def is_not_modified(etag: str, last_modified: datetime) -> bool:
+    """Check the request's If-None-Match (or, failing that, If-Modified-Since) against a version."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+def conditional_response(etag: str, last_modified: datetime, build_body):
+    """Answer 304 if the client's copy is current, otherwise a JSON response from ``build_body()``."""
+    if is_not_modified(etag, last_modified):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(build_body())
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Clients may keep a copy but must revalidate it on every use
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 # React SPA routes
 @app.route('/')
@@ -202,24 +803,42 @@ def react_assets(filename):
 # API Routes
 @app.route('/api/health')
 def health_check():
-    """Health check endpoint."""
+    """Health check endpoint. Internal statistics are only shown to signed-in users."""
+    if not current_user.is_authenticated:
+        return jsonify({
+            'status': 'healthy',
+            'timestamp': datetime.now().isoformat()
+        })
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'active_users': chatbot_manager.get_active_user_count() if current_user.is_authenticated else 0,
-        'authenticated': current_user.is_authenticated
+        'active_users': chatbot_manager.get_active_user_count(),
+        'inference': inference_dispatcher.get_stats(),
+        'response_cache': response_cache.get_stats() if response_cache else None,
+        'persistence': conversation_saver.get_stats() if conversation_saver else None,
+        'chatbots': chatbot_manager.get_stats(),
+        'compression': response_compressor.get_stats() if response_compressor else None,
+        'json_backend': JSON_BACKEND,
+        'logging': log_pipeline.get_stats(),
+        'user_cache': user_cache.get_stats() if user_cache else None,
+        'sessions': session_janitor.get_stats(),
+        'authenticated': True
     })
 
 @app.route('/api/ollama/status')
 def ollama_status():
     """Check Ollama connection status."""
     try:
-        # Create a temporary chatbot to test connection
-        temp_chatbot = SpanishTutorChatbot()
-        is_connected = temp_chatbot.check_ollama_connection()
+        status = ollama_prober.get_status()
         return jsonify({
-            'connected': is_connected,
-            'host': temp_chatbot.ollama_host,
+            'connected': status['connected'],
+            'host': ', '.join(ollama_backend_pool.hosts),
+            'checked_at': status['checked_at'],
+            'models': status['models'],
+            'hosts': status['hosts'],
+            'warm_models': ollama_model_keeper.get_stats(),
+            'backends': ollama_backend_pool.get_stats(),
+            'client_stats': ollama_client.get_stats(),
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
@@ -232,17 +851,32 @@ def ollama_status():
 @app.route('/api/conversations/list')
 @require_auth_api
 def list_conversations():
-    """List all saved conversations for the authenticated user."""
+    """List saved conversations for the authenticated user, one page at a time.
+
+    Query parameters: ``limit`` (page size) and ``before`` (the ``next_cursor``
+    returned with the previous page).
+    """
     try:
+        limit = get_page_size(request.args.get('limit'), app.config['CONVERSATION_PAGE_SIZE'])
+        before = request.args.get('before') or None
+        
         # Get user's chatbot instance
         chatbot = chatbot_manager.get_chatbot(current_user)
-        conversations = chatbot.list_conversations()
+        # Fetch one extra row to know whether another page exists
+        try:
+            conversations = chatbot.list_conversations(limit=limit + 1, before=before)
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
+        has_more = len(conversations) > limit
+        conversations = conversations[:limit]
         
         app.logger.info(f"Listed {len(conversations)} conversations for user {current_user.email}")
         
         return jsonify({
             'conversations': conversations,
             'count': len(conversations),
+            'has_more': has_more,
+            'next_cursor': conversations[-1]['cursor'] if has_more else None,
             'user_id': current_user.get_user_directory_id()
         })
     except Exception as e:
@@ -257,8 +891,13 @@ def get_latest_conversation():
         # Get user's chatbot instance
         chatbot = chatbot_manager.get_chatbot(current_user)
         
-        # Use the backend's method to find the latest conversation
-        conversations = chatbot.list_conversations()
+        # When the active conversation is in memory and saved, the index needs no
+        # directory scan to tell whether it is still the latest one
+        current = chatbot.get_current_conversation()
+        conversations = chatbot.list_conversations(limit=1, validate=False) if current else []
+        if not conversations or os.path.basename(conversations[0]['file']) != os.path.basename(chatbot.current_conversation_file):
+            current = None
+            conversations = chatbot.list_conversations(limit=1)
         
         if not conversations:
             return jsonify({
@@ -271,45 +910,111 @@ def get_latest_conversation():
         latest_conversation = conversations[0]
         conversation_file = os.path.basename(latest_conversation['file'])
         
-        # Load the conversation data
-        with open(latest_conversation['file'], 'r', encoding='utf-8') as f:
-            conversation_data = json.load(f)
+        validators = get_conversation_validators(chatbot, latest_conversation['file'])
+        if validators is None:
+            return jsonify({'error': 'Conversation not found'}), 404
+        etag, last_modified = validators
+        
+        def build_body():
+            # Load the conversation data, unless it is already in memory
+            conversation_data = current or chatbot.conversation_store.read(latest_conversation['file'])
+            exchanges = conversation_data.get('conversation', [])
+            
+            # With ?limit=N only the most recent N exchanges are returned
+            start = 0
+            if 'limit' in request.args:
+                limit = get_page_size(request.args.get('limit'), app.config['MESSAGE_PAGE_SIZE'])
+                start = max(0, len(exchanges) - limit)
+            
+            app.logger.info(f"Retrieved latest conversation {conversation_file} for user {current_user.email}")
+            
+            return {
+                'exists': True,
+                'filename': conversation_file,
+                'session_start': latest_conversation['session_start'],
+                'exchanges': latest_conversation['exchanges'],
+                'conversation': exchanges[start:],
+                'offset': start,
+                'user_id': current_user.get_user_directory_id()
+            }
+        
+        return conditional_response(etag, last_modified, build_body)
+    except Exception as e:
+        app.logger.error(f"Error getting latest conversation for user {current_user.email}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/conversations/search')
+@require_auth_api
+def search_conversations():
+    """Full-text search over the authenticated user's conversations.
+
+    Query parameters: ``q`` (the search text; accents and case are ignored and
+    the last word matches as a prefix) and ``limit``. Hits are exchanges,
+    best matches first, with an HTML snippet highlighting the matched words.
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Missing search query'}), 400
+        limit = get_page_size(request.args.get('limit'), app.config['SEARCH_PAGE_SIZE'])
+        
+        chatbot = chatbot_manager.get_chatbot(current_user)
+        started = time.perf_counter()
+        results = chatbot.search_conversations(query, limit=limit)
+        took_ms = round((time.perf_counter() - started) * 1000, 2)
+        for result in results:
+            result['file'] = os.path.basename(result['file'])
         
-        app.logger.info(f"Retrieved latest conversation {conversation_file} for user {current_user.email}")
+        app.logger.info(f"Search returned {len(results)} results in {took_ms}ms for user {current_user.email}")
         
         return jsonify({
-            'exists': True,
-            'filename': conversation_file,
-            'session_start': latest_conversation['session_start'],
-            'exchanges': latest_conversation['exchanges'],
-            'conversation': conversation_data.get('conversation', []),
-            'user_id': current_user.get_user_directory_id()
+            'query': query,
+            'results': results,
+            'count': len(results),
+            'took_ms': took_ms
         })
     except Exception as e:
-        app.logger.error(f"Error getting latest conversation for user {current_user.email}: {e}")
+        app.logger.error(f"Error searching conversations for user {current_user.email}: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/conversations/<path:filename>')
 @require_auth_api
 def get_conversation(filename):
-    """Get a specific conversation file for the authenticated user."""
+    """Get a specific conversation file for the authenticated user.
+
+    Optional ``offset`` and ``limit`` query parameters return a window of the
+    exchanges instead of the whole conversation; a negative offset counts back
+    from the most recent exchange.
+    """
     try:
         # Get user's chatbot instance
         chatbot = chatbot_manager.get_chatbot(current_user)
-        conversation_path = os.path.join(chatbot.conversations_dir, filename)
+        # Only conversations in the user's own store resolve
+        conversation_key = chatbot.conversation_store.resolve(filename)
+        validators = get_conversation_validators(chatbot, conversation_key) if conversation_key else None
         
-        if not os.path.exists(conversation_path):
+        if not validators:
             return jsonify({'error': 'Conversation not found'}), 404
         
-        # Security check: ensure the file is within the user's directory
-        user_paths = current_user.get_data_paths()
-        if not conversation_path.startswith(user_paths['conversations_dir']):
-            return jsonify({'error': 'Access denied'}), 403
+        etag, last_modified = validators
         
-        with open(conversation_path, 'r', encoding='utf-8') as f:
-            conversation_data = json.load(f)
+        def build_body():
+            # Serve the active conversation from memory instead of re-reading it
+            conversation_data = (chatbot.get_current_conversation(conversation_key)
+                                 or chatbot.conversation_store.read(conversation_key))
+            
+            if 'offset' in request.args or 'limit' in request.args:
+                exchanges = conversation_data.get('conversation', [])
+                limit = get_page_size(request.args.get('limit'), app.config['MESSAGE_PAGE_SIZE'])
+                start, end = get_exchange_window(len(exchanges), request.args.get('offset'), limit)
+                conversation_data['conversation'] = exchanges[start:end]
+                conversation_data['total_exchanges'] = len(exchanges)
+                conversation_data['offset'] = start
+                conversation_data['limit'] = limit
+            
+            return conversation_data
         
-        return jsonify(conversation_data)
+        return conditional_response(etag, last_modified, build_body)
     except Exception as e:
         app.logger.error(f"Error getting conversation {filename} for user {current_user.email}: {e}")
         return jsonify({'error': str(e)}), 500
@@ -321,7 +1026,7 @@ def get_conversation(filename):
 def handle_connect():
     """Handle client connection with authentication check."""
     session_id = request.sid
-    app.logger.info(f"Client connected: {session_id}")
+    chat_logger.debug("Client connected: %s", session_id)
     
     try:
         # Check if user is authenticated
@@ -344,8 +1049,8 @@ def handle_connect():
         except Exception as e:
             app.logger.error(f"Failed to load latest conversation for user {current_user.email}: {e}")
         
-        # Check Ollama connection
-        is_connected = chatbot.check_ollama_connection()
+        # Check Ollama connection (cached by the background prober)
+        is_connected = ollama_prober.is_connected()
         
         emit('connection_status', {
             'connected': is_connected,
@@ -355,7 +1060,8 @@ def handle_connect():
             'message': 'Connected to Spanish Tutor' if is_connected else 'Failed to connect to Ollama'
         })
         
-        app.logger.info(f"User {current_user.email} connected with session {session_id}")
+        chat_logger.info("User %s connected with session %s", current_user.email, session_id,
+                         extra={'user': current_user.email, 'session': session_id})
         
     except Exception as e:
         app.logger.error(f"Error during connection for user {current_user.email if current_user.is_authenticated else 'anonymous'}: {e}")
@@ -365,15 +1071,15 @@ def handle_connect():
 def handle_disconnect():
     """Handle client disconnection."""
     session_id = request.sid
-    app.logger.info(f"Client disconnected: {session_id}")
     
     # Note: We don't remove chatbot instance on disconnect
-    # Only remove when user explicitly logs out
+    # It stays resident until logout or until the manager evicts it as idle
     # This allows reconnection without losing conversation state
     if current_user.is_authenticated:
-        app.logger.info(f"User {current_user.email} disconnected from session {session_id}")
+        chat_logger.info("User %s disconnected from session %s", current_user.email, session_id,
+                         extra={'user': current_user.email, 'session': session_id})
     else:
-        app.logger.info(f"Anonymous user disconnected from session {session_id}")
+        chat_logger.debug("Anonymous user disconnected from session %s", session_id)
 
 @socketio.on('send_message')
 def handle_message(data):
@@ -400,24 +1106,50 @@ def handle_message(data):
             'timestamp': datetime.now().isoformat()
         })
         
-        # Process message synchronously for now to debug
+        user_email = current_user.email
+        
+        def generate_response():
+            """Stream the response token by token to the requesting session."""
+            try:
+                started = time.perf_counter()
+                chunks = []
+                for chunk in chatbot.stream_message(user_message):
+                    chunks.append(chunk)
+                    socketio.emit('bot_token', {'token': chunk}, to=session_id)
+                response = "".join(chunks).strip()
+                
+                # Signal the end of the stream with the complete response
+                socketio.emit('bot_message_done', {
+                    'message': response,
+                    'timestamp': datetime.now().isoformat()
+                }, to=session_id)
+                # Lengths rather than content: one line per turn, with no learner text in the logs
+                duration_ms = round((time.perf_counter() - started) * 1000)
+                chat_logger.info("Answered user %s: %d chars in, %d chars out in %dms",
+                                 user_email, len(user_message), len(response), duration_ms,
+                                 extra={'user': user_email, 'session': session_id, 'message_chars': len(user_message),
+                                        'response_chars': len(response), 'duration_ms': duration_ms})
+                
+            except Exception as e:
+                chat_logger.error("Error processing message for user %s: %s", user_email, e,
+                                  extra={'user': user_email, 'session': session_id})
+                socketio.emit('error', {
+                    'message': f'Error processing message: {str(e)}'
+                }, to=session_id)
+        
+        # Generate on the worker pool so slow replies don't hold up other events
         try:
-            app.logger.info(f"Processing message from user {current_user.email}: {user_message}")
-            response = chatbot.send_message(user_message)
-            app.logger.info(f"Got response for user {current_user.email}: {response[:100]}...")
-            
-            # Send bot response back to the client
-            emit('bot_message', {
-                'message': response,
+            position = inference_dispatcher.submit(f"user_{current_user.id}", generate_response)
+        except DispatcherQueueFull as e:
+            chat_logger.warning("Rejected message from user %s: %s", user_email, e, extra={'user': user_email})
+            emit('error', {'message': 'The tutor is busy right now. Please try again in a moment.'})
+            return
+        
+        if position:
+            emit('queued', {
+                'position': position,
                 'timestamp': datetime.now().isoformat()
             })
-            app.logger.info(f"Sent bot_message to user {current_user.email}")
-            
-        except Exception as e:
-            app.logger.error(f"Error processing message for user {current_user.email}: {e}")
-            emit('error', {
-                'message': f'Error processing message: {str(e)}'
-            })
         
     except Exception as e:
         app.logger.error(f"Error handling message for user {current_user.email if current_user.is_authenticated else 'anonymous'}: {e}")
@@ -433,24 +1165,19 @@ def handle_new_conversation(data=None):
         emit('auth_required', {'message': 'Authentication required'})
         return
     
-    app.logger.info(f"🔄 RECEIVED new_conversation event for user {current_user.email}")
-    
     try:
-        app.logger.info(f"Starting new conversation for user {current_user.email}")
-        
         chatbot = chatbot_manager.get_chatbot(current_user)
-        app.logger.info(f"Got chatbot instance for user {current_user.email}")
         
         # Clear the conversation history
         chatbot.start_new_conversation()
-        app.logger.info(f"Conversation history cleared for user {current_user.email}")
         
         # Emit conversation cleared event
         emit('conversation_cleared', {
             'message': 'Started new conversation',
             'timestamp': datetime.now().isoformat()
         })
-        app.logger.info(f"✅ Sent conversation_cleared event for user {current_user.email}")
+        chat_logger.info("Started new conversation for user %s", current_user.email,
+                         extra={'user': current_user.email, 'session': session_id})
         
     except Exception as e:
         error_msg = f"❌ Error starting new conversation for user {current_user.email}: {e}"
@@ -474,20 +1201,19 @@ def handle_set_active_conversation(data):
         chatbot = chatbot_manager.get_chatbot(current_user)
         
         if filename:
-            conversation_path = os.path.join(chatbot.conversations_dir, filename)
+            conversation_key = chatbot.conversation_store.resolve(filename)
             
-            if os.path.exists(conversation_path):
+            if conversation_key:
                 # Load the specific conversation into the backend
-                if chatbot.load_conversation(conversation_path):
+                if chatbot.load_conversation(conversation_key):
                     app.logger.info(f"Backend loaded active conversation {filename} with {len(chatbot.conversation_history)} exchanges")
                 else:
                     app.logger.error(f"Failed to load active conversation {filename}")
             else:
-                app.logger.warning(f"Active conversation file not found: {conversation_path}")
+                app.logger.warning(f"Active conversation file not found: {filename}")
         else:
-            # Clear the conversation if no filename provided
-            chatbot.conversation_history = []
-            chatbot.current_conversation_file = None
+            # Start afresh if no filename provided; this also publishes the switch to other workers
+            chatbot.start_new_conversation()
             app.logger.info("Cleared active conversation in backend")
             
     except Exception as e:
@@ -504,8 +1230,6 @@ def handle_load_conversation(data):
         emit('auth_required', {'message': 'Authentication required'})
         return
     
-    app.logger.info(f"Received load_conversation request for {filename} from user {current_user.email}")
-    
     if not filename:
         app.logger.error("No filename provided in load_conversation request")
         emit('error', {'message': 'No filename provided'})
@@ -513,47 +1237,134 @@ def handle_load_conversation(data):
     
     try:
         chatbot = chatbot_manager.get_chatbot(current_user)
-        conversation_path = os.path.join(chatbot.conversations_dir, filename)
-        
-        app.logger.info(f"Loading conversation from path: {conversation_path}")
-        app.logger.info(f"File exists: {os.path.exists(conversation_path)}")
         
-        if chatbot.load_conversation(conversation_path):
-            app.logger.info(f"Conversation loaded successfully. History length: {len(chatbot.conversation_history)}")
-            
-            # Send conversation history to client
-            conversation_data = []
-            for exchange in chatbot.conversation_history:
-                conversation_data.extend([
-                    {
-                        'type': 'user',
-                        'message': exchange.get('user', ''),
-                        'timestamp': exchange.get('timestamp', datetime.now().isoformat())
-                    },
-                    {
-                        'type': 'bot', 
-                        'message': exchange.get('bot', ''),
-                        'timestamp': exchange.get('timestamp', datetime.now().isoformat())
-                    }
-                ])
+        if chatbot.load_conversation(filename):
+            # Send only the most recent page; older messages are fetched on scroll-up
+            total = len(chatbot.conversation_history)
+            limit = get_page_size(data.get('limit'), app.config['MESSAGE_PAGE_SIZE'])
+            start = max(0, total - limit)
+            conversation_data = exchanges_to_messages(chatbot.conversation_history[start:])
             
-            app.logger.info(f"Sending {len(conversation_data)} messages to client session {session_id}")
             emit('conversation_loaded', {
                 'messages': conversation_data,
                 'filename': filename,
-                'count': len(chatbot.conversation_history)
+                'count': total,
+                'offset': start,
+                'has_more': start > 0
             })
-            app.logger.info(f"Emitted conversation_loaded event to session {session_id}")
+            chat_logger.info("Loaded conversation %s for user %s: sent %d of %d exchanges",
+                             filename, current_user.email, len(conversation_data), total,
+                             extra={'user': current_user.email, 'session': session_id})
         else:
-            app.logger.error(f"Failed to load conversation from {conversation_path}")
+            app.logger.error(f"Failed to load conversation {filename}")
             emit('error', {'message': 'Failed to load conversation'})
             
     except Exception as e:
         app.logger.error(f"Error loading conversation: {e}")
         emit('error', {'message': f'Error: {str(e)}'})
 
+@socketio.on('load_older_messages')
+def handle_load_older_messages(data):
+    """Send the page of messages preceding ``before`` (an exchange offset) in a conversation."""
+    if not current_user.is_authenticated:
+        emit('auth_required', {'message': 'Authentication required'})
+        return
+    
+    filename = data.get('filename')
+    if not filename:
+        emit('error', {'message': 'No filename provided'})
+        return
+    
+    try:
+        chatbot = chatbot_manager.get_chatbot(current_user)
+        exchanges = get_conversation_exchanges(chatbot, filename)
+        if exchanges is None:
+            emit('error', {'message': 'Conversation not found'})
+            return
+        
+        total = len(exchanges)
+        limit = get_page_size(data.get('limit'), app.config['MESSAGE_PAGE_SIZE'])
+        try:
+            before = min(int(data.get('before', total)), total)
+        except (TypeError, ValueError):
+            before = total
+        start = max(0, before - limit)
+        
+        emit('older_messages_loaded', {
+            'messages': exchanges_to_messages(exchanges[start:before]),
+            'filename': os.path.basename(filename),
+            'offset': start,
+            'count': total,
+            'has_more': start > 0
+        })
+    except Exception as e:
+        app.logger.error(f"Error loading older messages for user {current_user.email}: {e}")
+        emit('error', {'message': f'Error: {str(e)}'})
+
+@app.cli.command('import-conversations')
+@click.option('--batch-size', default=100, show_default=True, help='Conversations committed per batch.')
+def import_conversations_command(batch_size):
+    """Import the per-user conversation files into the database."""
+    users_dir = os.path.join('web_gui', 'users')
+    stats = import_conversation_files(users_dir, batch_size=batch_size, log=click.echo)
+    click.echo(f"Imported {stats['imported']} conversations ({stats['exchanges']} exchanges), "
+               f"skipped {stats['skipped']} already imported, {stats['failed']} unreadable")
+
+@app.cli.command('archive-conversations')
+@click.option('--days', type=float, default=None, help='Archive conversations untouched for this many days.')
+def archive_conversations_command(days):
+    """Compress old conversation files and report the space reclaimed."""
+    days = app.config['CONVERSATION_ARCHIVE_DAYS'] if days is None else days
+    users_dir = os.path.join('web_gui', 'users')
+    totals = {'archived': 0, 'failed': 0, 'bytes_before': 0, 'bytes_after': 0, 'bytes_reclaimed': 0}
+    
+    for user_dir_id in sorted(os.listdir(users_dir)) if os.path.isdir(users_dir) else []:
+        conversations_dir = os.path.join(users_dir, user_dir_id, 'conversations')
+        if not os.path.isdir(conversations_dir):
+            continue
+        store = FileConversationStore(conversations_dir)
+        try:
+            stats = store.archive(days)
+        finally:
+            store.close()
+        for key in totals:
+            totals[key] += stats[key]
+        if stats['archived']:
+            click.echo(f"{user_dir_id}: archived {stats['archived']} conversations, "
+                       f"reclaimed {stats['bytes_reclaimed'] / 1024:.1f} KB")
+    
+    click.echo(f"Archived {totals['archived']} conversations older than {days:g} days "
+               f"({totals['failed']} failed): {totals['bytes_before'] / 1024:.1f} KB -> "
+               f"{totals['bytes_after'] / 1024:.1f} KB, reclaimed {totals['bytes_reclaimed'] / 1024:.1f} KB")
+
+@app.cli.command('cleanup-sessions')
+@click.option('--batch-size', type=int, default=None, help='Sessions deleted per batch.')
+def cleanup_sessions_command(batch_size):
+    """Delete expired login sessions."""
+    if batch_size:
+        session_janitor.batch_size = batch_size
+    session_janitor.max_batches = sys.maxsize
+    purged = session_janitor.purge()
+    click.echo(f"Deleted {purged} expired sessions in {session_janitor.last_duration_ms:.0f}ms")
+
+def start_background_services(singletons: bool = True):
+    """Start Ollama health probing, warm up the configured models and schedule session cleanup.
+
+    Probing feeds this process's backend pool, so every process runs it. With
+    ``singletons=False`` the model keeper and session janitor are left for the
+    one process that should run them.
+    """
+    ollama_prober.start()
+    if singletons:
+        ollama_model_keeper.start()
+        session_janitor.start()
+
 if __name__ == '__main__':
     # Run the development server
     print("Starting Spanish Tutor Web GUI...")
+    # Skip the reloader's parent process, which never serves requests
+    if not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_services()
     print("Open your browser to: http://localhost:8080")
-    socketio.run(app, host='0.0.0.0', port=8080, debug=True)
\ No newline at end of file
+    # This is the development server; production deployments use gunicorn: python start_server.py --production
+    socketio.run(app, host='0.0.0.0', port=8080, debug=app.debug, allow_unsafe_werkzeug=True)
\ No newline at end of file
@@ -18,6 +18,7 @@ from google.oauth2 import id_token
 import requests
 
 from web_gui.models import db, User, UserSession, create_default_preferences
+from web_gui.usercache import invalidate_cached_user
 
 # Create authentication blueprint
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
@@ -57,9 +58,7 @@ def create_user_session(user, ip_address=None, user_agent=None):
     session_id = secrets.token_urlsafe(32)
     
     # Deactivate any existing sessions for this user to prevent accumulation
-    existing_sessions = UserSession.query.filter_by(user_id=user.id, is_active=True).all()
-    for existing_session in existing_sessions:
-        existing_session.is_active = False
+    UserSession.deactivate_user_sessions(user.id)
     
     expires_at = datetime.utcnow() + timedelta(hours=24)
     
@@ -172,6 +171,7 @@ def login():
         
         # Log the user in
         login_user(user, remember=remember_me)
+        invalidate_cached_user(current_app, user.id)
         
         # Create session record
         create_user_session(
@@ -207,9 +207,15 @@ def logout():
                 user_session.is_active = False
                 db.session.commit()
         
+        # Write any pending conversation save and drop the user's chatbot
+        chatbot_manager = current_app.extensions.get('chatbot_manager')
+        if chatbot_manager is not None:
+            chatbot_manager.remove_chatbot(user_id)
+        
         # Logout user
         logout_user()
         session.clear()
+        invalidate_cached_user(current_app, user_id)
         
         current_app.logger.info(f"User logged out: {user_id}")
         
@@ -290,6 +296,7 @@ def google_auth():
         
         # Log the user in
         login_user(user, remember=True)
+        invalidate_cached_user(current_app, user.id)
         
         # Create session record
         create_user_session(
@@ -392,6 +399,7 @@ def facebook_auth():
         
         # Log the user in
         login_user(user, remember=True)
+        invalidate_cached_user(current_app, user.id)
         
         # Create session record
         create_user_session(
@@ -438,7 +446,9 @@ def auth_status():
 def change_password():
     """Change user password (for email/password users only)."""
     try:
-        if current_user.provider != 'email':
+        # current_user may be a cached snapshot; passwords live on the database row
+        user = db.session.get(User, current_user.id)
+        if user.provider != 'email':
             return jsonify({'error': 'Password change not available for OAuth users'}), 400
         
         data = request.get_json()
@@ -449,7 +459,7 @@ def change_password():
             return jsonify({'error': 'Current and new passwords are required'}), 400
         
         # Verify current password
-        if not current_user.check_password(current_password):
+        if not user.check_password(current_password):
             return jsonify({'error': 'Current password is incorrect'}), 401
         
         # Validate new password
@@ -458,9 +468,10 @@ def change_password():
             return jsonify({'error': password_error}), 400
         
         # Update password
-        current_user.set_password(new_password)
-        current_user.updated_at = datetime.utcnow()
+        user.set_password(new_password)
+        user.updated_at = datetime.utcnow()
         db.session.commit()
+        invalidate_cached_user(current_app, user.id)
         
         current_app.logger.info(f"Password changed for user: {current_user.email}")
         
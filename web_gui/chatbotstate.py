@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Chatbot State for Spanish Tutor
+Shares each user's active conversation between the worker processes serving them
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    import redis
+except ImportError:
+    # Only needed for redis:// state URLs
+    redis = None
+
+
+class ChatbotState(ABC):
+    """Where the web app records which conversation each user has open.
+
+    Records are ``{"conversation": name or None, "exchanges": saved count,
+    "version": int}``; the version increases on every ``set()``, so a worker
+    can tell its in-memory chatbot is stale by comparing versions. The
+    conversation itself stays in the conversation store. ``shared`` backends
+    are visible to other processes, so workers check them before using a
+    resident chatbot.
+    """
+
+    name = 'base'
+    shared = False
+
+    @abstractmethod
+    def get(self, user_key: str) -> Optional[Dict]:
+        """Get the user's record, or None if nothing is recorded."""
+
+    @abstractmethod
+    def set(self, user_key: str, conversation: Optional[str], exchanges: int) -> int:
+        """Record the user's active conversation. Returns the new version."""
+
+    @abstractmethod
+    def delete(self, user_key: str) -> None:
+        """Forget the user's record."""
+
+
+class LocalChatbotState(ChatbotState):
+    """In-process state for a single worker, keeping the most recently updated ``max_entries`` users."""
+
+    name = 'local'
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.records: "OrderedDict[str, Dict]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_key: str) -> Optional[Dict]:
+        with self.lock:
+            record = self.records.get(user_key)
+            return dict(record) if record else None
+
+    def set(self, user_key: str, conversation: Optional[str], exchanges: int) -> int:
+        with self.lock:
+            previous = self.records.pop(user_key, None)
+            version = previous['version'] + 1 if previous else 1
+            self.records[user_key] = {'conversation': conversation, 'exchanges': exchanges, 'version': version}
+            while len(self.records) > self.max_entries:
+                self.records.popitem(last=False)
+            return version
+
+    def delete(self, user_key: str) -> None:
+        with self.lock:
+            self.records.pop(user_key, None)
+
+
+class SQLiteChatbotState(ChatbotState):
+    """State in a SQLite file, shared by worker processes on one machine."""
+
+    name = 'sqlite'
+    shared = True
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = None
+        self.pid = None
+
+    def connect(self) -> sqlite3.Connection:
+        # Connections can't be shared across fork(), so each worker process opens its own
+        if self.connection is None or self.pid != os.getpid():
+            self.connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            self.pid = os.getpid()
+            self.init_schema()
+        return self.connection
+
+    def init_schema(self) -> None:
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS chatbot_state (
+                user_key TEXT PRIMARY KEY,
+                conversation TEXT,
+                exchanges INTEGER NOT NULL DEFAULT 0,
+                version INTEGER NOT NULL DEFAULT 1,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def get(self, user_key: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.connect().execute(
+                "SELECT conversation, exchanges, version FROM chatbot_state WHERE user_key = ?", (user_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'conversation': row[0], 'exchanges': row[1], 'version': row[2]}
+
+    def set(self, user_key: str, conversation: Optional[str], exchanges: int) -> int:
+        with self.lock:
+            connection = self.connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("""
+                    INSERT INTO chatbot_state (user_key, conversation, exchanges, version, updated_at)
+                    VALUES (?, ?, ?, 1, ?)
+                    ON CONFLICT(user_key) DO UPDATE SET
+                        conversation = excluded.conversation,
+                        exchanges = excluded.exchanges,
+                        version = chatbot_state.version + 1,
+                        updated_at = excluded.updated_at
+                """, (user_key, conversation, exchanges, time.time()))
+                version = connection.execute(
+                    "SELECT version FROM chatbot_state WHERE user_key = ?", (user_key,)
+                ).fetchone()[0]
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return version
+
+    def delete(self, user_key: str) -> None:
+        with self.lock:
+            self.connect().execute("DELETE FROM chatbot_state WHERE user_key = ?", (user_key,))
+
+
+class RedisChatbotState(ChatbotState):
+    """State in Redis hashes, shared by workers on any number of machines."""
+
+    name = 'redis'
+    shared = True
+
+    def __init__(self, url: str, prefix: str = 'spanish-tutor:chatbot:'):
+        if redis is None:
+            raise RuntimeError("The redis package is required for redis:// chatbot state")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    def get(self, user_key: str) -> Optional[Dict]:
+        record = self.client.hgetall(self.prefix + user_key)
+        if not record:
+            return None
+        return {
+            'conversation': record.get('conversation') or None,
+            'exchanges': int(record.get('exchanges', 0)),
+            'version': int(record.get('version', 0))
+        }
+
+    def set(self, user_key: str, conversation: Optional[str], exchanges: int) -> int:
+        key = self.prefix + user_key
+        pipeline = self.client.pipeline()
+        pipeline.hset(key, mapping={'conversation': conversation or '', 'exchanges': exchanges})
+        pipeline.hincrby(key, 'version', 1)
+        return int(pipeline.execute()[-1])
+
+    def delete(self, user_key: str) -> None:
+        self.client.delete(self.prefix + user_key)
+
+
+def create_chatbot_state(url: Optional[str]) -> ChatbotState:
+    """Create the state backend for a URL: empty for in-process, ``sqlite:///path`` or ``redis://...``."""
+    if not url or url == 'local':
+        return LocalChatbotState()
+    if url.startswith('sqlite:///'):
+        return SQLiteChatbotState(url[len('sqlite:///'):])
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisChatbotState(url)
+    raise ValueError(f"Unsupported chatbot state URL: {url}")
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Database Conversation Storage for Spanish Tutor
+Keeps conversations in the Conversation/Exchange tables and imports the legacy per-user files
+"""
+
+import os
+import html
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, text as sql_text
+
+from storage import ConversationStore, find_conversation_files, jsoncodec, make_cursor, parse_cursor, read_conversation
+from storage.conversationlog import conversation_stem
+from storage.conversationsearch import (
+    FTS_TOKENIZER,
+    SNIPPET_END,
+    SNIPPET_START,
+    SNIPPET_TOKENS,
+    build_match_query,
+    format_snippet
+)
+from web_gui.models import db, User, Conversation, Exchange
+
+
+logger = logging.getLogger(__name__)
+
+
+def exchanges_size(exchanges: List[Dict]) -> int:
+    """Approximate the stored size of exchanges, reported as the conversation's file size."""
+    return sum(len(jsoncodec.dumps_bytes(exchange)) + 1 for exchange in exchanges)
+
+
+def search_index_available() -> bool:
+    """Whether the exchanges are full-text indexed (SQLite with FTS5)."""
+    return db.engine.dialect.name == 'sqlite'
+
+
+def init_search_index(app) -> None:
+    """Create the FTS5 index over exchange text, kept current by triggers.
+
+    The index is an external-content table, so the text isn't stored twice.
+    On first creation it's built from the exchanges already in the database.
+    Other databases have no full-text index and search falls back to LIKE.
+    """
+    with app.app_context():
+        if not search_index_available():
+            return
+        exists = db.session.execute(sql_text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'exchanges_fts'"
+        )).first()
+        if exists:
+            return
+
+        db.session.execute(sql_text(f"""
+            CREATE VIRTUAL TABLE exchanges_fts USING fts5(
+                user_message, bot_message,
+                content='exchanges', content_rowid='id', tokenize='{FTS_TOKENIZER}'
+            )
+        """))
+        db.session.execute(sql_text("""
+            CREATE TRIGGER IF NOT EXISTS exchanges_fts_insert AFTER INSERT ON exchanges BEGIN
+                INSERT INTO exchanges_fts(rowid, user_message, bot_message)
+                VALUES (new.id, new.user_message, new.bot_message);
+            END
+        """))
+        db.session.execute(sql_text("""
+            CREATE TRIGGER IF NOT EXISTS exchanges_fts_delete AFTER DELETE ON exchanges BEGIN
+                INSERT INTO exchanges_fts(exchanges_fts, rowid, user_message, bot_message)
+                VALUES ('delete', old.id, old.user_message, old.bot_message);
+            END
+        """))
+        db.session.execute(sql_text("INSERT INTO exchanges_fts(exchanges_fts) VALUES ('rebuild')"))
+        db.session.commit()
+        app.logger.info("Conversation search index created")
+
+
+class DatabaseConversationStore(ConversationStore):
+    """Conversations of one user in the application database.
+
+    Keys are conversation names such as ``conversation_20240101_120000``, so
+    they match the file names clients already know (minus the extension).
+    Saving a new exchange inserts a single Exchange row and updates the
+    conversation's counters; listing is an indexed query on
+    ``(user_id, updated_at)``. Every call pushes an app context, so the store
+    also works from background workers.
+    """
+
+    def __init__(self, app, user_id: int):
+        self.app = app
+        self.user_id = user_id
+        # Conversation row ids by name, so appends skip the lookup
+        self.conversation_ids: Dict[str, int] = {}
+
+    @staticmethod
+    def name_for(filename: str) -> str:
+        # Strips every conversation file extension, including the two-part .json.gz
+        return os.path.basename(conversation_stem(filename))
+
+    def new_key(self, session_start: datetime) -> str:
+        return f"conversation_{session_start.strftime('%Y%m%d_%H%M%S')}"
+
+    def get_conversation(self, key: str) -> Optional[Conversation]:
+        return Conversation.query.filter_by(user_id=self.user_id, name=self.name_for(key)).first()
+
+    def resolve(self, name: str) -> Optional[str]:
+        name = self.name_for(name)
+        with self.app.app_context():
+            exists = db.session.query(Conversation.id).filter_by(user_id=self.user_id, name=name).first()
+        return name if exists else None
+
+    def read(self, key: str) -> Dict:
+        with self.app.app_context():
+            conversation = self.get_conversation(key)
+            if conversation is None:
+                raise LookupError(f"Conversation {key} not found")
+            exchanges = (Exchange.query.filter_by(conversation_id=conversation.id)
+                         .order_by(Exchange.position).all())
+            self.conversation_ids[conversation.name] = conversation.id
+            return {
+                "session_start": conversation.session_start or "unknown",
+                "model": conversation.model or "unknown",
+                "conversation": [exchange.to_dict() for exchange in exchanges]
+            }
+
+    def append(self, key: str, session_start: str, model: str, history: List[Dict], start: int) -> str:
+        conversation_id = self.conversation_ids.get(self.name_for(key))
+        if conversation_id is None:
+            return self.write(key, session_start, model, history)
+
+        new_exchanges = history[start:]
+        with self.app.app_context():
+            if new_exchanges:
+                db.session.execute(Exchange.__table__.insert(), [
+                    Exchange.row_from_dict(conversation_id, position, exchange)
+                    for position, exchange in enumerate(new_exchanges, start)
+                ])
+            Conversation.query.filter_by(id=conversation_id).update({
+                Conversation.exchange_count: len(history),
+                Conversation.byte_size: Conversation.byte_size + exchanges_size(new_exchanges),
+                Conversation.updated_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.session.commit()
+        return self.name_for(key)
+
+    def write(self, key: str, session_start: str, model: str, history: List[Dict]) -> str:
+        name = self.name_for(key)
+        with self.app.app_context():
+            conversation = self.get_conversation(name)
+            if conversation is None:
+                conversation = Conversation(user_id=self.user_id, name=name, session_start=session_start, model=model)
+                db.session.add(conversation)
+                db.session.flush()
+            else:
+                Exchange.query.filter_by(conversation_id=conversation.id).delete(synchronize_session=False)
+
+            if history:
+                db.session.execute(Exchange.__table__.insert(), [
+                    Exchange.row_from_dict(conversation.id, position, exchange)
+                    for position, exchange in enumerate(history)
+                ])
+            conversation.exchange_count = len(history)
+            conversation.byte_size = exchanges_size(history)
+            conversation.updated_at = datetime.utcnow()
+            db.session.commit()
+            self.conversation_ids[name] = conversation.id
+        return name
+
+    def list(self, limit: Optional[int] = None, before: Optional[str] = None,
+             validate: bool = True) -> List[Dict]:
+        with self.app.app_context():
+            query = Conversation.query.filter_by(user_id=self.user_id)
+            if before:
+                # The cursor carries the sort position, so it outlives the conversation it names
+                updated_at, name = parse_cursor(before, datetime.fromisoformat)
+                query = query.filter(or_(
+                    Conversation.updated_at < updated_at,
+                    and_(Conversation.updated_at == updated_at, Conversation.name < name)
+                ))
+            query = query.order_by(Conversation.updated_at.desc(), Conversation.name.desc())
+            if limit is not None:
+                query = query.limit(limit)
+            return [dict(conversation.to_dict(), cursor=make_cursor(conversation.updated_at.isoformat(), conversation.name))
+                    for conversation in query.all()]
+
+    def search(self, text: str, limit: int = 20) -> List[Dict]:
+        query = build_match_query(text)
+        if query is None:
+            return []
+        with self.app.app_context():
+            if not search_index_available():
+                return self.search_like(text, limit)
+            rows = db.session.execute(sql_text(f"""
+                SELECT c.name, e.position, e.timestamp, c.session_start,
+                       snippet(exchanges_fts, -1, :start, :end, '…', {SNIPPET_TOKENS}),
+                       bm25(exchanges_fts) AS rank
+                FROM exchanges_fts
+                JOIN exchanges e ON e.id = exchanges_fts.rowid
+                JOIN conversations c ON c.id = e.conversation_id
+                WHERE exchanges_fts MATCH :query AND c.user_id = :user_id
+                ORDER BY rank
+                LIMIT :limit
+            """), {'start': SNIPPET_START, 'end': SNIPPET_END, 'query': query,
+                   'user_id': self.user_id, 'limit': limit}).all()
+        return [{
+            "file": name,
+            "position": position,
+            "timestamp": timestamp,
+            "session_start": session_start,
+            "snippet": format_snippet(snippet),
+            "score": round(-rank, 4)
+        } for name, position, timestamp, session_start, snippet, rank in rows]
+
+    def search_like(self, text: str, limit: int) -> List[Dict]:
+        """Unranked substring search for databases without a full-text index."""
+        query = (db.session.query(Conversation.name, Conversation.session_start, Exchange)
+                 .join(Exchange, Exchange.conversation_id == Conversation.id)
+                 .filter(Conversation.user_id == self.user_id))
+        for word in text.split():
+            pattern = f"%{word}%"
+            query = query.filter(or_(Exchange.user_message.ilike(pattern), Exchange.bot_message.ilike(pattern)))
+        rows = query.order_by(Conversation.updated_at.desc(), Exchange.position).limit(limit).all()
+        return [{
+            "file": name,
+            "position": exchange.position,
+            "timestamp": exchange.timestamp,
+            "session_start": session_start,
+            "snippet": html.escape(exchange.user_message[:120]),
+            "score": 0.0
+        } for name, session_start, exchange in rows]
+
+    def version(self, key: str) -> Optional[Tuple[str, datetime]]:
+        with self.app.app_context():
+            row = (db.session.query(Conversation.exchange_count, Conversation.updated_at)
+                   .filter_by(user_id=self.user_id, name=self.name_for(key)).first())
+        if row is None:
+            return None
+        exchange_count, updated_at = row
+        return f"{exchange_count}:{updated_at.isoformat()}", updated_at.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def import_conversation_files(users_dir: str, batch_size: int = 100,
+                              log: Callable[[str], None] = logger.info) -> Dict:
+    """Import the per-user conversation files under ``users_dir`` into the database.
+
+    Files are matched to users by their directory id and committed in batches
+    of ``batch_size`` conversations, with each batch's exchanges inserted in
+    one statement. Conversations that were already imported are skipped, so
+    the import can be re-run. Must be called within an app context.
+    """
+    stats = {'imported': 0, 'skipped': 0, 'failed': 0, 'exchanges': 0}
+    if not os.path.isdir(users_dir):
+        return stats
+
+    users = {user.get_user_directory_id(): user.id for user in User.query.all()}
+
+    def flush(batch):
+        if not batch:
+            return
+        db.session.add_all([conversation for conversation, _ in batch])
+        db.session.flush()
+        rows = [
+            Exchange.row_from_dict(conversation.id, position, exchange)
+            for conversation, exchanges in batch
+            for position, exchange in enumerate(exchanges)
+        ]
+        if rows:
+            db.session.execute(Exchange.__table__.insert(), rows)
+        db.session.commit()
+        stats['imported'] += len(batch)
+        stats['exchanges'] += len(rows)
+        log(f"Imported {stats['imported']} conversations ({stats['exchanges']} exchanges)")
+
+    for user_dir_id in sorted(os.listdir(users_dir)):
+        user_id = users.get(user_dir_id)
+        conversations_dir = os.path.join(users_dir, user_dir_id, 'conversations')
+        if user_id is None or not os.path.isdir(conversations_dir):
+            continue
+
+        existing = {name for (name,) in db.session.query(Conversation.name).filter_by(user_id=user_id)}
+        batch = []
+        for path in sorted(find_conversation_files(conversations_dir)):
+            name = DatabaseConversationStore.name_for(path)
+            if name in existing:
+                stats['skipped'] += 1
+                continue
+            try:
+                data = read_conversation(path)
+                modified_at = datetime.utcfromtimestamp(os.path.getmtime(path))
+            except Exception as e:
+                log(f"Could not read {path}: {e}")
+                stats['failed'] += 1
+                continue
+
+            exchanges = data.get('conversation', [])
+            batch.append((Conversation(
+                user_id=user_id,
+                name=name,
+                session_start=data.get('session_start'),
+                model=data.get('model'),
+                exchange_count=len(exchanges),
+                byte_size=exchanges_size(exchanges),
+                created_at=modified_at,
+                updated_at=modified_at
+            ), exchanges))
+            existing.add(name)
+
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        flush(batch)
+
+    return stats
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Inference Dispatcher for Spanish Tutor
+Runs LLM generations on a bounded worker pool, keeping each user's messages in order
+"""
+
+import queue
+import threading
+import logging
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from background import spawn_thread
+
+logger = logging.getLogger(__name__)
+
+
+class DispatcherQueueFull(Exception):
+    """Raised when a job cannot be queued because the dispatcher is at capacity."""
+
+
+class InferenceDispatcher:
+    """Bounded worker pool with a FIFO queue per user.
+
+    At most one job per user runs at a time, so a user's messages are answered
+    in the order they were sent, while different users are served round-robin.
+    Workers are created with ``spawn``, which lets the app use green threads
+    (e.g. ``socketio.start_background_task``) instead of OS threads.
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue_depth: int = 100,
+                 max_per_user: int = 5, spawn: Optional[Callable] = None):
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.max_per_user = max_per_user
+        self.spawn = spawn or spawn_thread
+
+        # A user key is in the ready queue iff it has pending jobs and none running
+        self.ready = queue.Queue()
+        self.user_queues: Dict[str, deque] = {}
+        self.running_users = set()
+        self.lock = threading.Lock()
+
+        self.started = False
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        """Start the worker pool if it is not already running."""
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+        for _ in range(self.max_workers):
+            self.spawn(self._worker)
+
+    def submit(self, user_key: str, job: Callable[[], None]) -> int:
+        """Queue a job for a user.
+
+        Returns 0 if the job can start right away, otherwise its estimated
+        position in line: the users ready ahead of it plus the user's own
+        pending jobs, counting from 1. Workers serve users round-robin, so the
+        real wait can differ. Raises DispatcherQueueFull when the global queue
+        or the user's own queue is full.
+        """
+        self.start()
+
+        with self.lock:
+            user_queue = self.user_queues.get(user_key)
+            pending_for_user = len(user_queue) if user_queue else 0
+
+            if self.queued >= self.max_queue_depth or pending_for_user >= self.max_per_user:
+                self.rejected += 1
+                raise DispatcherQueueFull(
+                    f"Inference queue is full ({self.queued} queued, {pending_for_user} for this user)"
+                )
+
+            user_busy = user_key in self.running_users or pending_for_user > 0
+            ready_users = self.ready.qsize()
+            idle_workers = self.max_workers - self.active - ready_users
+            position = ready_users + pending_for_user + 1 if user_busy or idle_workers <= 0 else 0
+
+            if user_queue is None:
+                user_queue = self.user_queues[user_key] = deque()
+            user_queue.append(job)
+            self.queued += 1
+
+            if not user_busy:
+                self.ready.put(user_key)
+
+        return position
+
+    def _worker(self) -> None:
+        while True:
+            user_key = self.ready.get()
+            if user_key is None:
+                break
+
+            with self.lock:
+                job = self.user_queues[user_key].popleft()
+                self.running_users.add(user_key)
+                self.queued -= 1
+                self.active += 1
+
+            try:
+                job()
+                failed = False
+            except Exception:
+                logger.exception("Inference job failed for %s", user_key)
+                failed = True
+
+            with self.lock:
+                self.running_users.discard(user_key)
+                self.active -= 1
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+
+                # Keep serving this user's backlog in order, behind other waiting users
+                if self.user_queues[user_key]:
+                    self.ready.put(user_key)
+                else:
+                    del self.user_queues[user_key]
+
+    def has_jobs(self, user_key: str) -> bool:
+        """Whether a user has a job queued or running."""
+        with self.lock:
+            return user_key in self.running_users or bool(self.user_queues.get(user_key))
+
+    def stop(self) -> None:
+        """Stop the workers once they finish their current jobs."""
+        with self.lock:
+            if not self.started:
+                return
+            self.started = False
+        for _ in range(self.max_workers):
+            self.ready.put(None)
+
+    def get_stats(self) -> Dict:
+        """Get worker pool and queue statistics."""
+        with self.lock:
+            return {
+                'workers': self.max_workers,
+                'active': self.active,
+                'queued': self.queued,
+                'queued_users': sum(1 for user_queue in self.user_queues.values() if user_queue),
+                'max_queue_depth': self.max_queue_depth,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected
+            }
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Log Pipeline for Spanish Tutor
+Non-blocking logging: records are queued by the caller and formatted and written on a listener thread
+"""
+
+import logging
+import os
+import queue
+import threading
+from collections import defaultdict
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, List, Optional
+
+from storage import jsoncodec
+
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+STANDARD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+def parse_mapping(value: Optional[str], convert: Callable = str) -> Dict:
+    """Parse ``"name=value,other=value"`` settings, e.g. per-logger levels."""
+    mapping = {}
+    for item in (value or '').split(','):
+        if '=' not in item:
+            continue
+        name, setting = item.split('=', 1)
+        mapping[name.strip()] = convert(setting.strip())
+    return mapping
+
+
+def parse_level(value) -> int:
+    """Accept level names (``"warning"``) as well as numbers."""
+    if isinstance(value, int) or str(value).isdigit():
+        return int(value)
+    level = logging.getLevelName(str(value).upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level: {value}")
+    return level
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, including any fields passed through ``extra``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in STANDARD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return jsoncodec.dumps(entry)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the records below WARNING from chosen loggers.
+
+    ``rates`` maps logger names to the fraction kept, and applies to their
+    child loggers too. Records are counted per logger and every
+    ``1/rate``-th one is kept, so the sample is spread evenly rather than
+    random. Kept records carry ``sample_rate`` so readers can scale counts.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self.resolved: Dict[str, float] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.lock = threading.Lock()
+        self.sampled_out = 0
+
+    def rate_for(self, name: str) -> float:
+        rate = self.resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition('.')[0]
+            self.resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1:
+            return True
+        with self.lock:
+            self.counters[record.name] += 1
+            count = self.counters[record.name]
+            keep = int(count * rate) != int((count - 1) * rate)
+            if not keep:
+                self.sampled_out += 1
+        if keep:
+            record.sample_rate = rate
+        return keep
+
+
+class PipelineQueueHandler(QueueHandler):
+    """Enqueues records untouched and drops them, counted, when the queue is full.
+
+    The stock handler formats each record before queueing it, on the
+    logging thread; here formatting happens on the listener thread, so
+    arguments should not be mutated after they are logged.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Losing a log line beats stalling a chat turn
+            self.dropped += 1
+
+
+class LogPipeline:
+    """Routes every logger through one queue to file and console handlers on a listener thread.
+
+    Callers only pay for the level check, sampling and a queue put. After
+    fork() the worker gets a fresh queue and listener, since the parent's
+    listener thread doesn't exist in the child.
+    """
+
+    def __init__(self, handlers: List[logging.Handler], level: int = logging.INFO,
+                 levels: Optional[Dict[str, int]] = None, sample_rates: Optional[Dict[str, float]] = None,
+                 max_queue: int = 10000):
+        self.handlers = handlers
+        self.level = level
+        self.levels = levels or {}
+        self.max_queue = max_queue
+        self.sampler = SamplingFilter(sample_rates or {})
+        self.queue_handler = None
+        self.listener = None
+        self.started = False
+
+    def start(self) -> None:
+        """Install the queue handler on the root logger and start the listener. Idempotent."""
+        if self.started:
+            return
+        self.started = True
+
+        root = logging.getLogger()
+        root.setLevel(self.level)
+        for name, level in self.levels.items():
+            logging.getLogger(name).setLevel(level)
+
+        self.attach()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.attach)
+
+    def attach(self) -> None:
+        """Create the queue and listener for this process."""
+        root = logging.getLogger()
+        if self.queue_handler is not None:
+            root.removeHandler(self.queue_handler)
+            # Another thread may have held it when the process forked
+            self.sampler.lock = threading.Lock()
+        log_queue = queue.Queue(self.max_queue) if self.max_queue > 0 else queue.Queue()
+        self.queue_handler = PipelineQueueHandler(log_queue)
+        self.queue_handler.addFilter(self.sampler)
+        root.addHandler(self.queue_handler)
+        self.listener = QueueListener(log_queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Write out queued records and stop the listener."""
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+
+    def get_stats(self) -> Dict:
+        """Get queue depth and how many records were dropped or sampled out."""
+        return {
+            'queued': self.queue_handler.queue.qsize() if self.queue_handler else 0,
+            'dropped': self.queue_handler.dropped if self.queue_handler else 0,
+            'sampled_out': self.sampler.sampled_out,
+            'sample_rates': dict(self.sampler.rates),
+            'levels': {name: logging.getLevelName(level) for name, level in self.levels.items()}
+        }
+
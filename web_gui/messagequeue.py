@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Message Queue for Spanish Tutor
+Relays Socket.IO events between worker processes through Redis, RabbitMQ or a local SQLite file
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict
+
+import socketio
+
+from storage import jsoncodec
+
+
+class SQLiteManager(socketio.PubSubManager):
+    """Socket.IO client manager that passes events between processes through a SQLite table.
+
+    A stand-in for the Redis or Kombu managers when every worker runs on one
+    machine, e.g. several gunicorn workers during development. Each listener
+    polls for rows newer than the last one it saw; rows older than
+    ``retention`` seconds are pruned, so a worker that is blocked for longer
+    than that misses events, just as with Redis pub/sub.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, url: str = 'sqlite:///socketio.db', channel: str = 'socketio',
+                 write_only: bool = False, logger=None, poll_interval: float = 0.05,
+                 retention: float = 60):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = url[len('sqlite:///'):] if url.startswith('sqlite:///') else url
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.lock = threading.Lock()
+        self.connection = None
+        self.pid = None
+
+    def connect(self) -> sqlite3.Connection:
+        # Connections can't be shared across fork(), so each worker process opens its own
+        if self.connection is None or self.pid != os.getpid():
+            self.connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            self.pid = os.getpid()
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS socketio_messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    channel TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created REAL NOT NULL
+                )
+            """)
+        return self.connection
+
+    def _publish(self, data: Dict) -> None:
+        with self.lock:
+            self.connect().execute(
+                "INSERT INTO socketio_messages (channel, payload, created) VALUES (?, ?, ?)",
+                (self.channel, jsoncodec.dumps(data), time.time())
+            )
+
+    def prune(self) -> None:
+        with self.lock:
+            self.connect().execute("DELETE FROM socketio_messages WHERE created < ?", (time.time() - self.retention,))
+
+    def _listen(self):
+        with self.lock:
+            last_id = self.connect().execute("SELECT COALESCE(MAX(id), 0) FROM socketio_messages").fetchone()[0]
+        last_prune = time.monotonic()
+        while True:
+            with self.lock:
+                rows = self.connect().execute(
+                    "SELECT id, payload FROM socketio_messages WHERE id > ? AND channel = ? ORDER BY id",
+                    (last_id, self.channel)
+                ).fetchall()
+            for row_id, payload in rows:
+                last_id = row_id
+                yield jsoncodec.loads(payload)
+            if time.monotonic() - last_prune > self.retention:
+                self.prune()
+                last_prune = time.monotonic()
+            if not rows:
+                self.server.sleep(self.poll_interval)
+
+
+def create_client_manager(url: str) -> Dict:
+    """Flask-SocketIO keyword arguments for a message queue URL; empty for a single process."""
+    if not url:
+        return {}
+    if url.startswith('sqlite:///'):
+        return {'client_manager': SQLiteManager(url)}
+    # redis://, amqp:// and the rest are handled by python-socketio's own managers
+    return {'message_queue': url}
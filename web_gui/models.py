@@ -5,6 +5,7 @@ Database Models for Spanish Tutor Authentication System
 
 import os
 import hashlib
+import functools
 from datetime import datetime, timedelta
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
@@ -12,6 +13,13 @@ from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
+
+@functools.lru_cache(maxsize=65536)
+def user_directory_id(email):
+    """Directory ID for an email; memoized because every request that touches user files needs it."""
+    return f"user_{hashlib.sha256(email.encode()).hexdigest()[:12]}"
+
+
 class User(UserMixin, db.Model):
     """User model for authentication and profile management."""
     
@@ -31,6 +39,7 @@ class User(UserMixin, db.Model):
     # Relationships
     sessions = db.relationship('UserSession', backref='user', lazy=True, cascade='all, delete-orphan')
     preferences = db.relationship('UserPreference', backref='user', lazy=True, cascade='all, delete-orphan')
+    conversations = db.relationship('Conversation', backref='user', lazy=True, cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<User {self.email}>'
@@ -48,7 +57,7 @@ class User(UserMixin, db.Model):
     def get_user_directory_id(self):
         """Generate a consistent directory ID for file storage."""
         # Use email hash for consistent directory naming
-        return f"user_{hashlib.sha256(self.email.encode()).hexdigest()[:12]}"
+        return user_directory_id(self.email)
     
     def get_data_paths(self):
         """Get user-specific file paths for conversations and settings."""
@@ -89,6 +98,11 @@ class UserSession(db.Model):
     expires_at = db.Column(db.DateTime, nullable=False)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     
+    __table_args__ = (
+        db.Index('idx_user_sessions_user_active', 'user_id', 'is_active'),
+        db.Index('idx_user_sessions_expires', 'expires_at'),
+    )
+    
     def __repr__(self):
         return f'<UserSession {self.session_id} for User {self.user_id}>'
     
@@ -101,13 +115,25 @@ class UserSession(db.Model):
         self.expires_at = datetime.utcnow() + timedelta(hours=hours)
     
     @classmethod
-    def cleanup_expired_sessions(cls):
-        """Remove expired sessions from the database."""
-        expired_sessions = cls.query.filter(cls.expires_at < datetime.utcnow()).all()
-        for session in expired_sessions:
-            db.session.delete(session)
+    def deactivate_user_sessions(cls, user_id):
+        """Mark all of a user's active sessions inactive in one UPDATE. Returns how many changed."""
+        return cls.query.filter_by(user_id=user_id, is_active=True).update(
+            {'is_active': False}, synchronize_session=False
+        )
+    
+    @classmethod
+    def cleanup_expired_sessions(cls, batch_size=None):
+        """Delete expired sessions, at most ``batch_size`` of them if given. Returns how many were deleted."""
+        now = datetime.utcnow()
+        if batch_size is None:
+            deleted = cls.query.filter(cls.expires_at < now).delete(synchronize_session=False)
+        else:
+            # Pick the batch through the expires_at index, then delete by primary key
+            ids = [row.id for row in db.session.query(cls.id).filter(cls.expires_at < now)
+                   .order_by(cls.expires_at).limit(batch_size)]
+            deleted = cls.query.filter(cls.id.in_(ids)).delete(synchronize_session=False) if ids else 0
         db.session.commit()
-        return len(expired_sessions)
+        return deleted
 
 
 class UserPreference(db.Model):
@@ -147,6 +173,76 @@ class UserPreference(db.Model):
         return preference
 
 
+class Conversation(db.Model):
+    """A tutoring conversation; its exchanges are stored one row each."""
+    
+    __tablename__ = 'conversations'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    name = db.Column(db.String(255), nullable=False)  # e.g. conversation_20240101_120000
+    session_start = db.Column(db.String(64), nullable=True)
+    model = db.Column(db.String(255), nullable=True)
+    exchange_count = db.Column(db.Integer, default=0, nullable=False)
+    byte_size = db.Column(db.Integer, default=0, nullable=False)  # Approximate size of the exchanges
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    exchanges = db.relationship('Exchange', backref='conversation', lazy=True, cascade='all, delete-orphan',
+                                order_by='Exchange.position')
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'name', name='unique_user_conversation'),
+        db.Index('idx_conversations_user_updated', 'user_id', 'updated_at'),
+    )
+    
+    def __repr__(self):
+        return f'<Conversation {self.name} for User {self.user_id}>'
+    
+    def to_dict(self):
+        """Convert to the metadata shape used by conversation listings."""
+        return {
+            'file': self.name,
+            'session_start': self.session_start,
+            'model': self.model,
+            'exchanges': self.exchange_count,
+            'file_size': self.byte_size
+        }
+
+
+class Exchange(db.Model):
+    """One user message and the tutor's reply within a conversation."""
+    
+    __tablename__ = 'exchanges'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversations.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    user_message = db.Column(db.Text, nullable=False, default='')
+    bot_message = db.Column(db.Text, nullable=False, default='')
+    timestamp = db.Column(db.String(64), nullable=True)
+    
+    __table_args__ = (db.UniqueConstraint('conversation_id', 'position', name='unique_conversation_position'),)
+    
+    def __repr__(self):
+        return f'<Exchange {self.position} of Conversation {self.conversation_id}>'
+    
+    @staticmethod
+    def row_from_dict(conversation_id, position, exchange):
+        """Build an insertable row from a chatbot exchange dict."""
+        return {
+            'conversation_id': conversation_id,
+            'position': position,
+            'user_message': exchange.get('user', ''),
+            'bot_message': exchange.get('bot', ''),
+            'timestamp': exchange.get('timestamp')
+        }
+    
+    def to_dict(self):
+        """Convert to the exchange dict used by the chatbot."""
+        return {'user': self.user_message, 'bot': self.bot_message, 'timestamp': self.timestamp}
+
+
 def init_database(app):
     """Initialize the database with the Flask app."""
     db.init_app(app)
@@ -155,6 +251,10 @@ def init_database(app):
         # Create all tables
         db.create_all()
         
+        # create_all() skips indexes on tables that already exist
+        for index in UserSession.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+        
         # Set up default preferences for new users
         app.logger.info("Database initialized successfully")
 
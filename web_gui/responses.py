@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Response Encoding for Spanish Tutor
+Fast JSON serialization for Flask and negotiated gzip/brotli compression of API responses
+"""
+
+import gzip
+import logging
+import threading
+from typing import Dict, Optional
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+from storage.jsoncodec import orjson
+
+try:
+    import brotli
+except ImportError:
+    # Optional; clients are served gzip instead
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that uses orjson when it is installed.
+
+    Output matches the default provider: keys are sorted, dates are sent as
+    HTTP dates and other types go through the same ``default`` hook. Indented
+    (debug) output and calls with extra ``json.dumps`` arguments fall back to
+    the stdlib encoder.
+    """
+
+    def orjson_options(self) -> int:
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or set(kwargs) - {'separators'}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.orjson_options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        # Build the body as bytes directly instead of going through str
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.orjson_options() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class ResponseCompressor:
+    """Compresses text and JSON responses for clients that accept it.
+
+    Brotli is preferred when the ``brotli`` package is installed and the
+    client accepts it, otherwise gzip. Bodies smaller than ``min_size`` bytes
+    are sent as they are, since compressing them saves little and costs a
+    round through the compressor. Streamed, file and already-encoded
+    responses are never touched.
+    """
+
+    COMPRESSIBLE_MIMETYPES = {
+        'application/json',
+        'application/javascript',
+        'text/html',
+        'text/css',
+        'text/plain',
+        'text/javascript',
+        'image/svg+xml'
+    }
+
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = (['br'] if brotli is not None else []) + ['gzip']
+
+        self.lock = threading.Lock()
+        self.compressed = {encoding: 0 for encoding in self.encodings}
+        self.skipped_small = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def init_app(self, app) -> None:
+        app.after_request(self.compress_response)
+
+    def choose_encoding(self) -> Optional[str]:
+        """Pick the best encoding the client accepts, honouring q-values."""
+        return request.accept_encodings.best_match(self.encodings)
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def compress_response(self, response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.mimetype not in self.COMPRESSIBLE_MIMETYPES
+                or not 200 <= response.status_code < 300 or response.status_code == 204
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        # The body now depends on Accept-Encoding, whatever this client gets
+        response.vary.add('Accept-Encoding')
+
+        encoding = self.choose_encoding()
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            with self.lock:
+                self.skipped_small += 1
+            return response
+
+        try:
+            compressed = self.compress(data, encoding)
+        except Exception as e:
+            logger.warning("Could not %s-compress response: %s", encoding, e)
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        # A strong ETag promises identical bytes, which no longer holds across encodings
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        with self.lock:
+            self.compressed[encoding] += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(compressed)
+        return response
+
+    def get_stats(self) -> Dict:
+        """Get compressed response counts and the bytes saved."""
+        with self.lock:
+            return {
+                'encodings': list(self.encodings),
+                'min_size': self.min_size,
+                'compressed': dict(self.compressed),
+                'skipped_small': self.skipped_small,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None
+            }
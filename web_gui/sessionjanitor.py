@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Session Janitor for Spanish Tutor
+Periodically deletes expired user sessions in small batches
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from web_gui.models import db, UserSession
+
+
+logger = logging.getLogger(__name__)
+
+
+class SessionJanitor:
+    """Background purge of expired ``user_sessions`` rows.
+
+    Every ``interval`` seconds it deletes expired sessions ``batch_size``
+    rows at a time, committing after each batch so no single transaction
+    holds the table for long, and yielding between batches. A run stops
+    after ``max_batches`` batches; the rest waits for the next run.
+    """
+
+    def __init__(self, app, interval: float = 3600, batch_size: int = 1000, max_batches: int = 100,
+                 spawn: Optional[Callable] = None, sleep: Callable[[float], None] = time.sleep):
+        self.app = app
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.spawn = spawn
+        self.sleep = sleep
+
+        self.lock = threading.Lock()
+        self.running = False
+        self.runs = 0
+        self.rows_purged = 0
+        self.failures = 0
+        self.last_run = None
+        self.last_purged = 0
+        self.last_duration_ms = 0.0
+
+    def start(self) -> None:
+        """Start the periodic purge if not already running."""
+        if self.spawn is None or self.interval <= 0:
+            return
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+        self.spawn(self._run)
+
+    def stop(self) -> None:
+        with self.lock:
+            self.running = False
+
+    def _run(self) -> None:
+        while self.running:
+            try:
+                self.purge()
+            except Exception as e:
+                logger.error("Session cleanup failed: %s", e)
+            self.sleep(self.interval)
+
+    def purge(self) -> int:
+        """Delete expired sessions now. Returns how many rows were deleted."""
+        started = time.perf_counter()
+        purged = 0
+        try:
+            with self.app.app_context():
+                for _ in range(self.max_batches):
+                    deleted = UserSession.cleanup_expired_sessions(batch_size=self.batch_size)
+                    purged += deleted
+                    if deleted < self.batch_size:
+                        break
+                    # Let requests waiting on the database in between batches
+                    self.sleep(0)
+        except Exception:
+            with self.lock:
+                self.failures += 1
+            with self.app.app_context():
+                db.session.rollback()
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            with self.lock:
+                self.runs += 1
+                self.rows_purged += purged
+                self.last_run = datetime.now().isoformat()
+                self.last_purged = purged
+                self.last_duration_ms = duration_ms
+
+        if purged:
+            logger.info("Purged %d expired session(s) in %.0fms", purged, duration_ms)
+        return purged
+
+    def get_stats(self) -> Dict:
+        """Get purge counts and how long the last run took."""
+        with self.lock:
+            return {
+                'interval_seconds': self.interval,
+                'batch_size': self.batch_size,
+                'runs': self.runs,
+                'rows_purged': self.rows_purged,
+                'failures': self.failures,
+                'last_run': self.last_run,
+                'last_purged': self.last_purged,
+                'last_duration_ms': round(self.last_duration_ms, 2)
+            }
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+User Cache for Spanish Tutor
+Per-process cache of signed-in users, so requests and socket events don't query the database each time
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from flask_login import UserMixin
+
+from web_gui.models import db, User
+
+
+class UserSnapshot(UserMixin):
+    """Read-only copy of a User with its directory ID, paths and API dict worked out once.
+
+    Snapshots are shared between requests and threads, so nothing in them
+    changes after creation. To change the user, load the row with
+    ``db.session.get(User, snapshot.id)``, then invalidate the cached snapshot.
+    """
+
+    def __init__(self, user: User):
+        self.id = user.id
+        self.email = user.email
+        self.display_name = user.display_name
+        self.provider = user.provider
+        self.profile_picture_url = user.profile_picture_url
+        self.created_at = user.created_at
+        self.active = user.is_active
+        self.directory_id = user.get_user_directory_id()
+        self.data_paths = user.get_data_paths()
+        self.info = user.to_dict()
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.email}>'
+
+    @property
+    def is_active(self):
+        return self.active
+
+    def get_user_directory_id(self):
+        return self.directory_id
+
+    def get_data_paths(self):
+        return dict(self.data_paths)
+
+    def to_dict(self):
+        return dict(self.info)
+
+
+class UserCache:
+    """Snapshots of recently seen users, each kept for ``ttl_seconds``.
+
+    The cache is per process: a change made through one worker is visible
+    to the others once their snapshot expires, while the worker that made
+    it calls ``invalidate()`` and sees it at once. The least recently used
+    snapshots are dropped beyond ``max_entries``.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def init_app(self, app) -> None:
+        app.extensions['user_cache'] = self
+
+    def get(self, user_id: int) -> Optional[UserSnapshot]:
+        """Return the user's snapshot, loading it from the database if it is missing or expired."""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self.entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot(user)
+
+        with self.lock:
+            self.entries[user_id] = (snapshot, now + self.ttl_seconds)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id: int) -> None:
+        """Forget a user's snapshot after their profile, password or session changes."""
+        with self.lock:
+            if self.entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def get_stats(self) -> Dict:
+        """Get cache size and hit/miss counters."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None
+            }
+
+
+def invalidate_cached_user(app, user_id: int) -> None:
+    """Drop a user's cached snapshot, if the app caches users."""
+    user_cache = app.extensions.get('user_cache')
+    if user_cache is not None:
+        user_cache.invalidate(user_id)